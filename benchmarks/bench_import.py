@@ -0,0 +1,69 @@
+"""
+Measure how long importing sharp_cocoro takes in a fresh interpreter.
+
+Every sample runs in a new process, so nothing is cached in sys.modules.
+Run from the repository root:
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --runs 50 --statement "from sharp_cocoro import Cocoro"
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = [
+    "import sharp_cocoro",
+    "from sharp_cocoro import Cocoro",
+    "from sharp_cocoro import Cocoro; Cocoro('secret', 'key')",
+    "from sharp_cocoro import Aircon, Purifier",
+]
+
+
+def _time_statement(statement: str, runs: int) -> list:
+    code = (
+        "import time; _t = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - _t)"
+    )
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def _heavy_modules(statement: str) -> list:
+    code = (
+        f"{statement}; import sys; "
+        "print(' '.join(m for m in ('httpx', 'aiohttp', 'sharp_cocoro.devices.aircon.aircon', "
+        "'sharp_cocoro.devices.purifier.purifier') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return out.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--statement", action="append", help="statement to time (repeatable)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    for statement in args.statement or STATEMENTS:
+        samples = _time_statement(statement, args.runs)
+        print(statement)
+        print(
+            f"  median {statistics.median(samples) * 1000:7.2f} ms"
+            f"  min {min(samples) * 1000:7.2f} ms"
+            f"  max {max(samples) * 1000:7.2f} ms"
+        )
+        print(f"  loaded: {', '.join(_heavy_modules(statement)) or '-'}")
+    print(f"total {time.perf_counter() - started:.1f} s for {args.runs} runs per statement")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,47 @@
-from .cocoro import Cocoro
-from .device import Device
-from .devices.aircon.aircon import Aircon
-from .devices.purifier.purifier import Purifier
-from .properties import DeviceType, ValueType, SinglePropertyStatus, RangePropertyType, BinaryPropertyStatus, RangePropertyStatus
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
 
-__all__ = ['Cocoro', 'Device', 'Aircon', 'Purifier', 'DeviceType', 'ValueType', 'SinglePropertyStatus', 'RangePropertyType', 'BinaryPropertyStatus', 'RangePropertyStatus']
\ No newline at end of file
+# Public names are imported on first access, so `import sharp_cocoro` does
+# not pull in httpx or every device module up front.
+_LAZY = {
+    'Cocoro': '.cocoro',
+    'Device': '.device',
+    'CommandDispatcher': '.dispatcher',
+    'CocoroPool': '.pool',
+    'CocoroSync': '.sync',
+    'Aircon': '.devices.aircon.aircon',
+    'Purifier': '.devices.purifier.purifier',
+    'register_device_class': '.devices.registry',
+    'DeviceType': '.properties',
+    'ValueType': '.properties',
+    'SinglePropertyStatus': '.properties',
+    'RangePropertyType': '.properties',
+    'BinaryPropertyStatus': '.properties',
+    'RangePropertyStatus': '.properties',
+}
+
+if TYPE_CHECKING:
+    from .cocoro import Cocoro
+    from .device import Device
+    from .dispatcher import CommandDispatcher
+    from .pool import CocoroPool
+    from .sync import CocoroSync
+    from .devices.aircon.aircon import Aircon
+    from .devices.purifier.purifier import Purifier
+    from .devices.registry import register_device_class
+    from .properties import DeviceType, ValueType, SinglePropertyStatus, RangePropertyType, BinaryPropertyStatus, RangePropertyStatus
+
+__all__ = ['Cocoro', 'Device', 'CommandDispatcher', 'CocoroPool', 'CocoroSync', 'Aircon', 'Purifier', 'register_device_class', 'DeviceType', 'ValueType', 'SinglePropertyStatus', 'RangePropertyType', 'BinaryPropertyStatus', 'RangePropertyStatus']
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
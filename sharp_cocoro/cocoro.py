@@ -1,7 +1,7 @@
-import httpx
 import asyncio
 import time
-from typing import List, Dict, Any, Union, Optional, Sequence, cast
+from enum import Enum
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterable, Mapping, Union, Optional, Sequence, Set, Tuple, cast
 from .properties import DeviceType, PropertyStatus, Property, ControlResultStatus
 from .response_types import (
     Box,
@@ -11,31 +11,74 @@ from .response_types import (
     ControlResultResponse,
 )
 from .device import Device
-from .devices.aircon.aircon import Aircon
-from .devices.purifier.purifier import Purifier
-from .devices.unknown import UnknownDevice
-from .http_adapter import HTTPAdapter, create_adapter
+from .device_registry import DeviceRegistry
+from .discovery import DiscoveryResult
+from .devices.registry import build_device
+from .encoding import encode_control_body, encode_result_body
+from .health import HealthTracker
+from .http_adapter import HTTPAdapter, TransferStats, create_adapter, is_httpx_client
+from .profiling import Profiler
+from .scheduler import Priority, RequestScheduler
+from .streaming import JSONArrayStream
+from .subscriptions import OverflowPolicy, Subscription, SubscriptionHub
+
+
+# Called with the device and its status before the change (None for newly built devices)
+StatusListener = Callable[[Device, Optional[List[PropertyStatus]]], None]
+# Called with the device_id of a device whose box vanished from the account
+RemovalListener = Callable[[int], None]
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json; charset=utf-8",
+    "User-Agent": "smartlink_v200i Mozilla/5.0 (iPad; CPU OS 14_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
+}
 
 
 class Cocoro:
     def __init__(
-        self, app_secret: str, app_key: str, service_name: str = "iClub", session=None
+        self,
+        app_secret: str,
+        app_key: str,
+        service_name: str = "iClub",
+        session=None,
+        adapter: Optional[HTTPAdapter] = None,
+        scheduler: Optional[RequestScheduler] = None,
     ):
         self.app_secret = app_secret
         self.app_key = app_key
         self.service_name = service_name
         self.is_authenticated = False
         self.api_base = "https://hms.cloudlabs.sharp.co.jp/hems/pfApi/ta"
-        self.headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "User-Agent": "smartlink_v200i Mozilla/5.0 (iPad; CPU OS 14_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
-        }
-        # Create HTTP adapter
-        self._adapter: HTTPAdapter = create_adapter(
+        self.headers = dict(DEFAULT_HEADERS)
+        # Create HTTP adapter, unless one was passed in (e.g. by CocoroPool)
+        self._adapter: HTTPAdapter = adapter or create_adapter(
             session=session, headers=self.headers
         )
         # Keep session reference for backward compatibility
-        self.session = session if isinstance(session, httpx.AsyncClient) else None
+        self.session = session if is_httpx_client(session) else None
+        self._status_listeners: List[StatusListener] = []
+        self._removal_listeners: List[RemovalListener] = []
+        # Orders requests so commands are not stuck behind bulk polling. The
+        # default limits nothing, pass e.g. RequestScheduler(max_concurrency=8)
+        self.scheduler = scheduler or RequestScheduler(max_concurrency=None)
+        self._subscriptions: Optional[SubscriptionHub] = None
+        # Opt-in per-stage timings, see Profiler.enable()
+        self.profiler = Profiler()
+        # One Device object per device_id, updated in place by every query
+        self.device_registry = DeviceRegistry()
+        # Last known boxes, used by discover() when boxInfo is slow
+        self._known_boxes: Optional[List[Box]] = None
+        self._stragglers: Set["asyncio.Task[DiscoveryResult]"] = set()
+        # Error rate, latency and quarantine state per box
+        self.health = HealthTracker()
+        # Parsed responses by boxId (and "boxInfo"), reused when the adapter
+        # reports a 304, see HTTPAdapter.conditional_get
+        self._parsed: Dict[str, Any] = {}
+
+    @property
+    def transfer_stats(self) -> Optional[TransferStats]:
+        """Request and byte counters of the HTTP adapter, if it keeps them."""
+        return self._adapter.stats
 
     async def __aenter__(self) -> "Cocoro":
         # No need to create session, adapter handles it
@@ -50,20 +93,97 @@ class Cocoro:
         await self.close()
 
     async def close(self) -> None:
+        for task in list(self._stragglers):
+            task.cancel()
+        if self._subscriptions is not None:
+            self._subscriptions.close()
         await self._adapter.close()
         self.session = None
 
+    def add_status_listener(self, listener: StatusListener) -> None:
+        """Register a callback that is invoked whenever a device's status changes."""
+        self._status_listeners.append(listener)
+
+    def remove_status_listener(self, listener: StatusListener) -> None:
+        self._status_listeners.remove(listener)
+
+    def _notify_status(
+        self, device: Device, previous: Optional[List[PropertyStatus]]
+    ) -> None:
+        for listener in list(self._status_listeners):
+            listener(device, previous)
+
+    def add_removal_listener(self, listener: RemovalListener) -> None:
+        """Register a callback that is invoked when a device disappears from boxInfo."""
+        self._removal_listeners.append(listener)
+
+    def remove_removal_listener(self, listener: RemovalListener) -> None:
+        self._removal_listeners.remove(listener)
+
+    def _notify_removed(self, device_id: int) -> None:
+        for listener in list(self._removal_listeners):
+            listener(device_id)
+
+    def subscribe(
+        self,
+        device_id: Optional[int] = None,
+        status_codes: Optional[Iterable[Union[str, Enum]]] = None,
+        maxsize: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> Subscription:
+        """
+        Subscribe to status changes of a device (or of all devices if device_id is None).
+
+        Events are produced by whatever updates device status: query_devices,
+        refresh_device, commands and control results. Pass status_codes to only
+        receive changes of those properties. Close the subscription when done.
+
+        Example:
+            sub = cocoro.subscribe(aircon.device_id, [StatusCode.POWER])
+            async for event in sub:
+                print(event.status_code, event.old, event.new)
+        """
+        if self._subscriptions is None:
+            self._subscriptions = SubscriptionHub()
+            self.add_status_listener(self._subscriptions.on_status)
+            self.add_removal_listener(self._subscriptions.on_removed)
+        return self._subscriptions.subscribe(device_id, status_codes, maxsize, policy)
+
     async def _create_session(self) -> None:
         # Deprecated - adapter handles session management
         pass
 
-    async def send_get_request(self, path: str) -> Dict[str, Any]:
-        return await self._adapter.get(f"{self.api_base}{path}")
+    async def send_get_request(
+        self, path: str, priority: Priority = Priority.REFRESH
+    ) -> Dict[str, Any]:
+        async with self.scheduler.slot(priority):
+            with self.profiler.stage("http"):
+                return await self._adapter.get(f"{self.api_base}{path}")
+
+    async def send_conditional_get(
+        self, path: str, priority: Priority = Priority.REFRESH
+    ) -> Tuple[Dict[str, Any], bool]:
+        """GET that also returns whether the body is unchanged, see HTTPAdapter.conditional_get."""
+        async with self.scheduler.slot(priority):
+            with self.profiler.stage("http"):
+                return await self._adapter.conditional_get(f"{self.api_base}{path}")
 
     async def send_post_request(
-        self, path: str, body: Dict[str, Any]
+        self, path: str, body: Dict[str, Any], priority: Priority = Priority.CONTROL
     ) -> Dict[str, Any]:
-        return await self._adapter.post(f"{self.api_base}{path}", body)
+        async with self.scheduler.slot(priority):
+            with self.profiler.stage("http"):
+                return await self._adapter.post(f"{self.api_base}{path}", body)
+
+    async def send_post_content(
+        self, path: str, content: bytes, priority: Priority = Priority.CONTROL
+    ) -> Dict[str, Any]:
+        """POST an already encoded JSON body, see the encoding module."""
+        async with self.scheduler.slot(priority):
+            with self.profiler.stage("http"):
+                return await self._adapter.post_content(
+                    f"{self.api_base}{path}", content
+                )
 
     @staticmethod
     def device_type_from_string(s: str) -> DeviceType:
@@ -80,118 +200,360 @@ class Cocoro:
         return json_res
 
     async def query_boxes(self) -> List[Box]:
-        res = await self.send_get_request(
-            f"/setting/boxInfo/?appSecret={self.app_secret}&mode=other"
+        res, not_modified = await self.send_conditional_get(
+            f"/setting/boxInfo/?appSecret={self.app_secret}&mode=other",
+            priority=Priority.POLL,
         )
-        res_parsed = QueryBoxesResponse(**res)
-        return res_parsed.box
+        cached = self._parsed.get("boxInfo")
+        if not_modified and cached is not None:
+            return list(cached)
+
+        with self.profiler.stage("parse_boxes"):
+            res_parsed = QueryBoxesResponse(**res)
+        self._parsed["boxInfo"] = res_parsed.box
+        return list(res_parsed.box)
+
+    async def iter_boxes(self) -> AsyncIterator[Box]:
+        """
+        Yield boxes one by one while the boxInfo response is still arriving.
+
+        Unlike query_boxes the body is never decoded as a whole, only one box
+        at a time is held in memory. A POLL scheduler slot is held while
+        chunks are read, but not while the caller processes a box, so other
+        requests (e.g. for the boxes already yielded) are not blocked by a
+        paused iteration.
+        """
+        parser = JSONArrayStream("box")
+        chunks = self._adapter.stream_get(
+            f"{self.api_base}/setting/boxInfo/?appSecret={self.app_secret}&mode=other"
+        )
+        try:
+            while True:
+                async with self.scheduler.slot(Priority.POLL):
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+                for item in parser.feed(chunk):
+                    with self.profiler.stage("parse_boxes"):
+                        box = Box(**item)
+                    yield box
+        finally:
+            await chunks.aclose()
+        for item in parser.close():
+            yield Box(**item)
 
     async def query_box_properties(
-        self, box: Box
+        self, box: Box, priority: Priority = Priority.REFRESH
     ) -> Dict[str, Union[List[Property], List[PropertyStatus]]]:
         echonet_data = box.echonetData[0]
-        res = await self.send_get_request(
-            f"/control/deviceProperty?boxId={box.boxId}&appSecret={self.app_secret}"
-            f"&echonetNode={echonet_data.echonetNode}&echonetObject={echonet_data.echonetObject}&status=true"
-        )
-        res_parsed = QueryDevicePropertiesResponse(
-            device_property=res["deviceProperty"]
-        )
-        return {
+        self.health.begin(box.boxId)
+        started = time.monotonic()
+        try:
+            res, not_modified = await self.send_conditional_get(
+                f"/control/deviceProperty?boxId={box.boxId}&appSecret={self.app_secret}"
+                f"&echonetNode={echonet_data.echonetNode}&echonetObject={echonet_data.echonetObject}&status=true",
+                priority=priority,
+            )
+        except Exception as e:
+            self.health.record_failure(box.boxId, e)
+            raise
+        except BaseException:
+            self.health.abort(box.boxId)
+            raise
+        self.health.record_success(box.boxId, time.monotonic() - started)
+
+        cached = self._parsed.get(box.boxId)
+        if not_modified and cached is not None:
+            # copies, so callers changing a list don't change the cached response
+            return self._copy_properties_and_status(cached)
+
+        with self.profiler.stage("parse_properties"):
+            res_parsed = QueryDevicePropertiesResponse(
+                device_property=res["deviceProperty"]
+            )
+        properties_and_status: Dict[str, Union[List[Property], List[PropertyStatus]]] = {
             "properties": res_parsed.device_property.property,
             "status": res_parsed.device_property.status,
         }
+        self._parsed[box.boxId] = properties_and_status
+        return self._copy_properties_and_status(properties_and_status)
 
-    async def query_devices(self) -> Sequence[Device]:
-        boxes = await self.query_boxes()
-        devices: List[Device] = []
-
-        for box in boxes:
-            properties_and_status = await self.query_box_properties(box)
-            properties = cast(List[Property], properties_and_status["properties"])
-            status = cast(List[PropertyStatus], properties_and_status["status"])
+    @staticmethod
+    def _copy_properties_and_status(
+        properties_and_status: Dict[str, Union[List[Property], List[PropertyStatus]]]
+    ) -> Dict[str, Union[List[Property], List[PropertyStatus]]]:
+        return {
+            "properties": list(cast(List[Property], properties_and_status["properties"])),
+            "status": list(cast(List[PropertyStatus], properties_and_status["status"])),
+        }
 
-            device_type = self.device_type_from_string(
-                box.echonetData[0].labelData.deviceType
-            )
+    async def query_devices(self, skip_quarantined: bool = True) -> Sequence[Device]:
+        """
+        Query all boxes and build their devices.
 
-            echonet_data = box.echonetData[0]
-            name = echonet_data.labelData.name
-            device_id = echonet_data.deviceId
-            echonet_node = echonet_data.echonetNode
-            echonet_object = echonet_data.echonetObject
-            maker = echonet_data.maker
-            model = echonet_data.model
-            serial_number = echonet_data.serialNumber or ""
-
-            if device_type == DeviceType.AirCleaner:
-                devices.append(
-                    Purifier(
-                        name=name,
-                        kind=device_type,
-                        device_id=device_id,
-                        echonet_node=echonet_node,
-                        echonet_object=echonet_object,
-                        properties=properties,
-                        status=status,
-                        maker=maker,
-                        model=model,
-                        serial_number=serial_number,
-                        box=box,
-                    )
+        Boxes quarantined by the health tracker are left out unless
+        skip_quarantined is False, in which case they raise
+        BoxQuarantinedError.
+        """
+        with self.profiler.call("query_devices"):
+            boxes = await self.query_boxes()
+            updated: List[Tuple[Device, Optional[List[PropertyStatus]]]] = []
+
+            for box in boxes:
+                if skip_quarantined and self.health.is_quarantined(box.boxId):
+                    continue
+                token = self.device_registry.begin_token(box)
+                properties_and_status = await self.query_box_properties(
+                    box, priority=Priority.POLL
                 )
-            elif device_type == DeviceType.AirCondition:
-                devices.append(
-                    Aircon(
-                        name=name,
-                        kind=device_type,
-                        device_id=device_id,
-                        echonet_node=echonet_node,
-                        echonet_object=echonet_object,
-                        properties=properties,
-                        status=status,
-                        maker=maker,
-                        model=model,
-                        serial_number=serial_number,
-                        box=box,
+                updated.append(
+                    self.device_registry.upsert(
+                        box,
+                        cast(List[Property], properties_and_status["properties"]),
+                        cast(List[PropertyStatus], properties_and_status["status"]),
+                        self._build_device,
+                        token,
                     )
                 )
+            self._forget_vanished_boxes(boxes)
+
+        for device, previous in updated:
+            self._notify_status(device, previous)
+
+        return [device for device, _ in updated]
+
+    async def discover(
+        self,
+        deadline: float,
+        keep_stragglers: bool = False,
+        priority: Priority = Priority.REFRESH,
+    ) -> DiscoveryResult:
+        """
+        Discover devices, returning whatever is ready after `deadline` seconds.
+
+        Unlike query_devices, a slow or failing box does not hold up or fail
+        the whole call: boxes that have not answered in time are listed in
+        `pending` (together with their last known device in `stale`) and
+        failed boxes in `failed`.
+
+        Args:
+            deadline: overall time budget in seconds, including boxInfo
+            keep_stragglers: keep querying pending boxes in the background.
+                Late devices update the discovery cache and are passed to the
+                status listeners; `stragglers` resolves once all are done.
+            priority: scheduler priority of the deviceProperty requests
+
+        Raises:
+            asyncio.TimeoutError: if boxInfo did not arrive in time and no
+                boxes are known from an earlier discovery
+        """
+        if deadline <= 0:
+            raise ValueError("deadline must be positive")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            boxes = await asyncio.wait_for(self.query_boxes(), deadline)
+            self._known_boxes = boxes
+            self._forget_vanished_boxes(boxes)
+        except asyncio.TimeoutError:
+            if self._known_boxes is None:
+                raise
+            boxes = self._known_boxes
+
+        tasks = {
+            asyncio.ensure_future(self._discover_box(box, priority)): box
+            for box in boxes
+        }
+        remaining = deadline - (loop.time() - started)
+        if tasks and remaining > 0:
+            await asyncio.wait(tasks, timeout=remaining)
+
+        result = self._collect_discovery(tasks)
+        late = {task: box for task, box in tasks.items() if not task.done()}
+        if late and keep_stragglers:
+            straggler = asyncio.ensure_future(self._finish_stragglers(late))
+            self._stragglers.add(straggler)
+            straggler.add_done_callback(self._stragglers.discard)
+            result.stragglers = straggler
+        else:
+            for task in late:
+                task.cancel()
+
+        result.elapsed = loop.time() - started
+        return result
+
+    async def _discover_box(self, box: Box, priority: Priority) -> Device:
+        token = self.device_registry.begin_token(box)
+        properties_and_status = await self.query_box_properties(box, priority=priority)
+        device, previous = self.device_registry.upsert(
+            box,
+            cast(List[Property], properties_and_status["properties"]),
+            cast(List[PropertyStatus], properties_and_status["status"]),
+            self._build_device,
+            token,
+        )
+        self._notify_status(device, previous)
+        return device
+
+    def _collect_discovery(
+        self, tasks: Mapping["asyncio.Task[Device]", Box]
+    ) -> DiscoveryResult:
+        result = DiscoveryResult()
+        for task, box in tasks.items():
+            if not task.done():
+                result.pending.append(box)
+                cached = self.device_registry.get(box.echonetData[0].deviceId)
+                if cached is not None:
+                    result.stale.append(cached)
+            elif task.cancelled():
+                result.failed[box.boxId] = asyncio.CancelledError()
+            elif task.exception() is not None:
+                result.failed[box.boxId] = cast(BaseException, task.exception())
             else:
-                devices.append(
-                    UnknownDevice(
-                        name=name,
-                        kind=device_type,
-                        device_id=device_id,
-                        echonet_node=echonet_node,
-                        echonet_object=echonet_object,
-                        properties=properties,
-                        status=status,
-                        maker=maker,
-                        model=model,
-                        serial_number=serial_number,
-                        box=box,
-                    )
-                )
+                result.devices.append(task.result())
+        return result
+
+    async def _finish_stragglers(
+        self, tasks: Mapping["asyncio.Task[Device]", Box]
+    ) -> DiscoveryResult:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await asyncio.wait(tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        result = self._collect_discovery(tasks)
+        result.elapsed = loop.time() - started
+        return result
+
+    def _forget_vanished_boxes(self, boxes: List[Box]) -> None:
+        box_ids = {box.boxId for box in boxes}
+        removed = self.device_registry.retain(
+            data.deviceId for box in boxes for data in box.echonetData
+        )
+        for box_id in [b for b in self._parsed if b != "boxInfo" and b not in box_ids]:
+            del self._parsed[box_id]
+        for health in self.health.snapshot().values():
+            if health.box_id not in box_ids:
+                self.health.forget(health.box_id)
+        for device_id in removed:
+            self._notify_removed(device_id)
+
+    async def iter_devices(self, concurrency: int = 4) -> AsyncIterator[Device]:
+        """
+        Yield devices as soon as they are built, in completion order.
 
-        return devices
+        Properties are fetched for each box as it arrives from iter_boxes(),
+        with up to `concurrency` requests in flight, so the first devices are
+        ready before the box list is complete. Quarantined boxes are skipped.
+        The first error stops the iteration and is raised.
+
+        The box list is read without waiting for the property requests, so
+        the stream never holds a scheduler slot or connection that those
+        requests need.
+        """
+        results: "asyncio.Queue[Union[Device, Exception, None]]" = asyncio.Queue()
+        slots = asyncio.Semaphore(concurrency)
+        tasks: Set["asyncio.Task[None]"] = set()
+
+        async def fetch(box: Box) -> None:
+            try:
+                async with slots:
+                    device = await self._discover_box(box, Priority.POLL)
+                await results.put(device)
+            except Exception as e:
+                await results.put(e)
+
+        async def produce() -> None:
+            boxes: List[Box] = []
+            try:
+                async for box in self.iter_boxes():
+                    boxes.append(box)
+                    if self.health.is_quarantined(box.boxId):
+                        continue
+                    task = asyncio.ensure_future(fetch(box))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                await asyncio.gather(*tasks)
+                self._forget_vanished_boxes(boxes)
+                await results.put(None)
+            except Exception as e:
+                await results.put(e)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in (producer, *tasks):
+                task.cancel()
+
+    def _build_device(
+        self, box: Box, properties: List[Property], status: List[PropertyStatus]
+    ) -> Device:
+        with self.profiler.stage("device_type"):
+            device_type = self.device_type_from_string(
+                box.echonetData[0].labelData.deviceType
+            )
+
+        with self.profiler.stage("build_device"):
+            return build_device(box, properties, status, device_type)
 
     async def execute_queued_updates(self, device: Device) -> Dict[str, Any]:
-        status_map: List[Dict[str, Any]] = []
-        for _, val in device.property_updates.items():
-            status_map.append(val.to_map())
-
-        body = {
-            "controlList": [
-                {
-                    "deviceId": device.device_id,
-                    "echonetNode": device.echonet_node,
-                    "echonetObject": device.echonet_object,
-                    "status": status_map,
-                }
-            ]
-        }
+        """
+        Send the queued updates of the device.
+
+        Submissions for the same device are serialized. Updates queued while a
+        request is in flight stay queued for the next call, only what was
+        actually sent is dequeued. Nothing is sent if the queue is empty.
+        """
+        async with device.lock:
+            updates = device.take_queued_updates()
+            if not updates:
+                return {"controlList": []}
+
+            json_body = await self._send_updates(device, updates)
+            device.discard_sent_updates(updates)
 
-        json_body = await self.send_post_request(
+        return json_body
+
+    async def execute_updates(
+        self, device: Device, updates: Dict[str, PropertyStatus]
+    ) -> Dict[str, Any]:
+        """
+        Send the given property updates to the device in a single control request.
+
+        Unlike execute_queued_updates this does not touch device.property_updates,
+        which lets callers (e.g. the CommandDispatcher) manage their own queues.
+        It is serialized with all other submissions for the same device.
+        """
+        # callers may keep changing their dict while waiting for the lock
+        updates = dict(updates)
+        async with device.lock:
+            return await self._send_updates(device, updates)
+
+    async def _send_updates(
+        self, device: Device, updates: Dict[str, PropertyStatus]
+    ) -> Dict[str, Any]:
+        # the caller holds device.lock
+        builder = device.command_builder
+        body = encode_control_body(
+            device.device_id,
+            device.echonet_node,
+            device.echonet_object,
+            [builder.encoded(val) for val in updates.values()],
+        )
+
+        json_body = await self.send_post_content(
             f"/control/deviceControl?boxId={device.box.boxId}&appSecret={self.app_secret}",
             body,
         )
@@ -208,15 +570,32 @@ class Cocoro:
             if errors:
                 raise Exception("Cocoro API Error: " + ",".join(errors))
 
-        for status in device.property_updates.values():
-            for i, s in enumerate(device.status):
-                if s.statusCode == status.statusCode:
-                    device.status[i] = status
-
-        device.property_updates.clear()
+        sent = list(updates.values())
+        control_ids = self._control_ids_for(
+            control_list_response.control_list or [], sent
+        )
+        # status lists are replaced, never mutated, so readers holding one stay consistent
+        previous = device.status
+        device.status = device.optimistic.apply(list(previous), sent, control_ids)
+        self._notify_status(device, previous)
 
         return json_body
 
+    @staticmethod
+    def _control_ids_for(
+        rows: List[Dict[str, Union[str, None]]], sent: List[PropertyStatus]
+    ) -> List[Optional[str]]:
+        # rows carry the EPC of the property they control when available,
+        # otherwise they are returned in the order the statuses were sent
+        by_epc = {
+            str(row["epc"]).upper(): row.get("id") for row in rows if row.get("epc")
+        }
+        if by_epc:
+            return [by_epc.get(s.statusCode.upper()) for s in sent]
+
+        ids: List[Optional[str]] = [row.get("id") for row in rows]
+        return (ids + [None] * len(sent))[: len(sent)]
+
     async def check_control_results(
         self, device: Device, control_ids: List[str]
     ) -> ControlResultResponse:
@@ -230,14 +609,22 @@ class Cocoro:
         Returns:
             ControlResultResponse with current status of each control
         """
-        body = {"resultList": [{"id": control_id} for control_id in control_ids]}
+        body = encode_result_body(control_ids)
 
-        json_body = await self.send_post_request(
+        json_body = await self.send_post_content(
             f"/control/controlResult?boxId={device.box.boxId}&appSecret={self.app_secret}",
             body,
+            priority=Priority.CONTROL_RESULT,
         )
 
-        return ControlResultResponse(**json_body)
+        result = ControlResultResponse(**json_body)
+        previous = device.status
+        status = device.optimistic.resolve(list(previous), result.resultList)
+        if status != previous:
+            device.status = status
+            self._notify_status(device, previous)
+
+        return result
 
     async def wait_for_control_completion(
         self,
@@ -299,6 +686,33 @@ class Cocoro:
             # Wait before next poll
             await asyncio.sleep(poll_interval)
 
+    async def refresh_device(
+        self, device: Device, priority: Priority = Priority.REFRESH
+    ) -> Device:
+        """
+        Re-fetch properties and status of a single device in place.
+
+        Updates that were sent but not yet confirmed stay visible on top of the
+        refreshed status, see OptimisticState. When refreshes of the same device
+        overlap, a response that arrives after that of a later refresh is
+        dropped.
+        """
+        token = device.begin_refresh()
+        properties_and_status = await self.query_box_properties(
+            device.box, priority=priority
+        )
+        if not device.accept_refresh(token):
+            return device
+
+        previous = device.status
+        device.properties = cast(List[Property], properties_and_status["properties"])
+        device.status = device.optimistic.reconcile(
+            cast(List[PropertyStatus], properties_and_status["status"])
+        )
+        self._notify_status(device, previous)
+
+        return device
+
     async def fetch_device(self, device: Device) -> Device:
         devices = await self.query_devices()
         for d in devices:
@@ -0,0 +1,113 @@
+"""Precompiled, cached command construction per device schema."""
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple, Union
+from enum import Enum
+
+from .properties import (
+    BinaryPropertyStatus,
+    DeviceType,
+    PropertyStatus,
+    SinglePropertyStatus,
+)
+from .encoding import encode_status
+from .validation import PropertyValidator
+
+_EncodedKey = Tuple[str, str, str]
+_SchemaKey = Tuple[DeviceType, Optional[str], FrozenSet[Tuple[str, FrozenSet[str]]]]
+
+# statuses and encodings kept per builder, the oldest entries are dropped first
+MAX_CACHED_COMMANDS = 256
+# builders shared between devices with the same schema
+MAX_CACHED_BUILDERS = 64
+
+
+def _code(value: Union[str, Enum]) -> str:
+    if isinstance(value, Enum):
+        return str(value.value)
+    return value
+
+
+def _remember(cache: Dict, key: object, value: object) -> None:
+    if len(cache) >= MAX_CACHED_COMMANDS:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+class CommandBuilder:
+    """
+    Builds property updates for one device schema.
+
+    Valid codes of every single-value property are precomputed once, and the
+    resulting PropertyStatus objects and their encoded JSON are cached
+    per (statusCode, value), so building a batch of commands is mostly
+    dictionary lookups. Builders are shared by devices whose schemas allow
+    the same codes, see for_schema().
+    """
+
+    _schemas: "OrderedDict[_SchemaKey, CommandBuilder]" = OrderedDict()
+
+    def __init__(self, valid_codes: Mapping[str, FrozenSet[str]]):
+        self.valid_codes: Dict[str, FrozenSet[str]] = dict(valid_codes)
+        self._single: Dict[Tuple[str, str], SinglePropertyStatus] = {}
+        self._binary: Dict[Tuple[str, str], BinaryPropertyStatus] = {}
+        self._encoded: Dict[_EncodedKey, bytes] = {}
+
+    def supports(self, status_code: Union[str, Enum], value: Union[str, Enum]) -> bool:
+        """Whether the schema allows value. Codes without a value list accept anything."""
+        codes = self.valid_codes.get(_code(status_code))
+        return codes is None or _code(value) in codes
+
+    def single(
+        self, status_code: Union[str, Enum], value: Union[str, Enum]
+    ) -> SinglePropertyStatus:
+        key = (_code(status_code), _code(value))
+        status = self._single.get(key)
+        if status is None:
+            if not self.supports(*key):
+                raise ValueError(f"Invalid value {key[1]} for property {key[0]}")
+            status = SinglePropertyStatus(key[0], {"code": key[1]})
+            _remember(self._single, key, status)
+        return status
+
+    def binary(self, status_code: Union[str, Enum], value: str) -> BinaryPropertyStatus:
+        key = (_code(status_code), value)
+        status = self._binary.get(key)
+        if status is None:
+            status = BinaryPropertyStatus(key[0], {"code": value})
+            _remember(self._binary, key, status)
+        return status
+
+    def encoded(self, status: PropertyStatus) -> bytes:
+        """Cached JSON encoding of a status. Statuses carrying more than a code are not cached."""
+        code = status.value_code
+        value_type = _code(status.valueType)
+        value = getattr(status, value_type, None)
+        if code is None or not isinstance(value, dict) or len(value) != 1:
+            return encode_status(status)
+
+        key = (_code(status.statusCode), value_type, code)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = encode_status(status)
+            _remember(self._encoded, key, encoded)
+        return encoded
+
+    @classmethod
+    def for_schema(
+        cls, kind: DeviceType, model: Optional[str], validators: Mapping[str, PropertyValidator]
+    ) -> "CommandBuilder":
+        """Builder for a device, shared with devices of the same model and allowed codes."""
+        valid_codes = {
+            code: validator.codes
+            for code, validator in validators.items()
+            if validator.codes is not None
+        }
+        key: _SchemaKey = (kind, model, frozenset(valid_codes.items()))
+        builder = cls._schemas.get(key)
+        if builder is None:
+            builder = cls._schemas[key] = cls(valid_codes)
+            if len(cls._schemas) > MAX_CACHED_BUILDERS:
+                cls._schemas.popitem(last=False)
+        else:
+            cls._schemas.move_to_end(key)
+        return builder
@@ -1,7 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
-from .properties import DeviceType, Property, PropertyStatus, SinglePropertyStatus, RangePropertyStatus, BinaryPropertyStatus, SingleProperty
+from .properties import enum_to_str, DeviceType, Property, PropertyStatus, SinglePropertyStatus, RangePropertyStatus, BinaryPropertyStatus, SingleProperty
 from .response_types import Box
+from .optimistic import OptimisticState
+from .commands import CommandBuilder
+from .validation import PropertyValidator, compile_validators
 
 class Device(ABC):
     def __init__(self, name: str, kind: DeviceType, device_id: int, echonet_node: str, echonet_object: str,
@@ -11,13 +15,60 @@ class Device(ABC):
         self.device_id = device_id
         self.echonet_node = echonet_node
         self.echonet_object = echonet_object
+        self._command_builder: Optional[CommandBuilder] = None
         self.properties = properties
         self.status = status
         self.property_updates: Dict[str, PropertyStatus] = {}
+        # updates that were sent but not yet confirmed by the cloud
+        self.optimistic = OptimisticState(reflects=self.status_reflects)
         self.maker = maker
         self.model = model
         self.serial_number = serial_number
         self.box = box
+        self._lock: Optional[asyncio.Lock] = None
+        # refreshes started / newest refresh applied, so late responses don't win
+        self._refresh_started = 0
+        self._refresh_applied = 0
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        """Serializes submissions of the queued updates of this device."""
+        # created lazily so it binds to the loop that uses the device
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def take_queued_updates(self) -> Dict[str, PropertyStatus]:
+        """Snapshot of the queued updates, they stay queued until discard_sent_updates()."""
+        return dict(self.property_updates)
+
+    def discard_sent_updates(self, sent: Dict[str, PropertyStatus]) -> None:
+        """Dequeue sent updates, except those that were queued again in the meantime."""
+        for code, status in sent.items():
+            if self.property_updates.get(code) is status:
+                del self.property_updates[code]
+
+    def begin_refresh(self) -> int:
+        self._refresh_started += 1
+        return self._refresh_started
+
+    def accept_refresh(self, token: int) -> bool:
+        """False if a refresh that started later was already applied."""
+        if token < self._refresh_applied:
+            return False
+        self._refresh_applied = token
+        return True
+
+    @staticmethod
+    def status_reflects(sent: PropertyStatus, current: PropertyStatus) -> bool:
+        """Whether the fetched `current` status shows the `sent` update as applied."""
+        return sent == current
+
+    @property
+    def command_builder(self) -> CommandBuilder:
+        if self._command_builder is None:
+            self._command_builder = CommandBuilder.for_schema(self.kind, self.model, self.validators)
+        return self._command_builder
 
     @abstractmethod
     def queue_power_on(self) -> None:
@@ -27,19 +78,37 @@ class Device(ABC):
     def queue_power_off(self) -> None:
         pass
 
+    @property
+    def properties(self) -> List[Property]:
+        return self._properties
+
+    @properties.setter
+    def properties(self, properties: List[Property]) -> None:
+        self._properties = properties
+        # compiled lazily from the schema, see validators
+        self._validators: Optional[Dict[str, PropertyValidator]] = None
+        self._command_builder = None
+        self._properties_by_code = {prop.statusCode: prop for prop in properties}
+
+    @property
+    def validators(self) -> Dict[str, PropertyValidator]:
+        if self._validators is None:
+            self._validators = compile_validators(self._properties)
+        return self._validators
+
     def queue_property_status_update(self, property_status: PropertyStatus) -> None:
         status_code = property_status.statusCode
-        for property in self.properties:
-            if property.statusCode != status_code:
-                continue
-
-            if not property.set:
-                raise ValueError(f"property {property.statusName} is not settable")
+        validator = self.validators.get(status_code)
+        if validator is None:
+            raise ValueError(f"property {status_code} does not exist on this device")
 
-            self.property_updates[property.statusCode] = property_status
-            return
+        # rejects unsettable properties and values outside the schema before any request
+        validator.validate(property_status)
+        self.property_updates[validator.status_code] = property_status
 
-        raise ValueError(f"property {status_code} does not exist on this device")
+    def is_settable(self, status_code: str) -> bool:
+        prop = self.get_property(status_code)
+        return prop is not None and prop.set
 
     def get_all_properties(self) -> List[Property]:
         statuses = self.status
@@ -53,7 +122,7 @@ class Device(ABC):
         return out
         
     def get_property(self, status_code: str) -> Optional[Property]:
-        return next((prop for prop in self.properties if prop.statusCode == status_code), None)
+        return self._properties_by_code.get(enum_to_str(status_code))
 
     def get_property_status(self, status_code: str) -> Optional[PropertyStatus]:
         return next((status for status in self.status if status.statusCode == status_code), None)
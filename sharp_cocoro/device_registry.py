@@ -0,0 +1,121 @@
+"""Identity-stable Device objects that are updated in place between queries."""
+import weakref
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .device import Device
+from .properties import Property, PropertyStatus
+from .response_types import Box
+
+# Builds a new device for a box, e.g. devices.registry.build_device
+DeviceFactory = Callable[[Box, List[Property], List[PropertyStatus]], Device]
+
+
+class DeviceRegistry:
+    """
+    Keeps one Device object per device_id across queries.
+
+    When a device shows up again its existing object is updated in place
+    (box, name, properties and status, with pending optimistic updates kept),
+    so references held by callers never go stale and polling does not churn
+    a new object per device.
+
+    Devices that vanish from boxInfo are dropped with retain(). With
+    `max_devices`, the least recently updated devices beyond that number
+    are only held weakly: they are freed as soon as nobody else references
+    them, and reused if they are updated again while still referenced.
+    """
+
+    def __init__(self, max_devices: Optional[int] = None):
+        if max_devices is not None and max_devices < 1:
+            raise ValueError("max_devices must be at least 1")
+        self.max_devices = max_devices
+        self._strong: "OrderedDict[int, Device]" = OrderedDict()
+        self._weak: "weakref.WeakValueDictionary[int, Device]" = weakref.WeakValueDictionary()
+        # every device seen and not removed, including weakly held ones that were freed
+        self._ids: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._weak)
+
+    def __contains__(self, device_id: object) -> bool:
+        return device_id in self._weak
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(list(self._weak.values()))
+
+    def get(self, device_id: int) -> Optional[Device]:
+        return self._weak.get(device_id)
+
+    def upsert(
+        self,
+        box: Box,
+        properties: List[Property],
+        status: List[PropertyStatus],
+        factory: DeviceFactory,
+        token: Optional[int] = None,
+    ) -> Tuple[Device, Optional[List[PropertyStatus]]]:
+        """
+        Update the device of `box` in place, or build it with `factory`.
+
+        `token` is the device's begin_refresh() token taken before the
+        request was sent (see begin_token). If a refresh that started later
+        was already applied, the status is left as it is, the response is
+        older than what the device shows.
+
+        Returns the device and its status before the update (None if the
+        device is new).
+        """
+        echonet_data = box.echonetData[0]
+        device = self._weak.get(echonet_data.deviceId)
+        if device is None or device.kind.value != echonet_data.labelData.deviceType:
+            # new, or the box now reports a different kind of device
+            device = factory(box, properties, status)
+            previous = None
+        else:
+            previous = device.status
+            device.box = box
+            device.name = echonet_data.labelData.name
+            if token is None or device.accept_refresh(token):
+                if properties is not device.properties and properties != device.properties:
+                    # the setter drops compiled validators, so only assign real changes
+                    device.properties = properties
+                device.status = device.optimistic.reconcile(status)
+
+        self._keep(device)
+        return device, previous
+
+    def begin_token(self, box: Box) -> Optional[int]:
+        """Start a refresh of the known device of `box`, the token to pass to upsert()."""
+        device = self._weak.get(box.echonetData[0].deviceId)
+        return device.begin_refresh() if device is not None else None
+
+    def _keep(self, device: Device) -> None:
+        self._ids.add(device.device_id)
+        self._weak[device.device_id] = device
+        self._strong[device.device_id] = device
+        self._strong.move_to_end(device.device_id)
+        if self.max_devices is not None:
+            while len(self._strong) > self.max_devices:
+                self._strong.popitem(last=False)
+
+    def retain(self, device_ids: Iterable[int]) -> List[int]:
+        """
+        Drop all devices but `device_ids`. Returns the dropped ids, also of
+        devices that were already freed.
+        """
+        keep = set(device_ids)
+        evicted = [device_id for device_id in self._ids if device_id not in keep]
+        for device_id in evicted:
+            self.remove(device_id)
+        return evicted
+
+    def remove(self, device_id: int) -> None:
+        self._ids.discard(device_id)
+        self._strong.pop(device_id, None)
+        self._weak.pop(device_id, None)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._strong.clear()
+        self._weak.clear()
@@ -1,10 +1,44 @@
 from typing import Union
 from ...device import Device
-from ...properties import BinaryPropertyStatus, RangePropertyStatus, SinglePropertyStatus, enum_to_str
-from ...state import State8
+from ...properties import BinaryPropertyStatus, PropertyStatus, RangePropertyStatus, SinglePropertyStatus, enum_to_str
+from ...state import State8, command_applied, fan_direction_command, temperature_command
 from .aircon_properties import StatusCode, ValueSingle, FanDirection
 
+OPERATION_MODES = frozenset([
+    ValueSingle.OPERATION_OTHER,
+    ValueSingle.OPERATION_AUTO,
+    ValueSingle.OPERATION_COOL,
+    ValueSingle.OPERATION_HEAT,
+    ValueSingle.OPERATION_DEHUMIDIFY,
+    ValueSingle.OPERATION_VENTILATION
+])
+
+WINDSPEEDS = frozenset([
+    ValueSingle.WINDSPEED_LEVEL_1,
+    ValueSingle.WINDSPEED_LEVEL_2,
+    ValueSingle.WINDSPEED_LEVEL_3,
+    ValueSingle.WINDSPEED_LEVEL_4,
+    ValueSingle.WINDSPEED_LEVEL_5,
+    ValueSingle.WINDSPEED_LEVEL_6,
+    ValueSingle.WINDSPEED_LEVEL_7,
+    ValueSingle.WINDSPEED_LEVEL_8,
+    ValueSingle.WINDSPEED_LEVEL_AUTO
+])
+
 class Aircon(Device):
+    @staticmethod
+    def status_reflects(sent: PropertyStatus, current: PropertyStatus) -> bool:
+        # State8 commands only carry the fields they change, compare those
+        if (
+            isinstance(sent, BinaryPropertyStatus)
+            and isinstance(current, BinaryPropertyStatus)
+            and sent.statusCode == enum_to_str(StatusCode.STATE_DETAIL)
+            and sent.value_code is not None
+            and current.value_code is not None
+        ):
+            return command_applied(sent.value_code, current.value_code)
+        return sent == current
+
     def get_state8(self) -> State8:
         state8_bin = self.get_property_status(StatusCode.STATE_DETAIL)
         assert isinstance(state8_bin, BinaryPropertyStatus)
@@ -37,21 +71,17 @@ class Aircon(Device):
         st = self.get_state8()
         return FanDirection(st.fan_direction)
 
-    def queue_fan_direction_update(self, fs: str) -> None:
-        s8 = State8("c20000000000c000000000000000000000000000000000000000000000000000000000000000000000000000000000000101000000000000000000000000000000000000000000000000000000000000")
-        s8.fan_direction = int(fs)
+    def fan_direction_status(self, fs: str) -> BinaryPropertyStatus:
+        return self.command_builder.binary(StatusCode.STATE_DETAIL, fan_direction_command(int(fs)))
 
-        self.queue_property_status_update(BinaryPropertyStatus(StatusCode.STATE_DETAIL, {
-            "code": s8.state
-        }))
+    def temperature_status(self, temp: float) -> BinaryPropertyStatus:
+        return self.command_builder.binary(StatusCode.STATE_DETAIL, temperature_command(temp))
 
-    def queue_temperature_update(self, temp: float) -> None:
-        s8 = State8()
-        s8.temperature = temp
+    def queue_fan_direction_update(self, fs: str) -> None:
+        self.queue_property_status_update(self.fan_direction_status(fs))
 
-        self.queue_property_status_update(BinaryPropertyStatus(StatusCode.STATE_DETAIL, {
-            "code": s8.state
-        }))
+    def queue_temperature_update(self, temp: float) -> None:
+        self.queue_property_status_update(self.temperature_status(temp))
 
         # self.queue_property_status_update({
         #     'statusCode': StatusCode.STATE_DETAIL,
@@ -62,9 +92,7 @@ class Aircon(Device):
         # })
 
     def queue_power_on(self) -> None:
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.POWER, {
-            "code": ValueSingle.POWER_ON.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.POWER, ValueSingle.POWER_ON))
 
         # self.queue_property_status_update({
         #     'statusCode': StatusCode.POWER,
@@ -75,9 +103,7 @@ class Aircon(Device):
         # })
 
     def queue_power_off(self) -> None:
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.POWER, {
-            "code": ValueSingle.POWER_OFF.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.POWER, ValueSingle.POWER_OFF))
 
         # self.queue_property_status_update({
         #     'statusCode': StatusCode.POWER,
@@ -88,20 +114,10 @@ class Aircon(Device):
         # })
 
     def queue_operation_mode_update(self, mode: ValueSingle) -> None:
-        valid_modes = [
-            ValueSingle.OPERATION_OTHER,
-            ValueSingle.OPERATION_AUTO,
-            ValueSingle.OPERATION_COOL,
-            ValueSingle.OPERATION_HEAT,
-            ValueSingle.OPERATION_DEHUMIDIFY,
-            ValueSingle.OPERATION_VENTILATION
-        ]
-        if mode not in valid_modes:
+        if mode not in OPERATION_MODES:
             raise ValueError(f"Invalid operation mode: {mode}")
 
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.OPERATION_MODE, {
-            "code": mode.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.OPERATION_MODE, mode))
 
         # self.queue_property_status_update({
         #     'statusCode': StatusCode.OPERATION_MODE,
@@ -112,23 +128,10 @@ class Aircon(Device):
         # })
 
     def queue_windspeed_update(self, mode: Union[ValueSingle, str]) -> None:
-        valid_modes = [
-            ValueSingle.WINDSPEED_LEVEL_1,
-            ValueSingle.WINDSPEED_LEVEL_2,
-            ValueSingle.WINDSPEED_LEVEL_3,
-            ValueSingle.WINDSPEED_LEVEL_4,
-            ValueSingle.WINDSPEED_LEVEL_5,
-            ValueSingle.WINDSPEED_LEVEL_6,
-            ValueSingle.WINDSPEED_LEVEL_7,
-            ValueSingle.WINDSPEED_LEVEL_8,
-            ValueSingle.WINDSPEED_LEVEL_AUTO
-        ]
-        if mode not in valid_modes:
+        if mode not in WINDSPEEDS:
             raise ValueError(f"Invalid windspeed mode: {mode}")
 
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.WINDSPEED, {
-            "code": enum_to_str(mode)
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.WINDSPEED, mode))
 
         # self.queue_property_status_update({
         #     'statusCode': StatusCode.WINDSPEED,
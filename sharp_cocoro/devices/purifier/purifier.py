@@ -2,6 +2,22 @@ from ...device import Device
 from ...properties import RangePropertyStatus, SinglePropertyStatus
 from .purifier_properties import StatusCode, ValueSingle
 
+OPERATION_MODES = frozenset([
+    ValueSingle.OPERATION_AUTO,
+    ValueSingle.OPERATION_MANUAL,
+    ValueSingle.OPERATION_POLLEN,
+    ValueSingle.OPERATION_QUIET
+])
+
+AIR_VOLUMES = frozenset([
+    ValueSingle.AIR_VOLUME_AUTO,
+    ValueSingle.AIR_VOLUME_QUIET,
+    ValueSingle.AIR_VOLUME_LOW,
+    ValueSingle.AIR_VOLUME_MEDIUM,
+    ValueSingle.AIR_VOLUME_HIGH,
+    ValueSingle.AIR_VOLUME_TURBO
+])
+
 class Purifier(Device):
     def get_power_status(self) -> ValueSingle:
         status = self.get_property_status(StatusCode.POWER)
@@ -39,41 +55,19 @@ class Purifier(Device):
         return int(status.valueRange['code'])
 
     def queue_power_on(self) -> None:
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.POWER, {
-            "code": ValueSingle.POWER_ON.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.POWER, ValueSingle.POWER_ON))
 
     def queue_power_off(self) -> None:
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.POWER, {
-            "code": ValueSingle.POWER_OFF.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.POWER, ValueSingle.POWER_OFF))
 
     def queue_operation_mode_update(self, mode: ValueSingle) -> None:
-        valid_modes = [
-            ValueSingle.OPERATION_AUTO,
-            ValueSingle.OPERATION_MANUAL,
-            ValueSingle.OPERATION_POLLEN,
-            ValueSingle.OPERATION_QUIET
-        ]
-        if mode not in valid_modes:
+        if mode not in OPERATION_MODES:
             raise ValueError(f"Invalid operation mode: {mode}")
 
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.OPERATION_MODE, {
-            "code": mode.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.OPERATION_MODE, mode))
 
     def queue_air_volume_update(self, volume: ValueSingle) -> None:
-        valid_volumes = [
-            ValueSingle.AIR_VOLUME_AUTO,
-            ValueSingle.AIR_VOLUME_QUIET,
-            ValueSingle.AIR_VOLUME_LOW,
-            ValueSingle.AIR_VOLUME_MEDIUM,
-            ValueSingle.AIR_VOLUME_HIGH,
-            ValueSingle.AIR_VOLUME_TURBO
-        ]
-        if volume not in valid_volumes:
+        if volume not in AIR_VOLUMES:
             raise ValueError(f"Invalid air volume: {volume}")
 
-        self.queue_property_status_update(SinglePropertyStatus(StatusCode.AIR_VOLUME, {
-            "code": volume.value
-        }))
+        self.queue_property_status_update(self.command_builder.single(StatusCode.AIR_VOLUME, volume))
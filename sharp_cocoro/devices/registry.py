@@ -0,0 +1,125 @@
+"""Maps each DeviceType to the Device class that is built for it."""
+import importlib
+import sys
+from typing import Dict, List, Optional, Type, Union
+
+from ..device import Device
+from ..properties import DeviceType, Property, PropertyStatus
+from ..response_types import Box
+
+# Either a class or a "package.module:ClassName" path that is imported the
+# first time a device of that type is built.
+DeviceClassRef = Union[str, Type[Device]]
+
+# Third-party packages can also register classes without importing
+# sharp_cocoro, by exposing an entry point in this group named after the
+# DeviceType value, e.g. `HEALSIO = "my_package.healsio:Healsio"`.
+ENTRY_POINT_GROUP = "sharp_cocoro.devices"
+
+_FALLBACK = "sharp_cocoro.devices.unknown:UnknownDevice"
+
+_registry: Dict[DeviceType, DeviceClassRef] = {
+    DeviceType.AirCondition: "sharp_cocoro.devices.aircon.aircon:Aircon",
+    DeviceType.AirCleaner: "sharp_cocoro.devices.purifier.purifier:Purifier",
+}
+_resolved: Dict[str, Type[Device]] = {}
+_entry_points_loaded = False
+
+
+def register_device_class(
+    device_type: Union[DeviceType, str], cls: DeviceClassRef, replace: bool = False
+) -> None:
+    """
+    Use `cls` for devices of `device_type`.
+
+    Args:
+        device_type: the DeviceType (or its value, e.g. "HEALSIO")
+        cls: a Device subclass, or a "module:ClassName" path to import lazily
+        replace: allow overriding a class that is already registered
+    """
+    device_type = DeviceType(device_type)
+    if not replace and device_type in _registry:
+        raise ValueError(f"a device class is already registered for {device_type.value}")
+    if isinstance(cls, str) and ":" not in cls:
+        raise ValueError(f"expected 'module:ClassName', got {cls!r}")
+    _registry[device_type] = cls
+
+
+def unregister_device_class(device_type: Union[DeviceType, str]) -> None:
+    _registry.pop(DeviceType(device_type), None)
+
+
+def registered_device_types() -> List[DeviceType]:
+    _load_entry_points()
+    return list(_registry)
+
+
+def get_device_class(device_type: DeviceType) -> Type[Device]:
+    """The class registered for `device_type`, UnknownDevice if there is none."""
+    _load_entry_points()
+    ref = _registry.get(device_type, _FALLBACK)
+    if not isinstance(ref, str):
+        return ref
+
+    cls = _resolved.get(ref)
+    if cls is None:
+        cls = _resolved[ref] = _import_class(ref)
+    return cls
+
+
+def build_device(
+    box: Box,
+    properties: List[Property],
+    status: List[PropertyStatus],
+    device_type: Optional[DeviceType] = None,
+) -> Device:
+    """
+    Build the device of a box with the class registered for its type.
+
+    `device_type` is parsed from the box unless it is passed.
+    """
+    echonet_data = box.echonetData[0]
+    if device_type is None:
+        device_type = DeviceType(echonet_data.labelData.deviceType)
+    return get_device_class(device_type)(
+        name=echonet_data.labelData.name,
+        kind=device_type,
+        device_id=echonet_data.deviceId,
+        echonet_node=echonet_data.echonetNode,
+        echonet_object=echonet_data.echonetObject,
+        properties=properties,
+        status=status,
+        maker=echonet_data.maker,
+        model=echonet_data.model,
+        serial_number=echonet_data.serialNumber or "",
+        box=box,
+    )
+
+
+def _import_class(path: str) -> Type[Device]:
+    module_name, _, class_name = path.partition(":")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(cls, type) and issubclass(cls, Device)):
+        raise TypeError(f"{path} is not a Device subclass")
+    return cls
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    from importlib.metadata import entry_points
+
+    if sys.version_info >= (3, 10):
+        group = entry_points(group=ENTRY_POINT_GROUP)
+    else:
+        group = entry_points().get(ENTRY_POINT_GROUP, ())
+    for ep in group:
+        try:
+            device_type = DeviceType(ep.name)
+        except ValueError:
+            continue
+        # explicit register_device_class() calls win over installed plugins
+        _registry.setdefault(device_type, ep.value)
@@ -0,0 +1,26 @@
+"""Result type of deadline-bound discovery, see Cocoro.discover()."""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .device import Device
+from .response_types import Box
+
+
+@dataclass
+class DiscoveryResult:
+    # devices whose properties arrived before the deadline, in boxInfo order
+    devices: List[Device] = field(default_factory=list)
+    # boxes that had not answered by the deadline
+    pending: List[Box] = field(default_factory=list)
+    # boxId -> error for boxes that failed before the deadline
+    failed: Dict[str, BaseException] = field(default_factory=dict)
+    # devices from an earlier discovery for the pending boxes, possibly outdated
+    stale: List[Device] = field(default_factory=list)
+    elapsed: float = 0.0
+    # with keep_stragglers, resolves to a DiscoveryResult of the late boxes
+    stragglers: Optional["asyncio.Task[DiscoveryResult]"] = None
+
+    @property
+    def complete(self) -> bool:
+        return not self.pending and not self.failed
@@ -0,0 +1,146 @@
+"""Debounced, coalescing command dispatch for interactive device control."""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from .device import Device
+from .properties import PropertyStatus
+
+if TYPE_CHECKING:
+    from .cocoro import Cocoro
+
+
+@dataclass
+class _PendingBatch:
+    device: Device
+    future: "asyncio.Future[Dict[str, Any]]"
+    first_submitted: float
+    updates: Dict[str, PropertyStatus] = field(default_factory=dict)
+    handle: Optional[asyncio.TimerHandle] = None
+
+
+class CommandDispatcher:
+    """
+    Coalesce rapid-fire control requests per device.
+
+    Every call to submit() moves the device's queued updates into a pending
+    batch and (re)starts a debounce timer. When the timer fires, one
+    /control/deviceControl request is sent containing only the latest value
+    per statusCode. All callers that contributed to the batch share the same
+    future. Batches go through Cocoro.execute_updates, so they are serialized
+    with other commands for the same device.
+
+    Example:
+        dispatcher = CommandDispatcher(cocoro, window=0.3)
+        for temp in (22.0, 22.5, 23.0):
+            aircon.queue_temperature_update(temp)
+            fut = dispatcher.submit(aircon)
+        await fut  # a single request with temperature 23.0 was sent
+    """
+
+    def __init__(self, cocoro: "Cocoro", window: float = 0.25, max_delay: float = 1.0):
+        """
+        Args:
+            cocoro: Client used to send the merged updates
+            window: Quiet period in seconds before a batch is sent
+            max_delay: Upper bound in seconds a batch may be held back while
+                new submissions keep arriving
+        """
+        self.cocoro = cocoro
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self._pending: Dict[int, _PendingBatch] = {}
+        self._inflight: Dict[int, "asyncio.Task[None]"] = {}
+
+    def submit(self, device: Device) -> "asyncio.Future[Dict[str, Any]]":
+        """
+        Take the device's queued updates and schedule them for sending.
+
+        Returns a future resolving to the deviceControl response of the batch
+        the updates ended up in.
+        """
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+
+        batch = self._pending.get(device.device_id)
+        if batch is None:
+            batch = _PendingBatch(
+                device=device, future=loop.create_future(), first_submitted=now
+            )
+            self._pending[device.device_id] = batch
+
+        # later values for the same statusCode replace earlier ones
+        batch.device = device
+        batch.updates.update(device.property_updates)
+        device.property_updates.clear()
+
+        if batch.handle is not None:
+            batch.handle.cancel()
+        delay = min(self.window, batch.first_submitted + self.max_delay - now)
+        batch.handle = loop.call_later(max(delay, 0), self._start_flush, device.device_id)
+
+        return batch.future
+
+    def _start_flush(self, device_id: int) -> None:
+        batch = self._pending.pop(device_id, None)
+        if batch is None:
+            return
+        if batch.handle is not None:
+            batch.handle.cancel()
+
+        previous = self._inflight.get(device_id)
+        task = asyncio.ensure_future(self._send(batch, previous))
+        self._inflight[device_id] = task
+        task.add_done_callback(lambda t: self._forget(device_id, t))
+
+    def _forget(self, device_id: int, task: "asyncio.Task[None]") -> None:
+        if self._inflight.get(device_id) is task:
+            del self._inflight[device_id]
+
+    async def _send(
+        self,
+        batch: _PendingBatch,
+        previous: Optional["asyncio.Task[None]"],
+    ) -> None:
+        # keep requests for the same device ordered, so the latest value wins
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        try:
+            if batch.updates:
+                result = await self.cocoro.execute_updates(batch.device, batch.updates)
+            else:
+                result = {}
+        except Exception as e:
+            # the error is delivered through the shared future
+            if not batch.future.done():
+                batch.future.set_exception(e)
+                # mark it retrieved, every waiter may have gone away already
+                batch.future.exception()
+            return
+        if not batch.future.done():
+            batch.future.set_result(result)
+
+    @property
+    def pending_devices(self) -> int:
+        """Number of devices with a batch waiting for its debounce window."""
+        return len(self._pending)
+
+    async def flush(self, device: Optional[Device] = None) -> None:
+        """Send pending batches immediately and wait until they are done."""
+        device_ids = [device.device_id] if device is not None else list(self._pending)
+        for device_id in device_ids:
+            self._start_flush(device_id)
+
+        tasks = [
+            task
+            for device_id, task in self._inflight.items()
+            if device is None or device_id == device.device_id
+        ]
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def close(self) -> None:
+        """Flush all pending batches."""
+        await self.flush()
@@ -0,0 +1,63 @@
+"""Encode control request bodies straight to bytes."""
+import json
+from typing import Any, Iterable
+
+from .properties import PropertyStatus
+
+try:
+    import orjson  # type: ignore
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON encoding, using orjson when it is installed."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_status(status: PropertyStatus) -> bytes:
+    return dumps(status.to_map())
+
+
+def encode_control_body(
+    device_id: int, echonet_node: str, echonet_object: str, status_fragments: Iterable[bytes]
+) -> bytes:
+    """
+    Body of a /control/deviceControl request for one device.
+
+    status_fragments are already encoded statuses (see encode_status), so
+    callers can cache them instead of rebuilding dicts for every request.
+    """
+    return b"".join(
+        (
+            b'{"controlList":[{"deviceId":',
+            dumps(device_id),
+            b',"echonetNode":',
+            dumps(echonet_node),
+            b',"echonetObject":',
+            dumps(echonet_object),
+            b',"status":[',
+            b",".join(status_fragments),
+            b"]}]}",
+        )
+    )
+
+
+def encode_result_body(control_ids: Iterable[str]) -> bytes:
+    """Body of a /control/controlResult request."""
+    return b"".join(
+        (
+            b'{"resultList":[',
+            b",".join(b'{"id":' + dumps(control_id) + b"}" for control_id in control_ids),
+            b"]}",
+        )
+    )
@@ -0,0 +1,291 @@
+"""Columnar export of device snapshots to Apache Arrow and Parquet."""
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .device import Device
+from .properties import (
+    BinaryPropertyStatus,
+    DeviceType,
+    RangeProperty,
+    RangePropertyStatus,
+    SingleProperty,
+    SinglePropertyStatus,
+    enum_to_str,
+)
+from .state import State8
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# A point in time and the devices as they were then
+Snapshot = Tuple[float, Iterable[Device]]
+
+STATE8_CODE = "FA"
+
+# status column kinds, see FleetExporter._plan
+_SINGLE = "single"
+_INT = "int"
+_FLOAT = "float"
+_BINARY = "binary"
+
+
+def _label(device: Device) -> Any:
+    return device.box.echonetData[0].labelData
+
+
+# (column, arrow type name, getter) of the per-device metadata columns
+_METADATA: List[Tuple[str, str, Callable[[Device], Any]]] = [
+    ("device_id", "int64", lambda d: d.device_id),
+    ("box_id", "string", lambda d: d.box.boxId),
+    ("kind", "dictionary", lambda d: enum_to_str(d.kind)),
+    ("name", "string", lambda d: d.name),
+    ("place", "dictionary", lambda d: _label(d).place),
+    ("label_id", "int64", lambda d: _label(d).id),
+    ("maker", "dictionary", lambda d: d.maker),
+    ("model", "dictionary", lambda d: d.model),
+    ("serial_number", "string", lambda d: d.serial_number),
+    ("echonet_node", "string", lambda d: d.echonet_node),
+    ("echonet_object", "string", lambda d: d.echonet_object),
+]
+
+
+def _arrow_type(name: str) -> "pa.DataType":
+    return {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+    }[name]
+
+
+def _number(code: Optional[str], kind: str) -> Optional[float]:
+    if code is None:
+        return None
+    try:
+        return int(code) if kind == _INT else float(code)
+    except ValueError:
+        return None
+
+
+class FleetExporter:
+    """
+    Turns snapshots of devices into Arrow record batches with one row per
+    device and snapshot.
+
+    Besides timestamp and device/box/label metadata columns, every status
+    code becomes a typed column named `status_<code>`: the value code as a
+    dictionary-encoded string for valueSingle, int64 or float64 for
+    valueRange, and the raw hex string for valueBinary. Aircon State8 (FA)
+    blobs are additionally decoded into state8_temperature and
+    state8_fan_direction.
+
+    The status columns are taken from `status_codes`, or else from the
+    properties of the devices in the first snapshot; status codes that show
+    up later are not exported. Rows are buffered column by column and
+    emitted every `batch_size` rows, so memory stays bounded by one batch.
+
+    Example:
+        exporter = FleetExporter()
+        exporter.write_parquet("fleet.parquet", [(time.time(), devices)])
+    """
+
+    def __init__(
+        self,
+        status_codes: Optional[Sequence[str]] = None,
+        batch_size: int = 65536,
+        decode_state8: bool = True,
+    ):
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for exporting, install it with `pip install pyarrow`")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.status_codes = list(status_codes) if status_codes is not None else None
+        self.batch_size = batch_size
+        self.decode_state8 = decode_state8
+        self._status_kinds: Optional[Dict[str, str]] = None
+
+    def _plan(self, devices: Sequence[Device]) -> None:
+        kinds: Dict[str, str] = {}
+        for device in devices:
+            for prop in device.properties:
+                if not prop.get:
+                    continue
+                if isinstance(prop, SingleProperty):
+                    kind = _SINGLE
+                elif isinstance(prop, RangeProperty):
+                    kind = _INT if enum_to_str(prop.range_type) == "int" else _FLOAT
+                else:
+                    kind = _BINARY
+                previous = kinds.get(prop.statusCode)
+                if previous is not None and previous != kind:
+                    # same code typed differently by different models
+                    kind = _FLOAT if {previous, kind} == {_INT, _FLOAT} else _BINARY
+                kinds[prop.statusCode] = kind
+
+        if self.status_codes is not None:
+            kinds = {code: kinds.get(code, _BINARY) for code in self.status_codes}
+        self._status_kinds = dict(sorted(kinds.items()))
+
+    @property
+    def schema(self) -> "pa.Schema":
+        return self._schema(dictionary_encode=True)
+
+    def _schema(self, dictionary_encode: bool) -> "pa.Schema":
+        if self._status_kinds is None:
+            raise ValueError("the schema is known once the first snapshot was seen")
+
+        def field(name: str, type_name: str) -> "pa.Field":
+            if type_name == "dictionary" and not dictionary_encode:
+                type_name = "string"
+            return pa.field(name, _arrow_type(type_name))
+
+        fields = [pa.field("timestamp", pa.timestamp("ms", tz="UTC"))]
+        fields += [field(name, type_name) for name, type_name, _ in _METADATA]
+        for code, kind in self._status_kinds.items():
+            type_name = {_SINGLE: "dictionary", _INT: "int64", _FLOAT: "float64"}.get(kind, "string")
+            fields.append(field(f"status_{code}", type_name))
+        if self.decode_state8:
+            fields.append(pa.field("state8_temperature", pa.float64()))
+            fields.append(pa.field("state8_fan_direction", pa.int64()))
+        return pa.schema(fields)
+
+    def _status_value(self, status: Any, kind: str) -> Any:
+        if isinstance(status, SinglePropertyStatus):
+            return status.value_code if kind in (_SINGLE, _BINARY) else None
+        if isinstance(status, RangePropertyStatus):
+            return _number(status.value_code, kind) if kind in (_INT, _FLOAT) else status.value_code
+        if isinstance(status, BinaryPropertyStatus):
+            return status.value_code if kind == _BINARY else None
+        return None
+
+    def _state8(self, device: Device, statuses: Dict[str, Any]) -> Tuple[Optional[float], Optional[int]]:
+        blob = statuses.get(STATE8_CODE)
+        if device.kind != DeviceType.AirCondition or not isinstance(blob, BinaryPropertyStatus):
+            return None, None
+        code = blob.value_code
+        if not code:
+            return None, None
+        try:
+            state8 = State8(code)
+            return state8.temperature, state8.fan_direction
+        except (ValueError, IndexError):
+            return None, None
+
+    def record_batches(
+        self, snapshots: Iterable[Snapshot], dictionary_encode: bool = True
+    ) -> Iterator["pa.RecordBatch"]:
+        """
+        Yield record batches of at most batch_size rows.
+
+        Every batch has its own dictionaries. Pass dictionary_encode=False to
+        get plain string columns instead, e.g. for the Arrow IPC file format,
+        which allows only one dictionary per column for the whole file.
+        """
+        snapshots = iter(snapshots)
+        first = next(snapshots, None)
+        if first is None:
+            return
+        first_devices = list(first[1])
+        if self._status_kinds is None:
+            self._plan(first_devices)
+        assert self._status_kinds is not None
+
+        schema = self._schema(dictionary_encode)
+        status_kinds = list(self._status_kinds.items())
+        columns: List[List[Any]] = [[] for _ in schema]
+
+        def flush() -> "pa.RecordBatch":
+            arrays = []
+            for field, values in zip(schema, columns):
+                if pa.types.is_dictionary(field.type):
+                    arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+                else:
+                    arrays.append(pa.array(values, type=field.type))
+            for values in columns:
+                values.clear()
+            return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+        def rows() -> Iterator[Tuple[float, Device]]:
+            for device in first_devices:
+                yield first[0], device
+            for timestamp, devices in snapshots:
+                for device in devices:
+                    yield timestamp, device
+
+        count = 0
+        for timestamp, device in rows():
+            statuses = {s.statusCode: s for s in device.status}
+            i = 0
+            columns[i].append(int(timestamp * 1000))
+            for _, _, getter in _METADATA:
+                i += 1
+                columns[i].append(getter(device))
+            for code, kind in status_kinds:
+                i += 1
+                status = statuses.get(code)
+                columns[i].append(None if status is None else self._status_value(status, kind))
+            if self.decode_state8:
+                temperature, fan_direction = self._state8(device, statuses)
+                columns[i + 1].append(temperature)
+                columns[i + 2].append(fan_direction)
+
+            count += 1
+            if count == self.batch_size:
+                yield flush()
+                count = 0
+
+        if count:
+            yield flush()
+
+    def to_table(self, snapshots: Iterable[Snapshot]) -> "pa.Table":
+        batches = list(self.record_batches(snapshots))
+        if not batches:
+            raise ValueError("no snapshots to export")
+        return pa.Table.from_batches(batches)
+
+    def write_parquet(
+        self, path: str, snapshots: Iterable[Snapshot], compression: str = "zstd"
+    ) -> int:
+        """Stream the snapshots into a Parquet file. Returns the number of rows written."""
+        writer = None
+        rows = 0
+        try:
+            for batch in self.record_batches(snapshots):
+                if writer is None:
+                    writer = pq.ParquetWriter(path, batch.schema, compression=compression)
+                writer.write_table(pa.Table.from_batches([batch]))
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def write_ipc(self, path: str, snapshots: Iterable[Snapshot]) -> int:
+        """
+        Stream the snapshots into an Arrow IPC (Feather v2) file. Returns the
+        number of rows written.
+
+        String columns are written without dictionary encoding, the file
+        format cannot replace dictionaries between batches.
+        """
+        writer = None
+        rows = 0
+        try:
+            for batch in self.record_batches(snapshots, dictionary_encode=False):
+                if writer is None:
+                    writer = pa.ipc.new_file(path, batch.schema)
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+
+def devices_to_table(devices: Iterable[Device], timestamp: Optional[float] = None) -> "pa.Table":
+    """One snapshot of `devices` as an Arrow table."""
+    return FleetExporter().to_table([(time.time() if timestamp is None else timestamp, devices)])
@@ -0,0 +1,203 @@
+"""Incrementally maintained indexes for fleet-wide queries."""
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from .device import Device
+from .properties import PropertyStatus, RangePropertyStatus, enum_to_str
+
+if TYPE_CHECKING:
+    from .cocoro import Cocoro
+
+POWER_STATUS_CODE = "80"
+OPERATION_MODE_STATUS_CODE = "B0"
+
+FIELDS = ("kind", "place", "power", "mode")
+
+
+@dataclass(frozen=True)
+class _Entry:
+    kind: Hashable
+    place: Optional[str]
+    power: Optional[str]
+    mode: Optional[str]
+
+    def key(self, field: str) -> Hashable:
+        return getattr(self, field)
+
+
+class FleetIndex:
+    """
+    Indexes devices by kind, place, power state and operation mode.
+
+    The index is updated per device whenever its status changes, so count and
+    group-by queries are set operations instead of scans over every Device.
+    Numeric (range) status values are kept per device for aggregate queries.
+
+    Example:
+        index = FleetIndex()
+        index.attach(cocoro)
+        await cocoro.query_devices()
+        index.count(kind=DeviceType.AirCondition, power=ValueSingle.POWER_ON,
+                    mode=ValueSingle.OPERATION_COOL)
+        index.mean(PurifierStatusCode.PM25, by="place", kind=DeviceType.AirCleaner)
+    """
+
+    def __init__(self) -> None:
+        self.devices: Dict[int, Device] = {}
+        self._entries: Dict[int, _Entry] = {}
+        self._index: Dict[str, Dict[Hashable, Set[int]]] = {f: {} for f in FIELDS}
+        self._numeric: Dict[str, Dict[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def attach(self, cocoro: "Cocoro") -> None:
+        """Index every status change, and drop devices that vanish from the account."""
+        cocoro.add_status_listener(self._on_status)
+        cocoro.add_removal_listener(self.remove)
+
+    def detach(self, cocoro: "Cocoro") -> None:
+        cocoro.remove_status_listener(self._on_status)
+        cocoro.remove_removal_listener(self.remove)
+
+    def _on_status(self, device: Device, previous: Optional[List[PropertyStatus]]) -> None:
+        self.update(device)
+
+    @staticmethod
+    def _entry_for(device: Device) -> _Entry:
+        power = device.get_property_status(POWER_STATUS_CODE)
+        mode = device.get_property_status(OPERATION_MODE_STATUS_CODE)
+        return _Entry(
+            kind=device.kind,
+            place=device.box.echonetData[0].labelData.place if device.box.echonetData else None,
+            power=power.value_code if power is not None else None,
+            mode=mode.value_code if mode is not None else None,
+        )
+
+    def update(self, device: Device) -> None:
+        """Add the device or move it to the index buckets matching its current status."""
+        device_id = device.device_id
+        self.devices[device_id] = device
+
+        entry = self._entry_for(device)
+        old = self._entries.get(device_id)
+        if old != entry:
+            for field in FIELDS:
+                if old is not None and old.key(field) == entry.key(field):
+                    continue
+                if old is not None:
+                    self._discard(field, old.key(field), device_id)
+                self._index[field].setdefault(entry.key(field), set()).add(device_id)
+            self._entries[device_id] = entry
+
+        for values in self._numeric.values():
+            values.pop(device_id, None)
+        for status in device.status:
+            if not isinstance(status, RangePropertyStatus):
+                continue
+            try:
+                value = float(str(status.value_code))
+            except ValueError:
+                continue
+            self._numeric.setdefault(status.statusCode, {})[device_id] = value
+
+    def update_many(self, devices: Any) -> None:
+        for device in devices:
+            self.update(device)
+
+    def remove(self, device_id: int) -> None:
+        self.devices.pop(device_id, None)
+        entry = self._entries.pop(device_id, None)
+        if entry is not None:
+            for field in FIELDS:
+                self._discard(field, entry.key(field), device_id)
+        for values in self._numeric.values():
+            values.pop(device_id, None)
+
+    def _discard(self, field: str, key: Hashable, device_id: int) -> None:
+        bucket = self._index[field].get(key)
+        if bucket is None:
+            return
+        bucket.discard(device_id)
+        if not bucket:
+            del self._index[field][key]
+
+    def select(self, **filters: Any) -> Set[int]:
+        """
+        Device ids matching all filters.
+
+        Filters are any of kind, place, power and mode; enum values are accepted.
+        """
+        result: Optional[Set[int]] = None
+        # intersect starting from the smallest bucket
+        buckets: List[Set[int]] = []
+        for field, value in filters.items():
+            if field not in self._index:
+                raise ValueError(f"unknown field: {field}")
+            key = value if field == "kind" else enum_to_str(value)
+            buckets.append(self._index[field].get(key, set()))
+
+        for bucket in sorted(buckets, key=len):
+            result = set(bucket) if result is None else result & bucket
+            if not result:
+                return set()
+
+        return set(self.devices) if result is None else result
+
+    def count(self, **filters: Any) -> int:
+        if len(filters) == 1:
+            ((field, value),) = filters.items()
+            if field not in self._index:
+                raise ValueError(f"unknown field: {field}")
+            key = value if field == "kind" else enum_to_str(value)
+            return len(self._index[field].get(key, ()))
+        return len(self.select(**filters))
+
+    def get_devices(self, **filters: Any) -> List[Device]:
+        return [self.devices[i] for i in self.select(**filters)]
+
+    def group_count(self, by: str, **filters: Any) -> Dict[Hashable, int]:
+        """Number of matching devices per value of the `by` field."""
+        if by not in self._index:
+            raise ValueError(f"unknown field: {by}")
+
+        if not filters:
+            return {key: len(ids) for key, ids in self._index[by].items()}
+
+        selected = self.select(**filters)
+        counts: Dict[Hashable, int] = {}
+        for key, ids in self._index[by].items():
+            n = len(ids & selected)
+            if n:
+                counts[key] = n
+        return counts
+
+    def mean(
+        self, status_code: str, by: Optional[str] = None, **filters: Any
+    ) -> Dict[Hashable, float]:
+        """
+        Mean of a numeric status value over matching devices.
+
+        Returns a dict keyed by the `by` field, or a single `None` key when
+        no grouping is requested. Groups without values are omitted.
+        """
+        values = self._numeric.get(enum_to_str(status_code), {})
+        selected = self.select(**filters) if filters else None
+
+        groups: List[Tuple[Hashable, Set[int]]]
+        if by is None:
+            groups = [(None, selected if selected is not None else set(self.devices))]
+        else:
+            if by not in self._index:
+                raise ValueError(f"unknown field: {by}")
+            groups = [
+                (key, ids if selected is None else ids & selected)
+                for key, ids in self._index[by].items()
+            ]
+
+        out: Dict[Hashable, float] = {}
+        for key, ids in groups:
+            found = [values[i] for i in ids if i in values]
+            if found:
+                out[key] = sum(found) / len(found)
+        return out
@@ -0,0 +1,141 @@
+"""Per-box health tracking and quarantine of unresponsive boxes."""
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+class BoxQuarantinedError(Exception):
+    """Raised instead of sending a request to a quarantined box."""
+
+    def __init__(self, box_id: str, retry_in: float):
+        super().__init__(f"box {box_id} is quarantined, next probe in {retry_in:.0f}s")
+        self.box_id = box_id
+        self.retry_in = retry_in
+
+
+@dataclass
+class BoxHealth:
+    box_id: str
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    # EWMAs of the error rate (0..1) and of the latency of successful requests
+    error_rate: float = 0.0
+    latency: Optional[float] = None
+    last_error: Optional[str] = None
+    last_success_at: Optional[float] = None
+    quarantined_until: Optional[float] = None
+    # how many times in a row the box was quarantined, drives the backoff
+    quarantines: int = 0
+    probing: bool = False
+
+    @property
+    def quarantined(self) -> bool:
+        return self.quarantined_until is not None
+
+    @property
+    def score(self) -> float:
+        """1.0 for a healthy box, 0.0 for one that is quarantined."""
+        if self.quarantined:
+            return 0.0
+        return max(0.0, 1.0 - self.error_rate) / (1 + self.consecutive_failures)
+
+
+class HealthTracker:
+    """
+    Tracks error rate, latency and consecutive failures per box.
+
+    After `failure_threshold` consecutive failures a box is quarantined:
+    requests to it fail fast with BoxQuarantinedError until the quarantine
+    expires. Then a single probe request is let through; if it succeeds the
+    box is healthy again, otherwise it goes back into quarantine for twice
+    as long, up to `max_backoff` seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 30.0,
+        max_backoff: float = 1800.0,
+        smoothing: float = 0.2,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.smoothing = smoothing
+        self._boxes: Dict[str, BoxHealth] = {}
+
+    def get(self, box_id: str) -> BoxHealth:
+        health = self._boxes.get(box_id)
+        if health is None:
+            health = self._boxes[box_id] = BoxHealth(box_id)
+        return health
+
+    def begin(self, box_id: str, now: Optional[float] = None) -> None:
+        """Call before a request to the box. Raises BoxQuarantinedError to skip it."""
+        health = self._boxes.get(box_id)
+        if health is None or health.quarantined_until is None:
+            return
+
+        now = time.monotonic() if now is None else now
+        if health.probing or now < health.quarantined_until:
+            raise BoxQuarantinedError(box_id, max(0.0, health.quarantined_until - now))
+        health.probing = True
+
+    def abort(self, box_id: str) -> None:
+        """The request was cancelled, it says nothing about the box."""
+        health = self._boxes.get(box_id)
+        if health is not None:
+            health.probing = False
+
+    def record_success(self, box_id: str, latency: float, now: Optional[float] = None) -> None:
+        health = self.get(box_id)
+        health.requests += 1
+        health.consecutive_failures = 0
+        health.error_rate -= self.smoothing * health.error_rate
+        health.latency = (
+            latency
+            if health.latency is None
+            else health.latency + self.smoothing * (latency - health.latency)
+        )
+        health.last_success_at = time.monotonic() if now is None else now
+        health.quarantined_until = None
+        health.quarantines = 0
+        health.probing = False
+
+    def record_failure(
+        self, box_id: str, error: BaseException, now: Optional[float] = None
+    ) -> None:
+        health = self.get(box_id)
+        health.requests += 1
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.error_rate += self.smoothing * (1.0 - health.error_rate)
+        health.last_error = f"{type(error).__name__}: {error}"
+
+        if health.probing or health.consecutive_failures >= self.failure_threshold:
+            now = time.monotonic() if now is None else now
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** health.quarantines)
+            health.quarantined_until = now + backoff
+            health.quarantines += 1
+        health.probing = False
+
+    def is_quarantined(self, box_id: str, now: Optional[float] = None) -> bool:
+        """True while requests to the box would be rejected."""
+        health = self._boxes.get(box_id)
+        if health is None or health.quarantined_until is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return health.probing or now < health.quarantined_until
+
+    def quarantined(self) -> List[BoxHealth]:
+        return [h for h in self._boxes.values() if h.quarantined]
+
+    def snapshot(self) -> Dict[str, BoxHealth]:
+        """Copies of all tracked boxes, for monitoring."""
+        return {box_id: BoxHealth(**vars(h)) for box_id, h in self._boxes.items()}
+
+    def forget(self, box_id: str) -> None:
+        self._boxes.pop(box_id, None)
@@ -1,14 +1,100 @@
 """HTTP adapter to support both httpx and aiohttp clients."""
+import json
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Union
+from collections import OrderedDict
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, AsyncGenerator, Dict, Any, Mapping, Optional, Tuple, Union
 
-try:
+# httpx and aiohttp are only imported once a client is actually needed,
+# which keeps `import sharp_cocoro` cheap for short-lived processes.
+HAS_AIOHTTP = find_spec("aiohttp") is not None
+
+if TYPE_CHECKING:
     import aiohttp  # type: ignore
-    HAS_AIOHTTP = True
-except ImportError:
-    HAS_AIOHTTP = False
+    import httpx
+
+JSON_CONTENT_TYPE = {"Content-Type": "application/json; charset=utf-8"}
+
+# httpx and aiohttp decode brotli only when a brotli package is installed
+HAS_BROTLI = find_spec("brotli") is not None or find_spec("brotlicffi") is not None
+ACCEPT_ENCODING = {"Accept-Encoding": "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"}
+
+
+@dataclass
+class TransferStats:
+    requests: int = 0
+    # GETs answered with 304 Not Modified
+    not_modified: int = 0
+    # response bytes as received, i.e. compressed
+    bytes_received: int = 0
+    # response bytes after decompression
+    bytes_decoded: int = 0
+    # decoded size of the cached bodies that 304s made it unnecessary to download
+    bytes_saved_not_modified: int = 0
+
+    @property
+    def bytes_saved_compression(self) -> int:
+        return max(0, self.bytes_decoded - self.bytes_received)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_saved_compression + self.bytes_saved_not_modified
+
+
+@dataclass
+class _CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Dict[str, Any]
+    size: int
+
+
+class ConditionalCache:
+    """
+    Remembers ETag/Last-Modified validators and parsed bodies of GET responses.
+
+    A cached body is served again when the server answers 304, see
+    HTTPAdapter.conditional_get. Bodies are shared and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[_CachedResponse]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    @staticmethod
+    def validators(entry: _CachedResponse) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
 
-import httpx
+    def store(self, url: str, headers: Mapping[str, str], body: Dict[str, Any], size: int) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._entries.pop(url, None)
+            return
+        self._entries[url] = _CachedResponse(etag, last_modified, body, size)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
 
 
 class HTTPAdapter(ABC):
@@ -24,38 +110,133 @@ class HTTPAdapter(ABC):
         """Make a POST request with JSON data."""
         pass
     
+    async def conditional_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], bool]:
+        """Make a GET request, also returns whether the body is unchanged since the previous one.
+
+        True means the server answered 304 Not Modified and the body of the
+        previous response to the same URL was served again. Adapters without
+        a ConditionalCache always return False.
+        """
+        return await self.get(url, headers=headers), False
+
+    async def post_content(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Make a POST request with an already encoded JSON body.
+
+        Adapters that can send raw bytes should override this, the default
+        decodes the body again and goes through post().
+        """
+        return await self.post(url, json.loads(content), headers=headers)
+
+    async def stream_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncGenerator[bytes, None]:
+        """Make a GET request and yield the body in chunks as it arrives.
+
+        Adapters that can stream should override this, the default goes
+        through get() and yields the whole body at once.
+        """
+        body = await self.get(url, headers=headers)
+        yield json.dumps(body, ensure_ascii=False).encode("utf-8")
+
     @abstractmethod
     async def close(self) -> None:
         """Close the session."""
         pass
 
+    @property
+    def stats(self) -> Optional[TransferStats]:
+        """Transfer counters, if the adapter keeps them."""
+        return None
+
 
 class HTTPXAdapter(HTTPAdapter):
-    """Adapter for httpx.AsyncClient."""
+    """Adapter for httpx.AsyncClient.
+
+    Requests compressed responses, and with `conditional` revalidates GETs
+    with the validators of the previous response, see ConditionalCache.
+    """
     
-    def __init__(self, session: Optional[httpx.AsyncClient] = None, headers: Optional[Dict[str, str]] = None, timeout: float = 15.0):
+    def __init__(self, session: Optional["httpx.AsyncClient"] = None, headers: Optional[Dict[str, str]] = None, timeout: float = 15.0,
+                 conditional: bool = True):
         self.session = session
         self.headers = headers or {}
         self.timeout = timeout
         self._owns_session = session is None
+        self._stats = TransferStats()
+        self.cache = ConditionalCache() if conditional else None
+
+    @property
+    def stats(self) -> TransferStats:
+        return self._stats
+
+    def _count(self, response: "httpx.Response") -> None:
+        self._stats.requests += 1
+        # num_bytes_downloaded is 0 for responses that were not streamed from the network
+        self._stats.bytes_received += (
+            response.num_bytes_downloaded
+            or int(response.headers.get("Content-Length", 0))
+            or len(response.content)
+        )
+        self._stats.bytes_decoded += len(response.content)
         
-    async def _ensure_session(self) -> httpx.AsyncClient:
+    async def _ensure_session(self) -> "httpx.AsyncClient":
         """Ensure we have a session."""
         if self.session is None:
+            import httpx
+
             self.session = httpx.AsyncClient(headers=self.headers, timeout=self.timeout)
         return self.session
     
     async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Make a GET request."""
+        body, _ = await self.conditional_get(url, headers=headers)
+        return body
+
+    async def conditional_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], bool]:
+        """Make a GET request, revalidating the cached body of the URL if there is one."""
         session = await self._ensure_session()
-        response = await session.get(url, headers=headers)
+        cached = self.cache.get(url) if self.cache is not None else None
+        request_headers = {**ACCEPT_ENCODING, **(headers or {})}
+        if cached is not None:
+            request_headers.update(ConditionalCache.validators(cached))
+
+        response = await session.get(url, headers=request_headers)
+        self._count(response)
+        if response.status_code == 304 and cached is not None:
+            self._stats.not_modified += 1
+            self._stats.bytes_saved_not_modified += cached.size
+            return cached.body, True
+
         response.raise_for_status()
-        return response.json()
+        body = response.json()
+        if self.cache is not None:
+            self.cache.store(url, response.headers, body, len(response.content))
+        return body, False
     
+    async def stream_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncGenerator[bytes, None]:
+        """Make a GET request and yield the decompressed body in chunks as it arrives."""
+        session = await self._ensure_session()
+        async with session.stream("GET", url, headers={**ACCEPT_ENCODING, **(headers or {})}) as response:
+            response.raise_for_status()
+            decoded = 0
+            async for chunk in response.aiter_bytes():
+                decoded += len(chunk)
+                yield chunk
+            self._stats.requests += 1
+            self._stats.bytes_received += response.num_bytes_downloaded
+            self._stats.bytes_decoded += decoded
+
     async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Make a POST request with JSON data."""
         session = await self._ensure_session()
-        response = await session.post(url, json=json_data, headers=headers)
+        response = await session.post(url, json=json_data, headers={**ACCEPT_ENCODING, **(headers or {})})
+        self._count(response)
+        response.raise_for_status()
+        return response.json()
+
+    async def post_content(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Make a POST request with an already encoded JSON body."""
+        session = await self._ensure_session()
+        response = await session.post(url, content=content, headers={**ACCEPT_ENCODING, **JSON_CONTENT_TYPE, **(headers or {})})
+        self._count(response)
         response.raise_for_status()
         return response.json()
     
@@ -66,34 +247,95 @@ class HTTPXAdapter(HTTPAdapter):
             self.session = None
 
 
-if HAS_AIOHTTP:
-    class AIOHTTPAdapter(HTTPAdapter):
-        """Adapter for aiohttp.ClientSession."""
-        
-        def __init__(self, session: aiohttp.ClientSession, headers: Optional[Dict[str, str]] = None):
-            self.session = session
-            self.headers = headers or {}
-            
-        async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-            """Make a GET request."""
-            combined_headers = {**self.headers, **(headers or {})}
-            async with self.session.get(url, headers=combined_headers) as response:
-                response.raise_for_status()
-                return await response.json()
-        
-        async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-            """Make a POST request with JSON data."""
-            combined_headers = {**self.headers, **(headers or {})}
-            async with self.session.post(url, json=json_data, headers=combined_headers) as response:
-                response.raise_for_status()
-                return await response.json()
+class AIOHTTPAdapter(HTTPAdapter):
+    """Adapter for aiohttp.ClientSession.
+
+    Requests compressed responses, and with `conditional` revalidates GETs
+    with the validators of the previous response, see ConditionalCache.
+    """
+    
+    def __init__(self, session: "aiohttp.ClientSession", headers: Optional[Dict[str, str]] = None, conditional: bool = True):
+        self.session = session
+        self.headers = headers or {}
+        self._stats = TransferStats()
+        self.cache = ConditionalCache() if conditional else None
+
+    @property
+    def stats(self) -> TransferStats:
+        return self._stats
+
+    async def _read(self, response: "aiohttp.ClientResponse") -> Dict[str, Any]:
+        body = await response.read()
+        self._stats.requests += 1
+        # Content-Length is the size on the wire, before aiohttp decompresses the body
+        self._stats.bytes_received += response.content_length or len(body)
+        self._stats.bytes_decoded += len(body)
+        return await response.json()
         
-        async def close(self) -> None:
-            """aiohttp sessions are typically managed externally, so we don't close them."""
-            pass
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Make a GET request."""
+        body, _ = await self.conditional_get(url, headers=headers)
+        return body
+
+    async def conditional_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], bool]:
+        """Make a GET request, revalidating the cached body of the URL if there is one."""
+        cached = self.cache.get(url) if self.cache is not None else None
+        combined_headers = {**self.headers, **ACCEPT_ENCODING, **(headers or {})}
+        if cached is not None:
+            combined_headers.update(ConditionalCache.validators(cached))
+
+        async with self.session.get(url, headers=combined_headers) as response:
+            if response.status == 304 and cached is not None:
+                self._stats.requests += 1
+                self._stats.not_modified += 1
+                self._stats.bytes_saved_not_modified += cached.size
+                return cached.body, True
+
+            response.raise_for_status()
+            body = await self._read(response)
+            if self.cache is not None:
+                self.cache.store(url, response.headers, body, len(await response.read()))
+            return body, False
+    
+    async def stream_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncGenerator[bytes, None]:
+        """Make a GET request and yield the decompressed body in chunks as it arrives."""
+        combined_headers = {**self.headers, **ACCEPT_ENCODING, **(headers or {})}
+        async with self.session.get(url, headers=combined_headers) as response:
+            response.raise_for_status()
+            decoded = 0
+            async for chunk in response.content.iter_chunked(65536):
+                decoded += len(chunk)
+                yield chunk
+            self._stats.requests += 1
+            self._stats.bytes_received += response.content_length or decoded
+            self._stats.bytes_decoded += decoded
+
+    async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Make a POST request with JSON data."""
+        combined_headers = {**self.headers, **ACCEPT_ENCODING, **(headers or {})}
+        async with self.session.post(url, json=json_data, headers=combined_headers) as response:
+            response.raise_for_status()
+            return await self._read(response)
+
+    async def post_content(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Make a POST request with an already encoded JSON body."""
+        combined_headers = {**self.headers, **ACCEPT_ENCODING, **JSON_CONTENT_TYPE, **(headers or {})}
+        async with self.session.post(url, data=content, headers=combined_headers) as response:
+            response.raise_for_status()
+            return await self._read(response)
+    
+    async def close(self) -> None:
+        """aiohttp sessions are typically managed externally, so we don't close them."""
+        pass
+
+
+def is_httpx_client(session: Any) -> bool:
+    """True for httpx.AsyncClient instances, without importing httpx."""
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(session, httpx.AsyncClient)
 
 
-def create_adapter(session: Optional[Union[httpx.AsyncClient, 'aiohttp.ClientSession']] = None, 
+def create_adapter(session: Optional[Union['httpx.AsyncClient', 'aiohttp.ClientSession']] = None, 
                   headers: Optional[Dict[str, str]] = None,
                   timeout: float = 15.0) -> HTTPAdapter:
     """Create an appropriate adapter based on the session type."""
@@ -101,7 +343,7 @@ def create_adapter(session: Optional[Union[httpx.AsyncClient, 'aiohttp.ClientSes
         # Default to httpx for backward compatibility
         return HTTPXAdapter(headers=headers, timeout=timeout)
     
-    if isinstance(session, httpx.AsyncClient):
+    if is_httpx_client(session):
         return HTTPXAdapter(session=session, headers=headers, timeout=timeout)
     
     if HAS_AIOHTTP and hasattr(session, 'get') and hasattr(session, 'post'):
@@ -0,0 +1,139 @@
+"""Optimistic device state that is reconciled against the cloud after control."""
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .properties import ControlResultStatus, PropertyStatus
+from .response_types import ControlResultItem
+
+
+@dataclass
+class PendingUpdate:
+    status: PropertyStatus
+    previous: Optional[PropertyStatus]
+    control_id: Optional[str]
+    sent_at: float
+
+
+# Whether a fetched status (second argument) reflects a sent update (first)
+Reflects = Callable[[PropertyStatus, PropertyStatus], bool]
+
+
+def _equal(sent: PropertyStatus, current: PropertyStatus) -> bool:
+    return sent == current
+
+
+class OptimisticState:
+    """
+    Tracks updates that were sent to a device but not yet confirmed.
+
+    Sent values are applied to the device status right away so readers get
+    instant feedback. Each pending value remembers what it replaced, so it
+    can be rolled back when the control ends up UNMATCH or with an error.
+    On the next refresh pending values that the cloud already reports are
+    dropped, while values that are still in flight stay overlaid on top of
+    the refreshed status until they are confirmed or `ttl` runs out.
+
+    `reflects` decides whether a fetched value already reflects a sent one.
+    The default compares them for equality, which does not work for command
+    blobs that only change part of a state (e.g. Aircon State8).
+    """
+
+    def __init__(self, ttl: float = 30.0, reflects: Reflects = _equal):
+        self.ttl = ttl
+        self.reflects = reflects
+        self.pending: Dict[str, PendingUpdate] = {}
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def is_pending(self, status_code: str) -> bool:
+        return status_code in self.pending
+
+    def apply(
+        self,
+        status: List[PropertyStatus],
+        updates: Sequence[PropertyStatus],
+        control_ids: Sequence[Optional[str]],
+    ) -> List[PropertyStatus]:
+        """Apply sent updates to status and start tracking them."""
+        now = time.monotonic()
+        by_code = {s.statusCode: i for i, s in enumerate(status)}
+
+        for update, control_id in zip(updates, control_ids):
+            i = by_code.get(update.statusCode)
+            previous = status[i] if i is not None else None
+
+            # keep the last confirmed value when stacking updates on the same code
+            existing = self.pending.get(update.statusCode)
+            if existing is not None:
+                previous = existing.previous
+
+            self.pending[update.statusCode] = PendingUpdate(
+                status=update, previous=previous, control_id=control_id, sent_at=now
+            )
+            if i is not None:
+                status[i] = update
+
+        return status
+
+    def resolve(
+        self, status: List[PropertyStatus], results: Sequence[ControlResultItem]
+    ) -> List[PropertyStatus]:
+        """
+        Confirm or roll back pending updates based on controlResult items.
+
+        Items still in WAIT/EXEC are left pending.
+        """
+        by_id = {p.control_id: code for code, p in self.pending.items() if p.control_id}
+
+        for item in results:
+            code = by_id.get(item.id)
+            if code is None:
+                continue
+
+            if item.errorCode or item.status == ControlResultStatus.UNMATCH:
+                self._rollback(status, code)
+            elif item.status == ControlResultStatus.SUCCESS:
+                del self.pending[code]
+
+        return status
+
+    def rollback_all(self, status: List[PropertyStatus]) -> List[PropertyStatus]:
+        for code in list(self.pending):
+            self._rollback(status, code)
+        return status
+
+    def _rollback(self, status: List[PropertyStatus], status_code: str) -> None:
+        pending = self.pending.pop(status_code)
+        if pending.previous is None:
+            return
+        for i, s in enumerate(status):
+            if s.statusCode == status_code:
+                status[i] = pending.previous
+
+    def reconcile(self, server_status: List[PropertyStatus]) -> List[PropertyStatus]:
+        """
+        Merge freshly fetched status with pending updates.
+
+        The server status is the new baseline. Pending updates that it already
+        reflects, or that expired, are dropped; the rest stay overlaid.
+        """
+        now = time.monotonic()
+        status = list(server_status)
+        by_code = {s.statusCode: i for i, s in enumerate(status)}
+
+        for code, pending in list(self.pending.items()):
+            i = by_code.get(code)
+            server_value = status[i] if i is not None else None
+
+            reflected = server_value is not None and self.reflects(pending.status, server_value)
+            if reflected or now - pending.sent_at > self.ttl:
+                del self.pending[code]
+                continue
+
+            pending.previous = server_value
+            if i is not None:
+                status[i] = pending.status
+
+        return status
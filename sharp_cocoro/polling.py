@@ -0,0 +1,332 @@
+"""Poll devices at intervals adapted to how often they actually change."""
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .cocoro import Cocoro
+from .device import Device
+from .properties import PropertyStatus
+from .scheduler import Priority
+
+
+class RequestBudget:
+    """
+    Token bucket shared by all polls: `rate` requests per second on average,
+    with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.spent = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    async def acquire(self) -> None:
+        # the lock keeps waiters in FIFO order, created lazily so it binds
+        # to the loop that uses the budget
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+            self.spent += 1
+
+
+@dataclass
+class PollState:
+    device_id: int
+    interval: float
+    next_due: float
+    # EWMA of observed status changes per second
+    change_rate: float
+    last_poll: Optional[float] = None
+    boost_until: float = 0.0
+    polls: int = 0
+    changes: int = 0
+    # propertyUpdatedAt from the last boxInfo scan
+    updated_at: Optional[str] = None
+
+
+class IntervalController:
+    """
+    Learns each device's change rate and derives its poll interval from it.
+
+    After every poll the observed rate (1 change or 0 changes over the time
+    since the previous poll) is folded into an EWMA, and the next interval is
+    chosen so that about `target_changes_per_poll` changes are expected per
+    poll, clamped to [min_interval, max_interval]. Devices that stay idle
+    back off geometrically, a detected change at least halves the interval
+    right away, and activity such as a command pins a device to
+    min_interval for `boost` seconds.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 15.0,
+        max_interval: float = 900.0,
+        initial_interval: float = 60.0,
+        target_changes_per_poll: float = 0.5,
+        smoothing: float = 0.3,
+        boost: float = 120.0,
+    ):
+        if not 0 < min_interval <= initial_interval <= max_interval:
+            raise ValueError("expected 0 < min_interval <= initial_interval <= max_interval")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.target_changes_per_poll = target_changes_per_poll
+        self.smoothing = smoothing
+        self.boost = boost
+
+    def new_state(self, device_id: int, now: float) -> PollState:
+        return PollState(
+            device_id=device_id,
+            interval=self.initial_interval,
+            next_due=now,
+            change_rate=self.target_changes_per_poll / self.initial_interval,
+        )
+
+    def interval_for(self, state: PollState, now: float) -> float:
+        if now < state.boost_until:
+            return self.min_interval
+        if state.change_rate <= 0:
+            return self.max_interval
+        interval = self.target_changes_per_poll / state.change_rate
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record_poll(self, state: PollState, changed: bool, now: float) -> None:
+        elapsed = now - state.last_poll if state.last_poll is not None else state.interval
+        sample = (1.0 if changed else 0.0) / max(elapsed, 1e-3)
+        state.change_rate += self.smoothing * (sample - state.change_rate)
+        state.last_poll = now
+        state.polls += 1
+        state.changes += int(changed)
+        interval = self.interval_for(state, now)
+        if changed:
+            # react to activity right away instead of waiting for the EWMA
+            interval = min(interval, max(self.min_interval, state.interval / 2))
+        state.interval = interval
+        state.next_due = now + state.interval
+
+    def record_activity(self, state: PollState, now: float) -> None:
+        """Poll soon and often, e.g. after a command or a change seen elsewhere."""
+        state.boost_until = now + self.boost
+        state.interval = self.min_interval
+        state.next_due = min(state.next_due, now + self.min_interval)
+
+    def mark_due(self, state: PollState, now: float) -> None:
+        state.next_due = min(state.next_due, now)
+
+
+def _status_changed(
+    previous: Optional[List[PropertyStatus]], current: List[PropertyStatus]
+) -> bool:
+    if previous is None:
+        return False
+    return {s.statusCode: s for s in previous} != {s.statusCode: s for s in current}
+
+
+class AdaptivePoller:
+    """
+    Refreshes devices when their adaptive interval is due, within a global
+    request budget.
+
+    Status changes reported through the Cocoro status listeners that did not
+    come from the poller itself (e.g. commands sent with execute_updates)
+    count as activity and tighten that device's interval. If
+    `box_scan_interval` is set, boxInfo is fetched on that schedule and
+    devices whose propertyUpdatedAt moved are polled right away.
+
+    Example:
+        poller = AdaptivePoller(cocoro, devices, budget=RequestBudget(rate=2.0))
+        poller.start()
+        ...
+        await poller.stop()
+    """
+
+    def __init__(
+        self,
+        cocoro: Cocoro,
+        devices: Iterable[Device],
+        controller: Optional[IntervalController] = None,
+        budget: Optional[RequestBudget] = None,
+        concurrency: int = 4,
+        box_scan_interval: Optional[float] = None,
+    ):
+        self.cocoro = cocoro
+        self.controller = controller or IntervalController()
+        self.budget = budget or RequestBudget(rate=1.0, burst=concurrency)
+        self.box_scan_interval = box_scan_interval
+        self.errors = 0
+        self.devices: Dict[int, Device] = {}
+        self.states: Dict[int, PollState] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        self._seq = 0
+        self.concurrency = concurrency
+        # created by run(), so it binds to the loop the poller runs on
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refreshing: Set[int] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._runner: Optional["asyncio.Task[None]"] = None
+        self._next_box_scan = 0.0
+
+        now = time.monotonic()
+        for device in devices:
+            self.add(device, now)
+
+    def add(self, device: Device, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.devices[device.device_id] = device
+        if device.device_id not in self.states:
+            state = self.controller.new_state(device.device_id, now)
+            state.updated_at = device.box.echonetData[0].propertyUpdatedAt
+            self.states[device.device_id] = state
+        self._schedule(self.states[device.device_id])
+
+    def remove(self, device: Device) -> None:
+        self.devices.pop(device.device_id, None)
+        self.states.pop(device.device_id, None)
+
+    def notify_activity(self, device: Device) -> None:
+        state = self.states.get(device.device_id)
+        if state is None:
+            return
+        self.controller.record_activity(state, time.monotonic())
+        self._schedule(state)
+
+    def _on_status(self, device: Device, previous: Optional[List[PropertyStatus]]) -> None:
+        if device.device_id in self._refreshing:
+            return
+        if _status_changed(previous, device.status):
+            self.notify_activity(device)
+
+    def _schedule(self, state: PollState) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (state.next_due, self._seq, state.device_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop_due(self, now: float) -> Tuple[Optional[PollState], float]:
+        """The next due state, or None and how long to wait for one."""
+        while self._heap:
+            due, _, device_id = self._heap[0]
+            state = self.states.get(device_id)
+            if state is None or state.next_due != due:
+                # removed, or rescheduled with a newer heap entry
+                heapq.heappop(self._heap)
+                continue
+            if due > now:
+                return None, due - now
+            heapq.heappop(self._heap)
+            return state, 0.0
+        return None, 3600.0
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self.cocoro.add_status_listener(self._on_status)
+            self._runner = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        self.cocoro.remove_status_listener(self._on_status)
+        tasks = [t for t in (self._runner, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+
+    async def run(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        wakeup = self._wakeup = asyncio.Event()
+        while True:
+            now = time.monotonic()
+            if self.box_scan_interval is not None and now >= self._next_box_scan:
+                self._next_box_scan = now + self.box_scan_interval
+                await self._scan_boxes()
+                continue
+
+            state, wait = self._pop_due(now)
+            if state is None:
+                if self.box_scan_interval is not None:
+                    wait = min(wait, max(0.0, self._next_box_scan - now))
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if state.device_id in self._refreshing:
+                # already in flight, it is rescheduled when that poll ends
+                continue
+            self._refreshing.add(state.device_id)
+            await slots.acquire()
+            try:
+                await self.budget.acquire()
+            except BaseException:
+                slots.release()
+                self._refreshing.discard(state.device_id)
+                raise
+            task = asyncio.ensure_future(self._poll(state, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _poll(self, state: PollState, slots: asyncio.Semaphore) -> None:
+        try:
+            device = self.devices.get(state.device_id)
+            if device is None:
+                return
+            previous = device.status
+            try:
+                await self.cocoro.refresh_device(device, priority=Priority.POLL)
+                changed = _status_changed(previous, device.status)
+            except Exception:
+                self.errors += 1
+                # treat a failure like an idle poll so broken devices back off
+                changed = False
+
+            if state.device_id in self.states:
+                self.controller.record_poll(state, changed, time.monotonic())
+                self._schedule(state)
+        finally:
+            self._refreshing.discard(state.device_id)
+            slots.release()
+
+    async def _scan_boxes(self) -> None:
+        await self.budget.acquire()
+        try:
+            boxes = await self.cocoro.query_boxes()
+        except Exception:
+            self.errors += 1
+            return
+
+        now = time.monotonic()
+        for box in boxes:
+            for echonet_data in box.echonetData:
+                state = self.states.get(echonet_data.deviceId)
+                if state is None:
+                    continue
+                if state.updated_at is not None and echonet_data.propertyUpdatedAt != state.updated_at:
+                    self.controller.mark_due(state, now)
+                    self._schedule(state)
+                state.updated_at = echonet_data.propertyUpdatedAt
@@ -0,0 +1,243 @@
+"""Host many Cocoro accounts on one shared connection pool."""
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from .cocoro import DEFAULT_HEADERS, Cocoro
+from .device import Device
+from .http_adapter import HTTPAdapter, HTTPXAdapter, TransferStats
+
+
+class FairLimiter:
+    """
+    Global concurrency limit with round-robin hand-off between keys.
+
+    When the limit is reached, waiters are queued per key and released one
+    key at a time, so a single busy account cannot starve the others.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self._active = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    async def acquire(self, key: str) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return
+
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # the slot was handed to us right before cancellation
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._active < self.limit and self._waiters:
+            key, queue = next(iter(self._waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+
+            if fut.done():
+                continue
+            self._active += 1
+            fut.set_result(None)
+
+
+class _PooledAdapter(HTTPAdapter):
+    """Adapter that routes an account's requests through the pool's limiter."""
+
+    def __init__(self, inner: HTTPAdapter, limiter: FairLimiter, key: str):
+        self.inner = inner
+        self.limiter = limiter
+        self.key = key
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        await self.limiter.acquire(self.key)
+        try:
+            return await self.inner.get(url, headers=headers)
+        finally:
+            self.limiter.release()
+
+    async def conditional_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], bool]:
+        await self.limiter.acquire(self.key)
+        try:
+            return await self.inner.conditional_get(url, headers=headers)
+        finally:
+            self.limiter.release()
+
+    async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        await self.limiter.acquire(self.key)
+        try:
+            return await self.inner.post(url, json_data, headers=headers)
+        finally:
+            self.limiter.release()
+
+    async def post_content(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        await self.limiter.acquire(self.key)
+        try:
+            return await self.inner.post_content(url, content, headers=headers)
+        finally:
+            self.limiter.release()
+
+    async def stream_get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncGenerator[bytes, None]:
+        # only hold the limiter while reading, not while the consumer is paused
+        chunks = self.inner.stream_get(url, headers=headers)
+        try:
+            while True:
+                await self.limiter.acquire(self.key)
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    self.limiter.release()
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    @property
+    def stats(self) -> Optional[TransferStats]:
+        return self.inner.stats
+
+    async def close(self) -> None:
+        # the shared transport is owned and closed by the pool
+        pass
+
+
+@dataclass
+class PoolDiscovery:
+    devices: Dict[str, Sequence[Device]] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+
+    @property
+    def all_devices(self) -> List[Device]:
+        return [device for devices in self.devices.values() for device in devices]
+
+
+class CocoroPool:
+    """
+    Many Cocoro account sessions sharing one connection pool.
+
+    Every account gets its own httpx.AsyncClient (and therefore its own
+    cookie jar for the login session), but all clients share a single
+    transport, so sockets are reused across accounts. Requests are scheduled
+    fairly across accounts under a global concurrency limit.
+
+    Example:
+        async with CocoroPool(max_concurrency=20) as pool:
+            pool.add_account(app_secret_a, app_key_a)
+            pool.add_account(app_secret_b, app_key_b)
+            await pool.login_all()
+            discovery = await pool.query_devices()
+            print(len(discovery.all_devices))
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        max_connections: Optional[int] = None,
+        timeout: float = 15.0,
+    ):
+        self.timeout = timeout
+        self.limiter = FairLimiter(max_concurrency)
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections or max_concurrency,
+                max_keepalive_connections=max_connections or max_concurrency,
+            )
+        )
+        self.accounts: Dict[str, Cocoro] = {}
+
+    async def __aenter__(self) -> "CocoroPool":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def add_account(
+        self,
+        app_secret: str,
+        app_key: str,
+        service_name: str = "iClub",
+        name: Optional[str] = None,
+    ) -> Cocoro:
+        """Register an account. `name` defaults to the app key."""
+        key = name or app_key
+        if key in self.accounts:
+            raise ValueError(f"account {key} is already registered")
+
+        client = httpx.AsyncClient(
+            transport=self._transport, headers=DEFAULT_HEADERS, timeout=self.timeout
+        )
+        adapter = _PooledAdapter(
+            HTTPXAdapter(session=client, headers=DEFAULT_HEADERS), self.limiter, key
+        )
+        cocoro = Cocoro(
+            app_secret=app_secret,
+            app_key=app_key,
+            service_name=service_name,
+            adapter=adapter,
+        )
+        cocoro.session = client
+        self.accounts[key] = cocoro
+        return cocoro
+
+    def remove_account(self, name: str) -> None:
+        # the client is not closed on purpose, closing it would close the shared transport
+        del self.accounts[name]
+
+    async def login_all(self) -> Dict[str, BaseException]:
+        """Log in every account that is not authenticated yet. Returns failures by account."""
+        pending = {k: c for k, c in self.accounts.items() if not c.is_authenticated}
+        results = await asyncio.gather(
+            *(c.login() for c in pending.values()), return_exceptions=True
+        )
+        return {
+            key: res
+            for key, res in zip(pending, results)
+            if isinstance(res, BaseException)
+        }
+
+    async def query_devices(self) -> PoolDiscovery:
+        """Discover devices on all accounts concurrently."""
+        keys = list(self.accounts)
+        results = await asyncio.gather(
+            *(self.accounts[k].query_devices() for k in keys), return_exceptions=True
+        )
+
+        discovery = PoolDiscovery()
+        for key, res in zip(keys, results):
+            if isinstance(res, BaseException):
+                discovery.errors[key] = res
+            else:
+                discovery.devices[key] = res
+        return discovery
+
+    async def close(self) -> None:
+        await self._transport.aclose()
+        self.accounts.clear()
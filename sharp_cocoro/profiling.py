@@ -0,0 +1,139 @@
+"""Opt-in timing and allocation breakdown of the parsing and device-building path."""
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import ContextManager, Deque, Dict, Iterator, List, Optional
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    # net bytes still allocated when the stage finished, only with track_allocations
+    allocated_bytes: int = 0
+
+    def add(self, seconds: float, allocated: int) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.allocated_bytes += allocated
+
+
+@dataclass
+class ProfileReport:
+    name: str
+    started_at: float = field(default_factory=time.time)
+    seconds: float = 0.0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    def record(self, stage: str, seconds: float, allocated: int) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.add(seconds, allocated)
+
+    def format(self) -> str:
+        lines = [f"{self.name}: {self.seconds * 1000:.2f} ms"]
+        for stage, stats in sorted(self.stages.items(), key=lambda s: -s[1].seconds):
+            share = stats.seconds / self.seconds * 100 if self.seconds else 0.0
+            lines.append(
+                f"  {stage:<20} {stats.calls:>6} calls {stats.seconds * 1000:>10.2f} ms"
+                f" {share:>5.1f}% {stats.allocated_bytes / 1024:>10.1f} KiB"
+            )
+        return "\n".join(lines)
+
+
+_NULL = nullcontext()
+
+
+class Profiler:
+    """
+    Low-overhead stage timers that can be switched on and off at runtime.
+
+    While disabled, stage() returns a shared no-op context manager. While
+    enabled, each stage's wall time (and with track_allocations the net
+    memory it allocated, via tracemalloc) is added to the report of the
+    enclosing call() and to the running totals. The most recent reports are
+    kept in `reports`.
+
+    Example:
+        cocoro.profiler.enable(track_allocations=True)
+        await cocoro.query_devices()
+        print(cocoro.profiler.last_report.format())
+        cocoro.profiler.disable()
+    """
+
+    def __init__(self, keep_reports: int = 20):
+        self.enabled = False
+        self.track_allocations = False
+        self.totals = ProfileReport("totals")
+        self.reports: Deque[ProfileReport] = deque(maxlen=keep_reports)
+        self._current: ContextVar[Optional[ProfileReport]] = ContextVar(
+            "cocoro_profile_report", default=None
+        )
+        self._started_tracemalloc = False
+
+    def enable(self, track_allocations: bool = False) -> None:
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.track_allocations = False
+
+    def reset(self) -> None:
+        self.totals = ProfileReport("totals")
+        self.reports.clear()
+
+    @property
+    def last_report(self) -> Optional[ProfileReport]:
+        return self.reports[-1] if self.reports else None
+
+    def stage(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _NULL
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        track = self.track_allocations and tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if track else 0
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            allocated = tracemalloc.get_traced_memory()[0] - before if track else 0
+            self.totals.record(name, seconds, allocated)
+            report = self._current.get()
+            if report is not None:
+                report.record(name, seconds, allocated)
+
+    def call(self, name: str) -> ContextManager[None]:
+        """Collect the stages run inside into a report of their own."""
+        if not self.enabled or self._current.get() is not None:
+            return _NULL
+        return self._call(name)
+
+    @contextmanager
+    def _call(self, name: str) -> Iterator[None]:
+        report = ProfileReport(name)
+        token = self._current.set(report)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            report.seconds = time.perf_counter() - started
+            self._current.reset(token)
+            self.reports.append(report)
+
+    def summary(self) -> List[str]:
+        return [report.format() for report in self.reports]
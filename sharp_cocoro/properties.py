@@ -1,7 +1,8 @@
 from typing import Optional, Any, TypeVar, cast
 from enum import Enum
-from typing import Dict, Union, List
+from typing import Dict, FrozenSet, Union, List
 from dataclasses import dataclass
+from functools import cached_property
 
 T = TypeVar("T")
 
@@ -67,26 +68,35 @@ class SingleProperty(Property):
 
     valueSingle: List[Dict[str, str]]
 
+    # the lookups below are built once on first use, valueSingle is not expected to change
+
     def supported_codes(self) -> List[str]:
         return [v["code"] for v in self.valueSingle]
 
+    @cached_property
+    def code_set(self) -> FrozenSet[str]:
+        return frozenset(v["code"] for v in self.valueSingle)
+
     def supports_code(self, code: str) -> bool:
-        return code in self.supported_codes()
+        return code in self.code_set
 
     @property
     def names(self) -> List[str]:
         return [v["name"] for v in self.valueSingle]
 
-    @property
+    @cached_property
     def code_map(self) -> Dict[str, str]:
         return {v["code"]: v["name"] for v in self.valueSingle}
 
+    @cached_property
+    def name_map(self) -> Dict[str, str]:
+        return {v["name"]: v["code"] for v in self.valueSingle}
+
     def code_to_name(self, code: str) -> Optional[str]:
         return self.code_map.get(code, None)
 
     def name_to_code(self, name: str) -> Optional[str]:
-        code_map = {v["name"]: v["code"] for v in self.valueSingle}
-        return code_map.get(name, None)
+        return self.name_map.get(name, None)
 
 
 @dataclass
@@ -118,7 +128,7 @@ class RangeProperty(Property):
 
     @property
     def range_step(self) -> str:
-        return self.valueRange["max"]
+        return self.valueRange["step"]
 
     @property
     def unit(self) -> str:
@@ -133,6 +143,10 @@ class PropertyStatus:
     def to_map(self) -> Dict[str, Any]:
         return {"statusCode": self.statusCode, "valueType": enum_to_str(self.valueType)}
 
+    @property
+    def value_code(self) -> Optional[str]:
+        return None
+
 
 @dataclass
 class SinglePropertyStatus(PropertyStatus):
@@ -144,8 +158,8 @@ class SinglePropertyStatus(PropertyStatus):
         valueSingle: Dict[str, str],
         valueType: Optional[ValueType] = None,
     ) -> None:
-        # If statusCode is already a StatusCode enum, convert to string
-        if isinstance(statusCode, StatusCode):
+        # If statusCode is a StatusCode enum (including the per-device ones), convert to string
+        if isinstance(statusCode, Enum):
             statusCode = statusCode.value
         super().__init__(statusCode=statusCode, valueType=ValueType.SINGLE)
         self.valueSingle = valueSingle
@@ -153,6 +167,10 @@ class SinglePropertyStatus(PropertyStatus):
     def to_map(self) -> Dict[str, Any]:
         return {**super().to_map(), "valueSingle": self.valueSingle}
 
+    @property
+    def value_code(self) -> Optional[str]:
+        return cast(Optional[str], self.valueSingle.get("code"))
+
 
 @dataclass
 class BinaryPropertyStatus(PropertyStatus):
@@ -164,8 +182,8 @@ class BinaryPropertyStatus(PropertyStatus):
         valueBinary: Dict[str, str],
         valueType: Optional[ValueType] = None,
     ) -> None:
-        # If statusCode is already a StatusCode enum, convert to string
-        if isinstance(statusCode, StatusCode):
+        # If statusCode is a StatusCode enum (including the per-device ones), convert to string
+        if isinstance(statusCode, Enum):
             statusCode = statusCode.value
         super().__init__(statusCode=statusCode, valueType=ValueType.BINARY)
         self.valueBinary = valueBinary
@@ -173,6 +191,10 @@ class BinaryPropertyStatus(PropertyStatus):
     def to_map(self) -> Dict[str, Any]:
         return {**super().to_map(), "valueBinary": self.valueBinary}
 
+    @property
+    def value_code(self) -> Optional[str]:
+        return cast(Optional[str], self.valueBinary.get("code"))
+
 
 @dataclass
 class RangePropertyStatus(PropertyStatus):
@@ -184,11 +206,15 @@ class RangePropertyStatus(PropertyStatus):
         valueRange: Dict[str, Union[str, RangePropertyType]],
         valueType: Optional[ValueType] = None,
     ) -> None:
-        # If statusCode is already a StatusCode enum, convert to string
-        if isinstance(statusCode, StatusCode):
+        # If statusCode is a StatusCode enum (including the per-device ones), convert to string
+        if isinstance(statusCode, Enum):
             statusCode = statusCode.value
         super().__init__(statusCode=statusCode, valueType=ValueType.RANGE)
         self.valueRange = valueRange
 
     def to_map(self) -> Dict[str, Any]:
         return {**super().to_map(), "valueRange": self.valueRange}
+
+    @property
+    def value_code(self) -> Optional[str]:
+        return cast(Optional[str], self.valueRange.get("code"))
@@ -0,0 +1,176 @@
+"""Record live API traffic and replay it offline, e.g. for profiling."""
+import asyncio
+import gzip
+import json
+import re
+import time
+from collections import deque
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple
+
+from .http_adapter import HTTPAdapter, TransferStats
+
+_SECRET_RE = re.compile(r"(appSecret=)[^&]*")
+# the app key is the last path segment of terminalAppId (login body, boxInfo)
+_APP_KEY_RE = re.compile(r"(/key/)[^/?&]+")
+
+
+def _normalize_url(url: str) -> str:
+    return _SECRET_RE.sub(r"\1***", url)
+
+
+def _normalize_body(body: Any) -> Any:
+    """The body with the app key masked in every string."""
+    if isinstance(body, str):
+        return _APP_KEY_RE.sub(r"\1***", body)
+    if isinstance(body, dict):
+        return {k: _normalize_body(v) for k, v in body.items()}
+    if isinstance(body, list):
+        return [_normalize_body(v) for v in body]
+    return body
+
+
+def _body_key(body: Optional[Any]) -> str:
+    return "" if body is None else json.dumps(body, sort_keys=True, separators=(",", ":"))
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordedError(Exception):
+    """An error that was captured during recording, raised again on replay."""
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Wraps another adapter and writes every request/response pair to a file.
+
+    Each line holds one JSON object with the request, its response (or the
+    error it raised), the offset from the start of the recording and how
+    long it took. The appSecret is masked in recorded URLs and the app key in
+    recorded bodies and responses (e.g. terminalAppId). Files ending in .gz
+    are gzip compressed.
+
+    Example:
+        recorder = RecordingAdapter(create_adapter(headers=DEFAULT_HEADERS), "session.jsonl.gz")
+        async with Cocoro(app_secret, app_key, adapter=recorder) as cocoro:
+            await cocoro.login()
+            await cocoro.query_devices()
+    """
+
+    def __init__(self, inner: HTTPAdapter, path: str):
+        self.inner = inner
+        self.path = path
+        self._file = _open(path, "w")
+        self._started = time.monotonic()
+
+    async def _record(self, method: str, url: str, body: Optional[Any], request: Any) -> Dict[str, Any]:
+        started = time.monotonic()
+        entry: Dict[str, Any] = {
+            "t": round(started - self._started, 6),
+            "method": method,
+            "url": _normalize_url(url),
+            "body": _normalize_body(body),
+        }
+        try:
+            response = await request
+        except Exception as e:
+            entry["elapsed"] = round(time.monotonic() - started, 6)
+            entry["error"] = f"{type(e).__name__}: {e}"
+            self._write(entry)
+            raise
+
+        entry["elapsed"] = round(time.monotonic() - started, 6)
+        entry["response"] = _normalize_body(response)
+        self._write(entry)
+        return response
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        self._file.write("\n")
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self._record("GET", url, None, self.inner.get(url, headers=headers))
+
+    async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self._record("POST", url, json_data, self.inner.post(url, json_data, headers=headers))
+
+    async def post_content(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self._record(
+            "POST", url, json.loads(content), self.inner.post_content(url, content, headers=headers)
+        )
+
+    @property
+    def stats(self) -> Optional[TransferStats]:
+        return self.inner.stats
+
+    async def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        await self.inner.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Serves responses from a file written by RecordingAdapter.
+
+    Requests are matched on method, URL and body, with the appSecret and app
+    key masked as when recording.
+    Repeated identical requests get the recorded responses in order; once
+    they are used up the last one is served again. `speed` scales the
+    recorded latencies: 1.0 replays at recorded speed, 10.0 ten times faster,
+    and 0 returns immediately.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self.served = 0
+        self._entries: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = {}
+        self._last: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+        with _open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = (entry["method"], entry["url"], _body_key(entry.get("body")))
+                self._entries.setdefault(key, deque()).append(entry)
+
+    @property
+    def requests(self) -> List[Tuple[str, str]]:
+        """Recorded (method, url) pairs."""
+        return [(method, url) for method, url, _ in self._entries]
+
+    async def _replay(self, method: str, url: str, body: Optional[Any]) -> Dict[str, Any]:
+        key = (method, _normalize_url(url), _body_key(_normalize_body(body)))
+        queue = self._entries.get(key)
+        if queue:
+            entry = queue.popleft()
+            self._last[key] = entry
+        elif key in self._last:
+            entry = self._last[key]
+        else:
+            raise RecordedError(f"no recorded response for {method} {key[1]}")
+
+        if self.speed > 0:
+            await asyncio.sleep(entry.get("elapsed", 0) / self.speed)
+
+        self.served += 1
+        if "error" in entry:
+            raise RecordedError(entry["error"])
+        return entry["response"]
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self._replay("GET", url, None)
+
+    async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self._replay("POST", url, json_data)
+
+    async def post_content(self, url: str, content: bytes, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self._replay("POST", url, json.loads(content))
+
+    async def close(self) -> None:
+        pass
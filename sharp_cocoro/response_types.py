@@ -109,57 +109,65 @@ class QueryBoxesResponse:
         self.box = [Box(**item) for item in box]
 
 
+def parse_properties(raw: List[Dict[str, Any]]) -> List[Property]:
+    """Build Property objects from the `property` list of a deviceProperty response."""
+    properties: List[Property] = []
+    for prop in raw:
+        prop_type = ValueType(prop["valueType"])
+        prop_data = {
+            k: v
+            for k, v in prop.items()
+            if k not in ["valueSingle", "valueBinary", "valueRange"]
+        }
+
+        if prop_type == ValueType.SINGLE:
+            prop_data["valueSingle"] = prop.get("valueSingle", [])
+            properties.append(SingleProperty(**prop_data))
+        elif prop_type == ValueType.BINARY:
+            properties.append(BinaryProperty(**prop_data))
+        elif prop_type == ValueType.RANGE:
+            prop_data["valueRange"] = prop.get("valueRange", {})
+            properties.append(RangeProperty(**prop_data))
+        else:
+            raise ValueError(f"Unknown property type: {prop_type}")
+    return properties
+
+
+def parse_statuses(raw: List[Dict[str, Any]]) -> List[PropertyStatus]:
+    """Build PropertyStatus objects from the `status` list of a deviceProperty response."""
+    statuses: List[PropertyStatus] = []
+    for status in raw:
+        status_type = ValueType(status["valueType"])
+        status_data = {
+            k: v
+            for k, v in status.items()
+            if k not in ["valueSingle", "valueBinary", "valueRange"]
+        }
+
+        if status_type == ValueType.SINGLE:
+            status_data["valueSingle"] = status.get("valueSingle", {})
+            statuses.append(SinglePropertyStatus(**status_data))
+        elif status_type == ValueType.BINARY:
+            status_data["valueBinary"] = status.get("valueBinary", {})
+            statuses.append(BinaryPropertyStatus(**status_data))
+        elif status_type == ValueType.RANGE:
+            status_data["valueRange"] = status.get("valueRange", {})
+            statuses.append(RangePropertyStatus(**status_data))
+        else:
+            raise ValueError(f"Unknown status type: {status_type}")
+    return statuses
+
+
 class QueryDevicePropertiesResponse:
     def __init__(self, device_property: Dict[str, Any]):
-        properties: List[Property] = []
-        for prop in device_property.get("property", []):
-            prop_type = ValueType(prop["valueType"])
-            prop_data = {
-                k: v
-                for k, v in prop.items()
-                if k not in ["valueSingle", "valueBinary", "valueRange"]
-            }
-
-            if prop_type == ValueType.SINGLE:
-                prop_data["valueSingle"] = prop.get("valueSingle", [])
-                properties.append(SingleProperty(**prop_data))
-            elif prop_type == ValueType.BINARY:
-                properties.append(BinaryProperty(**prop_data))
-            elif prop_type == ValueType.RANGE:
-                prop_data["valueRange"] = prop.get("valueRange", {})
-                properties.append(RangeProperty(**prop_data))
-            else:
-                raise ValueError(f"Unknown property type: {prop_type}")
-
-        statuses: List[PropertyStatus] = []
-        for status in device_property.get("status", []):
-            status_type = ValueType(status["valueType"])
-            status_data = {
-                k: v
-                for k, v in status.items()
-                if k not in ["valueSingle", "valueBinary", "valueRange"]
-            }
-
-            if status_type == ValueType.SINGLE:
-                status_data["valueSingle"] = status.get("valueSingle", {})
-                statuses.append(SinglePropertyStatus(**status_data))
-            elif status_type == ValueType.BINARY:
-                status_data["valueBinary"] = status.get("valueBinary", {})
-                statuses.append(BinaryPropertyStatus(**status_data))
-            elif status_type == ValueType.RANGE:
-                status_data["valueRange"] = status.get("valueRange", {})
-                statuses.append(RangePropertyStatus(**status_data))
-            else:
-                raise ValueError(f"Unknown status type: {status_type}")
-
         self.device_property = DeviceProperty(
             **{
                 k: v
                 for k, v in device_property.items()
                 if k not in ["property", "status"]
             },
-            property=properties,
-            status=statuses,
+            property=parse_properties(device_property.get("property", [])),
+            status=parse_statuses(device_property.get("status", [])),
         )
 
 
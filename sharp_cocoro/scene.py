@@ -0,0 +1,157 @@
+"""Declarative scenes applied to many devices at once."""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, TYPE_CHECKING
+
+from .device import Device
+from .devices.aircon.aircon import Aircon
+from .properties import DeviceType, PropertyStatus
+
+if TYPE_CHECKING:
+    from .cocoro import Cocoro
+
+
+@dataclass
+class SceneTarget:
+    """
+    Desired state for the devices this target matches.
+
+    A device matches when it is of `kind` (if given) and `match` returns
+    True for it (if given). `temperature` only applies to aircons.
+    """
+
+    statuses: List[PropertyStatus] = field(default_factory=list)
+    kind: Optional[DeviceType] = None
+    match: Optional[Callable[[Device], bool]] = None
+    temperature: Optional[float] = None
+
+    def matches(self, device: Device) -> bool:
+        if self.kind is not None and device.kind != self.kind:
+            return False
+        return self.match is None or self.match(device)
+
+
+@dataclass
+class ScenePlanItem:
+    device: Device
+    updates: Dict[str, PropertyStatus]
+
+
+@dataclass
+class SceneReport:
+    total: int = 0
+    changed: int = 0
+    skipped: int = 0
+    failed: Dict[int, BaseException] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> int:
+        return self.changed + self.skipped + len(self.failed)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+class Scene:
+    """
+    A set of targets computed into the minimal set of control requests.
+
+    Devices already in the target state are skipped, and statuses a device
+    does not have or cannot set are left out. When several targets match the
+    same device, later targets override earlier ones per statusCode.
+
+    Example:
+        scene = Scene([
+            SceneTarget(kind=DeviceType.AirCleaner, statuses=[
+                SinglePropertyStatus(PurifierStatusCode.AIR_VOLUME,
+                                     {"code": PurifierValueSingle.AIR_VOLUME_AUTO.value}),
+            ]),
+            SceneTarget(kind=DeviceType.AirCondition, temperature=26.0, statuses=[
+                SinglePropertyStatus(AirconStatusCode.OPERATION_MODE,
+                                     {"code": AirconValueSingle.OPERATION_COOL.value}),
+            ]),
+        ])
+        report = await scene.apply(cocoro, devices, concurrency=8)
+    """
+
+    def __init__(self, targets: Sequence[SceneTarget]):
+        self.targets = list(targets)
+
+    def updates_for(self, device: Device) -> Dict[str, PropertyStatus]:
+        updates: Dict[str, PropertyStatus] = {}
+        for target in self.targets:
+            if not target.matches(device):
+                continue
+
+            for status in target.statuses:
+                if not device.is_settable(status.statusCode):
+                    continue
+                current = device.get_property_status(status.statusCode)
+                if current is not None and current.value_code == status.value_code:
+                    updates.pop(status.statusCode, None)
+                    continue
+                updates[status.statusCode] = status
+
+            if target.temperature is not None and isinstance(device, Aircon):
+                temperature_status = device.temperature_status(target.temperature)
+                if not device.is_settable(temperature_status.statusCode):
+                    continue
+                try:
+                    current_temperature: Optional[float] = device.get_temperature()
+                except (AssertionError, ValueError):
+                    current_temperature = None
+                if current_temperature == target.temperature:
+                    updates.pop(temperature_status.statusCode, None)
+                else:
+                    updates[temperature_status.statusCode] = temperature_status
+
+        return updates
+
+    def plan(self, devices: Iterable[Device]) -> Dict[str, List[ScenePlanItem]]:
+        """Changes needed to reach the scene, grouped by boxId. Unchanged devices are left out."""
+        plan: Dict[str, List[ScenePlanItem]] = {}
+        for device in devices:
+            updates = self.updates_for(device)
+            if updates:
+                plan.setdefault(device.box.boxId, []).append(ScenePlanItem(device, updates))
+        return plan
+
+    async def apply(
+        self,
+        cocoro: "Cocoro",
+        devices: Sequence[Device],
+        concurrency: int = 8,
+        progress: Optional[Callable[[SceneReport], None]] = None,
+    ) -> SceneReport:
+        """
+        Apply the scene to the devices.
+
+        Boxes are processed concurrently, up to `concurrency` at a time, with
+        the devices of one box controlled one after another. Each step goes
+        through Cocoro.execute_updates and so waits for other commands to
+        the same device. `progress` is called with the running report after
+        each device.
+        """
+        plan = self.plan(devices)
+        planned = sum(len(items) for items in plan.values())
+        report = SceneReport(total=len(devices), skipped=len(devices) - planned)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_box(items: List[ScenePlanItem]) -> None:
+            async with semaphore:
+                for item in items:
+                    try:
+                        await cocoro.execute_updates(item.device, item.updates)
+                        report.changed += 1
+                    except Exception as e:
+                        report.failed[item.device.device_id] = e
+                    if progress is not None:
+                        progress(report)
+
+        await asyncio.gather(*(run_box(items) for items in plan.values()))
+        report.finished_at = time.monotonic()
+        return report
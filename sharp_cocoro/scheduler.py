@@ -0,0 +1,129 @@
+"""Priority scheduling of API requests issued by a Cocoro client."""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Request classes, lower values are served first."""
+
+    CONTROL = 0
+    CONTROL_RESULT = 1
+    REFRESH = 2
+    POLL = 3
+
+
+class RequestScheduler:
+    """
+    Grants request slots by priority class with per-class limits and aging.
+
+    Once `max_concurrency` requests are in flight, new requests wait and are
+    released highest priority first. A waiting request gains one priority
+    level for every `aging` seconds it has waited, so background polling is
+    delayed but never starved. By default polling may only use all but two
+    slots, which keeps room for commands even during a full fleet scan.
+
+    With max_concurrency=None nothing is limited (unless class_limits are
+    given), which is what a Cocoro uses when no scheduler is passed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = 8,
+        class_limits: Optional[Dict[Priority, int]] = None,
+        aging: float = 5.0,
+    ):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.aging = aging
+        if class_limits is None:
+            class_limits = (
+                {Priority.POLL: max(1, max_concurrency - 2)}
+                if max_concurrency is not None
+                else {}
+            )
+        self.class_limits = class_limits
+
+        self._active = 0
+        self._active_by_class: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._waiters: Dict[Priority, Deque[Tuple[float, "asyncio.Future[None]"]]] = {
+            p: deque() for p in Priority
+        }
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def waiting(self, priority: Optional[Priority] = None) -> int:
+        if priority is not None:
+            return len(self._waiters[priority])
+        return sum(len(q) for q in self._waiters.values())
+
+    def _at_limit(self) -> bool:
+        return self.max_concurrency is not None and self._active >= self.max_concurrency
+
+    def _has_capacity(self, priority: Priority) -> bool:
+        if self._at_limit():
+            return False
+        limit = self.class_limits.get(priority)
+        return limit is None or self._active_by_class[priority] < limit
+
+    def _grant(self, priority: Priority) -> None:
+        self._active += 1
+        self._active_by_class[priority] += 1
+
+    async def acquire(self, priority: Priority) -> None:
+        if self._has_capacity(priority) and not self.waiting():
+            self._grant(priority)
+            return
+
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append((time.monotonic(), fut))
+        # other waiters may be held back by their class limit only
+        self._wake()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # the slot was handed to us right before cancellation
+                self.release(priority)
+            raise
+
+    def release(self, priority: Priority) -> None:
+        self._active -= 1
+        self._active_by_class[priority] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while not self._at_limit():
+            now = time.monotonic()
+            best: Optional[Priority] = None
+            best_score = 0.0
+
+            for priority, queue in self._waiters.items():
+                while queue and queue[0][1].done():
+                    queue.popleft()
+                if not queue or not self._has_capacity(priority):
+                    continue
+                score = priority - (now - queue[0][0]) / self.aging if self.aging else priority
+                if best is None or score < best_score:
+                    best, best_score = priority, score
+
+            if best is None:
+                return
+
+            _, fut = self._waiters[best].popleft()
+            self._grant(best)
+            fut.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
@@ -0,0 +1,296 @@
+"""Sharded polling of large fleets across worker processes."""
+import asyncio
+import bisect
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple, cast
+
+from .properties import PropertyStatus
+from .scheduler import Priority
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys (boxIds) to shard numbers.
+
+    Uses md5 rather than hash() so every process agrees on the placement.
+    """
+
+    def __init__(self, shards: int, replicas: int = 160):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shards = shards
+        self.replicas = replicas
+
+        ring: List[Tuple[int, int]] = []
+        for shard in range(shards):
+            for replica in range(replicas):
+                ring.append((self._hash(f"{shard}:{replica}"), shard))
+        ring.sort()
+        self._hashes = [h for h, _ in ring]
+        self._owners = [s for _, s in ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def shard_for(self, key: str) -> int:
+        i = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+
+@dataclass
+class StatusDelta:
+    """Changed status values of one device. A value of None means the status disappeared."""
+
+    box_id: str
+    device_id: int
+    timestamp: float
+    changes: Dict[str, Optional[str]]
+
+
+@dataclass
+class ShardError:
+    shard: int
+    box_id: Optional[str]
+    message: str
+
+
+def _status_codes(status: List[PropertyStatus]) -> Dict[str, Optional[str]]:
+    return {s.statusCode: s.value_code for s in status}
+
+
+def _diff(
+    old: Dict[str, Optional[str]], new: Dict[str, Optional[str]]
+) -> Dict[str, Optional[str]]:
+    changes = {
+        code: value
+        for code, value in new.items()
+        if code not in old or old[code] != value
+    }
+    for code in old.keys() - new.keys():
+        changes[code] = None
+    return changes
+
+
+async def _poll_shard(
+    shard: int,
+    shards: int,
+    replicas: int,
+    credentials: Dict[str, str],
+    interval: float,
+    box_refresh_interval: float,
+    conn: Connection,
+) -> None:
+    from .cocoro import Cocoro
+
+    ring = HashRing(shards, replicas)
+    last: Dict[int, Dict[str, Optional[str]]] = {}
+    boxes: List[Any] = []
+    boxes_fetched_at = 0.0
+
+    async with Cocoro(
+        app_secret=credentials["app_secret"],
+        app_key=credentials["app_key"],
+        service_name=credentials["service_name"],
+    ) as cocoro:
+        await cocoro.login()
+
+        while not conn.poll():
+            started = time.monotonic()
+            messages: List[Tuple[Any, ...]] = []
+
+            try:
+                if not boxes or started - boxes_fetched_at >= box_refresh_interval:
+                    boxes = [
+                        box
+                        for box in await cocoro.query_boxes()
+                        if ring.shard_for(box.boxId) == shard
+                    ]
+                    boxes_fetched_at = started
+            except Exception as e:
+                messages.append(("error", shard, None, repr(e)))
+
+            results = await asyncio.gather(
+                *(
+                    cocoro.query_box_properties(box, priority=Priority.POLL)
+                    for box in boxes
+                ),
+                return_exceptions=True,
+            )
+            now = time.time()
+            for box, res in zip(boxes, results):
+                if isinstance(res, BaseException):
+                    messages.append(("error", shard, box.boxId, repr(res)))
+                    continue
+
+                device_id = box.echonetData[0].deviceId
+                current = _status_codes(cast(List[PropertyStatus], res["status"]))
+                changes = _diff(last.get(device_id, {}), current)
+                last[device_id] = current
+                if changes:
+                    messages.append(("delta", box.boxId, device_id, now, changes))
+
+            if messages:
+                # one send per cycle keeps pickling overhead low
+                conn.send(messages)
+
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+
+def _worker_main(
+    shard: int,
+    shards: int,
+    replicas: int,
+    credentials: Dict[str, str],
+    interval: float,
+    box_refresh_interval: float,
+    conn: Connection,
+) -> None:
+    try:
+        asyncio.run(
+            _poll_shard(
+                shard, shards, replicas, credentials, interval, box_refresh_interval, conn
+            )
+        )
+    except Exception as e:
+        try:
+            conn.send([("error", shard, None, repr(e))])
+        except (BrokenPipeError, OSError):
+            # the parent is gone or stopped listening
+            pass
+    finally:
+        conn.close()
+
+
+class ShardedPoller:
+    """
+    Poll a fleet from several worker processes.
+
+    Boxes are assigned to workers by consistent hashing on their boxId. Each
+    worker logs in with its own Cocoro session, polls its boxes, and sends
+    back only the status values that changed since its previous poll.
+    The last `max_errors` errors reported by the workers are kept in
+    `errors`.
+
+    Example:
+        poller = ShardedPoller(app_secret, app_key, workers=4, interval=30)
+        poller.start()
+        try:
+            async for delta in poller.deltas():
+                print(delta.device_id, delta.changes)
+        finally:
+            poller.stop()
+    """
+
+    def __init__(
+        self,
+        app_secret: str,
+        app_key: str,
+        service_name: str = "iClub",
+        workers: Optional[int] = None,
+        interval: float = 30.0,
+        box_refresh_interval: float = 300.0,
+        replicas: int = 160,
+        max_errors: int = 1000,
+    ):
+        self.credentials = {
+            "app_secret": app_secret,
+            "app_key": app_key,
+            "service_name": service_name,
+        }
+        self.workers = workers or os.cpu_count() or 1
+        self.interval = interval
+        self.box_refresh_interval = box_refresh_interval
+        self.replicas = replicas
+        self.ring = HashRing(self.workers, replicas)
+        self.errors: Deque[ShardError] = deque(maxlen=max_errors)
+        self._processes: List[Any] = []
+        self._conns: List[Connection] = []
+        # _receive runs in an executor thread, stop() on the event loop
+        self._conns_lock = threading.Lock()
+
+    def shard_for(self, box_id: str) -> int:
+        return self.ring.shard_for(box_id)
+
+    @property
+    def running(self) -> bool:
+        return any(p.is_alive() for p in self._processes)
+
+    def start(self) -> None:
+        if self._processes:
+            raise RuntimeError("poller is already running")
+
+        # spawn avoids forking a process that has a running event loop
+        ctx = multiprocessing.get_context("spawn")
+        for shard in range(self.workers):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker_main,
+                args=(
+                    shard,
+                    self.workers,
+                    self.replicas,
+                    self.credentials,
+                    self.interval,
+                    self.box_refresh_interval,
+                    child_conn,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._processes.append(process)
+            self._conns.append(parent_conn)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.send("stop")
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for conn in conns:
+            conn.close()
+        self._processes = []
+
+    def _receive(self, timeout: float) -> List[StatusDelta]:
+        deltas: List[StatusDelta] = []
+        # held while waiting, so stop() cannot close a connection in use;
+        # it waits at most `timeout` for the lock
+        with self._conns_lock:
+            received: List[List[Tuple[Any, ...]]] = []
+            for conn in wait(self._conns, timeout):
+                conn = cast(Connection, conn)
+                try:
+                    received.append(conn.recv())
+                except EOFError:
+                    self._conns.remove(conn)
+
+        for messages in received:
+            for message in messages:
+                if message[0] == "delta":
+                    _, box_id, device_id, timestamp, changes = message
+                    deltas.append(StatusDelta(box_id, device_id, timestamp, changes))
+                else:
+                    _, shard, box_id, error = message
+                    self.errors.append(ShardError(shard, box_id, error))
+        return deltas
+
+    async def deltas(self, poll_timeout: float = 1.0) -> AsyncIterator[StatusDelta]:
+        """Yield status deltas from all workers until they stop."""
+        loop = asyncio.get_running_loop()
+        while self._conns:
+            for delta in await loop.run_in_executor(None, self._receive, poll_timeout):
+                yield delta
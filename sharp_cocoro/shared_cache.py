@@ -0,0 +1,307 @@
+"""Status cache in a local SQLite database, shared between processes."""
+import dataclasses
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .device import Device
+from .devices.registry import build_device
+from .encoding import dumps, loads
+from .properties import PropertyStatus
+from .response_types import Box, parse_properties, parse_statuses
+
+if TYPE_CHECKING:
+    from .cocoro import Cocoro
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS boxes (
+    box_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS devices (
+    device_id INTEGER PRIMARY KEY,
+    box_id TEXT NOT NULL,
+    properties BLOB NOT NULL,
+    status BLOB NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS writer (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    owner TEXT NOT NULL,
+    heartbeat REAL NOT NULL
+);
+"""
+
+
+class SharedStatusCache:
+    """
+    Box metadata and device status in a SQLite database in WAL mode.
+
+    One process polls the API and writes (usually by attaching the cache to
+    its Cocoro, so every status change is stored), any number of processes
+    on the same host read from the same file concurrently without blocking
+    the writer. Readers only decode a device's status again when its
+    version changed since their last read.
+
+    Status changes of an attached Cocoro are written by a background thread,
+    so a locked database never blocks the event loop. Changes that pile up
+    while a write is in progress are stored together in one transaction.
+    Call flush() to wait until everything seen so far is written.
+
+    Example (writer):
+        cache = SharedStatusCache("/var/run/cocoro.db")
+        cache.attach(cocoro)
+        cache.write_boxes(await cocoro.query_boxes())
+        await cocoro.query_devices()
+
+    Example (reader):
+        cache = SharedStatusCache("/var/run/cocoro.db")
+        status = cache.status(device_id, max_age=120)
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.owner = f"{os.getpid()}:{id(self)}"
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._cocoro: Optional["Cocoro"] = None
+        # last written status per device, to skip writes that change nothing
+        self._written: Dict[int, bytes] = {}
+        # decoded status per device, keyed by version
+        self._decoded: Dict[int, Tuple[int, List[PropertyStatus]]] = {}
+        # devices waiting for the writer thread, None stops it
+        self._pending: "queue.Queue[Optional[Device]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._write_error: Optional[BaseException] = None
+        self._closed = False
+
+    def close(self) -> None:
+        """Write the pending status changes and close the database, later changes are ignored."""
+        if self._closed:
+            return
+        self._closed = True
+        self.detach()
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
+        self._conn.close()
+
+    # writer side
+
+    def attach(self, cocoro: "Cocoro") -> None:
+        """Store every status change seen by `cocoro`."""
+        self.detach()
+        self._cocoro = cocoro
+        cocoro.add_status_listener(self.on_status)
+
+    def detach(self) -> None:
+        if self._cocoro is not None:
+            self._cocoro.remove_status_listener(self.on_status)
+            self._cocoro = None
+
+    def claim_writer(self, ttl: float = 30.0) -> bool:
+        """
+        Try to become (or stay) the single writer. Call this periodically.
+
+        Returns True while this instance holds the role. Another process
+        can take over once `ttl` seconds passed without a heartbeat.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT owner, heartbeat FROM writer WHERE id = 1").fetchone()
+                if row is None or row[0] == self.owner or row[1] < now - ttl:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO writer (id, owner, heartbeat) VALUES (1, ?, ?)",
+                        (self.owner, now),
+                    )
+                    claimed = True
+                else:
+                    claimed = False
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def on_status(self, device: Device, previous: Optional[List[PropertyStatus]]) -> None:
+        # runs on the event loop, the write itself happens in the writer thread
+        if self._closed:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._run_writer, name="cocoro-shared-cache", daemon=True
+            )
+            self._writer.start()
+        self._pending.put(device)
+
+    def flush(self) -> None:
+        """
+        Wait until all status changes passed to on_status are written.
+
+        Raises the error of a failed background write, if there was one.
+        """
+        self._pending.join()
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def _run_writer(self) -> None:
+        while True:
+            first = self._pending.get()
+            items = [first]
+            # status and box lists are replaced, never mutated, so the devices
+            # can be read here while the event loop keeps updating them
+            while True:
+                try:
+                    items.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            latest = {d.device_id: d for d in items if d is not None}
+            try:
+                self._write_devices(list(latest.values()))
+            except BaseException as e:
+                # raised again by flush(), logged here in case nobody calls it
+                logger.exception("writing status to %s failed", self.path)
+                self._write_error = e
+            finally:
+                for _ in items:
+                    self._pending.task_done()
+            if None in items:
+                return
+
+    def write_boxes(self, boxes: Iterable[Box]) -> None:
+        """Replace the stored boxes. Devices of boxes that are gone are removed too."""
+        now = time.time()
+        rows = [(box.boxId, dumps(dataclasses.asdict(box)), now) for box in boxes]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM boxes")
+                self._conn.executemany(
+                    "INSERT INTO boxes (box_id, data, updated_at) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    "DELETE FROM devices WHERE box_id NOT IN (SELECT box_id FROM boxes)"
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def write_device(self, device: Device) -> None:
+        """Write one device right away, blocking until it is stored."""
+        self._write_devices([device])
+
+    def _write_devices(self, devices: List[Device]) -> None:
+        with self._lock:
+            changed = []
+            for device in devices:
+                status = dumps([s.to_map() for s in device.status])
+                if self._written.get(device.device_id) != status:
+                    changed.append((device, status))
+            if not changed:
+                return
+
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for device, status in changed:
+                    # the box is usually there already, but a device can be seen before write_boxes()
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO boxes (box_id, data, updated_at) VALUES (?, ?, ?)",
+                        (device.box.boxId, dumps(dataclasses.asdict(device.box)), now),
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO devices"
+                        " (device_id, box_id, properties, status, version, updated_at)"
+                        " VALUES (?, ?, ?, ?,"
+                        " COALESCE((SELECT version FROM devices WHERE device_id = ?), 0) + 1, ?)",
+                        (
+                            device.device_id,
+                            device.box.boxId,
+                            dumps([dataclasses.asdict(p) for p in device.properties]),
+                            status,
+                            device.device_id,
+                            now,
+                        ),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            for device, status in changed:
+                self._written[device.device_id] = status
+
+    # reader side
+
+    def boxes(self) -> List[Box]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM boxes ORDER BY box_id").fetchall()
+        return [Box(**loads(data)) for (data,) in rows]
+
+    def updated_at(self, device_id: int) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated_at FROM devices WHERE device_id = ?", (device_id,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def status(self, device_id: int, max_age: Optional[float] = None) -> Optional[List[PropertyStatus]]:
+        """
+        The stored status of a device, or None if it is unknown or, with
+        max_age, older than max_age seconds.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, updated_at, status FROM devices WHERE device_id = ?",
+                (device_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        version, updated_at, data = row
+        if max_age is not None and updated_at < time.time() - max_age:
+            return None
+
+        with self._lock:
+            decoded = self._decoded.get(device_id)
+        if decoded is None or decoded[0] != version:
+            decoded = (version, parse_statuses(loads(data)))
+            with self._lock:
+                self._decoded[device_id] = decoded
+        return list(decoded[1])
+
+    def devices(self, max_age: Optional[float] = None) -> List[Device]:
+        """Build devices from the stored boxes, properties and status."""
+        query = (
+            "SELECT b.data, d.properties, d.status FROM devices d"
+            " JOIN boxes b ON b.box_id = d.box_id"
+        )
+        params: Tuple[float, ...] = ()
+        if max_age is not None:
+            query += " WHERE d.updated_at >= ?"
+            params = (time.time() - max_age,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY d.device_id", params).fetchall()
+
+        return [
+            build_device(Box(**loads(box)), parse_properties(loads(properties)), parse_statuses(loads(status)))
+            for box, properties, status in rows
+        ]
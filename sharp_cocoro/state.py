@@ -1,3 +1,9 @@
+from functools import lru_cache
+
+# Command template for fan direction updates, the other fields must stay intact
+FAN_DIRECTION_TEMPLATE = "c20000000000c000000000000000000000000000000000000000000000000000000000000000000000000000000000000101000000000000000000000000000000000000000000000000000000000000"
+
+
 class State8:
     def __init__(self, state: str = '0' * 160):
         self.state = state
@@ -44,3 +50,41 @@ class State8:
         s[97] = decimal_value[1]
         
         self.state = ''.join(s)
+
+
+def temperature_command(t: float) -> str:
+    """Encoded State8 for a temperature update, built once per half degree."""
+    # the encoding only uses the temperature in whole half degrees
+    return _temperature_command(int(t * 2))
+
+
+@lru_cache(maxsize=256)
+def _temperature_command(half_degrees: int) -> str:
+    s8 = State8()
+    s8.temperature = half_degrees / 2
+    return s8.state
+
+
+@lru_cache(maxsize=32)
+def fan_direction_command(fan_state: int) -> str:
+    """Encoded State8 for a fan direction update, built once per direction."""
+    s8 = State8(FAN_DIRECTION_TEMPLATE)
+    s8.fan_direction = fan_state
+    return s8.state
+
+
+def command_applied(command: str, state: str) -> bool:
+    """
+    Whether the State8 `state` reports what a temperature or fan direction
+    command set. Other commands have to match the state exactly.
+    """
+    try:
+        sent = State8(command)
+        current = State8(state)
+        if command == temperature_command(sent.temperature):
+            return current.temperature == sent.temperature
+        if command == fan_direction_command(sent.fan_direction):
+            return current.fan_direction == sent.fan_direction
+    except (ValueError, IndexError):
+        pass
+    return command == state
@@ -0,0 +1,151 @@
+"""Incremental parsing of JSON responses that arrive in chunks."""
+import codecs
+import json
+from typing import Any, List
+
+_WHITESPACE = " \t\r\n"
+# characters that may continue a number cut at the end of a chunk, e.g. "2." or "1e"
+_NUMBER_CHARS = "0123456789+-.eE"
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+# parser states
+_START = 0
+_KEY = 1
+_VALUE = 2
+_ARRAY_START = 3
+_ITEM = 4
+_DONE = 5
+
+
+class JSONArrayStream:
+    """
+    Extracts the items of one array member of a top-level JSON object,
+    e.g. the boxes of `{"box": [...]}`, while the body is still arriving.
+
+    Only the text of the item currently being received is buffered, so
+    memory is bounded by the largest item rather than the whole body. Other
+    members of the object are skipped, anything after the array is ignored.
+
+    Example:
+        parser = JSONArrayStream("box")
+        async for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+        parser.close()
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = _START
+        self._final = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add a chunk of the body, returns the items completed by it."""
+        if self._state == _DONE:
+            return []
+        self._buf = self._buf[self._pos:] + self._text.decode(chunk, final=self._final)
+        self._pos = 0
+        items: List[Any] = []
+        while self._step(items):
+            pass
+        return items
+
+    def close(self) -> List[Any]:
+        """Signal the end of the body. Raises ValueError if the array was not complete."""
+        self._final = True
+        items = self.feed(b"")
+        if self._state != _DONE:
+            raise ValueError(f"response ended before the '{self.key}' list was complete")
+        return items
+
+    def _skip_whitespace(self) -> None:
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+
+    def _decode(self) -> Any:
+        """Decode the value at the current position, raises IndexError if it is incomplete and ValueError if it is invalid."""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError as err:
+            if self._final or not _truncated(err):
+                raise ValueError("invalid JSON in response") from None
+            raise IndexError
+        # a number or literal at the end of the buffer may continue in the next chunk
+        if not self._final and not isinstance(value, (dict, list, str)) and _is_tail(self._buf[end:]):
+            raise IndexError
+        self._pos = end
+        return value
+
+    def _step(self, items: List[Any]) -> bool:
+        self._skip_whitespace()
+        if self._pos >= len(self._buf) or self._state == _DONE:
+            return False
+        char = self._buf[self._pos]
+        start = self._pos
+
+        try:
+            if self._state == _START:
+                if char != "{":
+                    raise ValueError("expected a JSON object")
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    raise ValueError(f"response has no '{self.key}' list")
+                else:
+                    key = self._decode()
+                    self._skip_whitespace()
+                    if self._pos >= len(self._buf):
+                        raise IndexError
+                    if self._buf[self._pos] != ":":
+                        raise ValueError("expected ':' after an object key")
+                    self._pos += 1
+                    self._state = _ARRAY_START if key == self.key else _VALUE
+            elif self._state == _VALUE:
+                self._decode()
+                self._state = _KEY
+            elif self._state == _ARRAY_START:
+                if char != "[":
+                    raise ValueError(f"'{self.key}' is not a list")
+                self._pos += 1
+                self._state = _ITEM
+            elif self._state == _ITEM:
+                if char == "]":
+                    self._pos += 1
+                    self._state = _DONE
+                elif char == ",":
+                    self._pos += 1
+                else:
+                    items.append(self._decode())
+        except IndexError:
+            # incomplete, wait for the next chunk
+            self._pos = start
+            return False
+        return True
+
+
+def _is_tail(rest: str) -> bool:
+    """Whether rest may be the start of a number or literal, or what follows a number."""
+    return not rest.strip(_NUMBER_CHARS) or any(literal.startswith(rest) for literal in _LITERALS)
+
+
+def _truncated(err: json.JSONDecodeError) -> bool:
+    """Whether decoding failed because the text ends too early, rather than being invalid."""
+    rest = err.doc[err.pos:]
+    if err.msg.startswith("Unterminated string"):
+        return True
+    if err.msg.startswith("Invalid \\uXXXX escape"):
+        return len(rest) < 5
+    return _is_tail(rest)
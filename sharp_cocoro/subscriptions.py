@@ -0,0 +1,213 @@
+"""Async change streams for device status."""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Union
+
+from .device import Device
+from .properties import PropertyStatus, enum_to_str
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    MERGE = "merge"
+
+
+@dataclass
+class ChangeEvent:
+    device_id: int
+    status_code: str
+    old: Optional[PropertyStatus]
+    new: Optional[PropertyStatus]
+    timestamp: float
+
+
+class Subscription:
+    """
+    Bounded queue of change events, consumed with `async for`.
+
+    When the queue is full, DROP_OLDEST discards the oldest event and
+    DROP_NEWEST the incoming one. MERGE keeps at most one event per status
+    code, folding repeated changes into one (first old value, latest new
+    value), and only drops the oldest code when more distinct codes than
+    maxsize are pending. `dropped` counts discarded events.
+    """
+
+    def __init__(
+        self,
+        hub: "SubscriptionHub",
+        device_id: Optional[int],
+        status_codes: Optional[FrozenSet[str]],
+        maxsize: int,
+        policy: OverflowPolicy,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.device_id = device_id
+        self.status_codes = status_codes
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._hub = hub
+        self._events: Deque[ChangeEvent] = deque()
+        self._merged: "OrderedDict[str, ChangeEvent]" = OrderedDict()
+        self._waiter: Optional["asyncio.Future[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._merged) if self.policy == OverflowPolicy.MERGE else len(self._events)
+
+    def wants(self, status_code: str) -> bool:
+        return self.status_codes is None or status_code in self.status_codes
+
+    def _push(self, event: ChangeEvent) -> None:
+        if self.closed:
+            return
+
+        if self.policy == OverflowPolicy.MERGE:
+            key = f"{event.device_id}:{event.status_code}"
+            queued = self._merged.get(key)
+            if queued is not None:
+                queued.new = event.new
+                queued.timestamp = event.timestamp
+            else:
+                if len(self._merged) >= self.maxsize:
+                    self._merged.popitem(last=False)
+                    self.dropped += 1
+                self._merged[key] = event
+        elif len(self._events) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                return
+            self._events.popleft()
+            self._events.append(event)
+        else:
+            self._events.append(event)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _pop(self) -> Optional[ChangeEvent]:
+        if self.policy == OverflowPolicy.MERGE:
+            if self._merged:
+                return self._merged.popitem(last=False)[1]
+        elif self._events:
+            return self._events.popleft()
+        return None
+
+    async def get(self) -> ChangeEvent:
+        """Wait for the next event. Raises StopAsyncIteration once closed and drained."""
+        while True:
+            event = self._pop()
+            if event is not None:
+                return event
+            if self.closed:
+                raise StopAsyncIteration
+
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        return await self.get()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._hub._remove(self)
+        self._wake()
+
+
+class SubscriptionHub:
+    """
+    Routes status changes to the subscriptions interested in them.
+
+    Subscriptions are indexed by device id, so a status update only costs
+    work for the subscribers of that device (plus fleet-wide ones). The
+    first status seen for a device is its baseline and produces no events.
+    """
+
+    def __init__(self) -> None:
+        self._by_device: Dict[int, Set[Subscription]] = {}
+        self._all: Set[Subscription] = set()
+        self._last: Dict[int, Dict[str, PropertyStatus]] = {}
+
+    def __len__(self) -> int:
+        return len(self._all) + sum(len(s) for s in self._by_device.values())
+
+    def subscribe(
+        self,
+        device_id: Optional[int] = None,
+        status_codes: Optional[Iterable[Union[str, Enum]]] = None,
+        maxsize: int = 100,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> Subscription:
+        codes = (
+            frozenset(str(enum_to_str(c)) for c in status_codes)
+            if status_codes is not None
+            else None
+        )
+        sub = Subscription(self, device_id, codes, maxsize, policy)
+        if device_id is None:
+            self._all.add(sub)
+        else:
+            self._by_device.setdefault(device_id, set()).add(sub)
+        return sub
+
+    def _remove(self, sub: Subscription) -> None:
+        if sub.device_id is None:
+            self._all.discard(sub)
+            return
+
+        subs = self._by_device.get(sub.device_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._by_device[sub.device_id]
+            self._last.pop(sub.device_id, None)
+
+    def on_status(self, device: Device, previous: Optional[List[PropertyStatus]]) -> None:
+        subs = self._by_device.get(device.device_id, set())
+        if not subs and not self._all:
+            return
+
+        current = {s.statusCode: s for s in device.status}
+        if previous is not None:
+            old = {s.statusCode: s for s in previous}
+        else:
+            old = self._last.get(device.device_id, {})
+            if not old:
+                self._last[device.device_id] = current
+                return
+        self._last[device.device_id] = current
+
+        now = time.time()
+        for code in current.keys() | old.keys():
+            before = old.get(code)
+            after = current.get(code)
+            if before == after:
+                continue
+            event_for = [sub for sub in (*subs, *self._all) if sub.wants(code)]
+            for sub in event_for:
+                sub._push(ChangeEvent(device.device_id, code, before, after, now))
+
+    def on_removed(self, device_id: int) -> None:
+        """Forget the last status of a device that vanished from the account."""
+        self._last.pop(device_id, None)
+
+    def close(self) -> None:
+        for sub in [*self._all, *(s for subs in self._by_device.values() for s in subs)]:
+            sub.close()
@@ -0,0 +1,139 @@
+"""Blocking facade over Cocoro for code that is not async."""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Dict, List, Optional, Sequence, TypeVar, Union
+
+from .cocoro import Cocoro
+from .device import Device
+from .properties import Property, PropertyStatus
+from .response_types import Box, ControlResultResponse
+
+T = TypeVar("T")
+
+
+class CocoroSync:
+    """
+    Synchronous wrapper running a persistent Cocoro on a background event loop.
+
+    One daemon thread owns the event loop and the HTTP client, so connections
+    are reused across calls. Methods block until the result is available and
+    may be called concurrently from any number of threads.
+
+    Example:
+        with CocoroSync(app_secret=app_secret, app_key=app_key) as cocoro:
+            cocoro.login()
+            devices = cocoro.query_devices()
+            devices[0].queue_power_on()
+            cocoro.execute_queued_updates(devices[0])
+    """
+
+    def __init__(
+        self,
+        app_secret: str,
+        app_key: str,
+        service_name: str = "iClub",
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            timeout: Default number of seconds to wait for a call, None waits forever
+            **kwargs: Passed on to Cocoro (e.g. adapter)
+        """
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="cocoro-sync", daemon=True
+        )
+        self._thread.start()
+
+        async def create() -> Cocoro:
+            return Cocoro(app_secret, app_key, service_name=service_name, **kwargs)
+
+        self.cocoro: Cocoro = self._call(create())
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _call(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("CocoroSync cannot be called from its own event loop")
+        if self._loop.is_closed():
+            coro.close()
+            raise RuntimeError("CocoroSync is closed")
+
+        future: "concurrent.futures.Future[T]" = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def __enter__(self) -> "CocoroSync":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self._call(self.cocoro.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.cocoro.is_authenticated
+
+    def login(self) -> Dict[str, str]:
+        return self._call(self.cocoro.login())
+
+    def query_boxes(self) -> List[Box]:
+        return self._call(self.cocoro.query_boxes())
+
+    def query_box_properties(
+        self, box: Box
+    ) -> Dict[str, Union[List[Property], List[PropertyStatus]]]:
+        return self._call(self.cocoro.query_box_properties(box))
+
+    def query_devices(self) -> Sequence[Device]:
+        return self._call(self.cocoro.query_devices())
+
+    def refresh_device(self, device: Device) -> Device:
+        return self._call(self.cocoro.refresh_device(device))
+
+    def fetch_device(self, device: Device) -> Device:
+        return self._call(self.cocoro.fetch_device(device))
+
+    def execute_queued_updates(self, device: Device) -> Dict[str, Any]:
+        return self._call(self.cocoro.execute_queued_updates(device))
+
+    def execute_updates(
+        self, device: Device, updates: Dict[str, PropertyStatus]
+    ) -> Dict[str, Any]:
+        return self._call(self.cocoro.execute_updates(device, updates))
+
+    def check_control_results(
+        self, device: Device, control_ids: List[str]
+    ) -> ControlResultResponse:
+        return self._call(self.cocoro.check_control_results(device, control_ids))
+
+    def wait_for_control_completion(
+        self,
+        device: Device,
+        control_ids: List[str],
+        timeout: float = 30.0,
+        poll_interval: float = 1.0,
+    ) -> ControlResultResponse:
+        return self._call(
+            self.cocoro.wait_for_control_completion(
+                device, control_ids, timeout=timeout, poll_interval=poll_interval
+            )
+        )
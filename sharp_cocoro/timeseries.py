@@ -0,0 +1,218 @@
+"""Fixed-size in-memory history of device sensor readings."""
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type, TYPE_CHECKING, cast
+
+from .device import Device
+from .devices.aircon.aircon import Aircon
+from .devices.purifier.purifier import Purifier
+from .properties import PropertyStatus
+
+if TYPE_CHECKING:
+    from .cocoro import Cocoro
+
+
+@dataclass
+class WindowStats:
+    count: int
+    min: float
+    max: float
+    mean: float
+
+
+class RingBuffer:
+    """
+    Array-backed ring buffer of (timestamp, value) samples.
+
+    Appending is O(1) and never allocates once the buffer is full; the oldest
+    sample is overwritten. Timestamps are expected to be non-decreasing, which
+    lets windowed queries find their start with a binary search.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, value: float) -> None:
+        if self._size < self.capacity:
+            i = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            i = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._times[i] = timestamp
+        self._values[i] = value
+
+    def _physical(self, n: int) -> int:
+        return (self._start + n) % self.capacity
+
+    def _first_at_or_after(self, timestamp: float) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._times[self._physical(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, since: Optional[float], until: Optional[float]) -> Tuple[int, int]:
+        lo = 0 if since is None else self._first_at_or_after(since)
+        hi = self._size if until is None else self._first_at_or_after(until)
+        return lo, hi
+
+    def items(
+        self, since: Optional[float] = None, until: Optional[float] = None
+    ) -> Iterator[Tuple[float, float]]:
+        """Samples in chronological order with since <= timestamp < until."""
+        lo, hi = self._range(since, until)
+        for n in range(lo, hi):
+            i = self._physical(n)
+            yield self._times[i], self._values[i]
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self._size:
+            return None
+        i = self._physical(self._size - 1)
+        return self._times[i], self._values[i]
+
+    def stats(
+        self, since: Optional[float] = None, until: Optional[float] = None
+    ) -> Optional[WindowStats]:
+        """Min/max/mean over a time window, or None if it holds no samples."""
+        lo, hi = self._range(since, until)
+        if lo >= hi:
+            return None
+
+        lowest = math.inf
+        highest = -math.inf
+        total = 0.0
+        for n in range(lo, hi):
+            v = self._values[self._physical(n)]
+            if v < lowest:
+                lowest = v
+            if v > highest:
+                highest = v
+            total += v
+        return WindowStats(count=hi - lo, min=lowest, max=highest, mean=total / (hi - lo))
+
+    def downsample(
+        self,
+        bucket: float,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[Tuple[float, WindowStats]]:
+        """Aggregate samples into fixed-width time buckets, keyed by bucket start."""
+        if bucket <= 0:
+            raise ValueError("bucket must be positive")
+
+        out: List[Tuple[float, WindowStats]] = []
+        current: Optional[float] = None
+        count = 0
+        lowest = highest = total = 0.0
+
+        for t, v in self.items(since, until):
+            start = math.floor(t / bucket) * bucket
+            if start != current:
+                if current is not None:
+                    out.append((current, WindowStats(count, lowest, highest, total / count)))
+                current, count, lowest, highest, total = start, 0, v, v, 0.0
+            count += 1
+            lowest = min(lowest, v)
+            highest = max(highest, v)
+            total += v
+
+        if current is not None:
+            out.append((current, WindowStats(count, lowest, highest, total / count)))
+        return out
+
+
+MetricGetter = Callable[[Device], float]
+
+DEFAULT_METRICS: Dict[Type[Device], Dict[str, MetricGetter]] = {
+    Purifier: {
+        "pm25": lambda d: float(cast(Purifier, d).get_pm25()),
+        "humidity": lambda d: float(cast(Purifier, d).get_humidity()),
+        "room_temperature": lambda d: float(cast(Purifier, d).get_room_temperature()),
+    },
+    Aircon: {
+        "room_temperature": lambda d: float(cast(Aircon, d).get_room_temperature()),
+    },
+}
+
+
+class TimeSeriesStore:
+    """
+    Ring buffers per device and metric, fed from status refreshes.
+
+    Example:
+        store = TimeSeriesStore(capacity=1440)
+        store.attach(cocoro)
+        ...  # poll as usual
+        store.series(purifier.device_id, "pm25").stats(since=time.time() - 3600)
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1440,
+        metrics: Optional[Dict[Type[Device], Dict[str, MetricGetter]]] = None,
+    ):
+        self.capacity = capacity
+        self.metrics = metrics if metrics is not None else DEFAULT_METRICS
+        self._series: Dict[int, Dict[str, RingBuffer]] = {}
+
+    def attach(self, cocoro: "Cocoro") -> None:
+        """Sample every status change, and forget devices that vanish from the account."""
+        cocoro.add_status_listener(self._on_status)
+        cocoro.add_removal_listener(self.forget)
+
+    def detach(self, cocoro: "Cocoro") -> None:
+        cocoro.remove_status_listener(self._on_status)
+        cocoro.remove_removal_listener(self.forget)
+
+    def _on_status(self, device: Device, previous: Optional[List[PropertyStatus]]) -> None:
+        self.record(device)
+
+    def _metrics_for(self, device: Device) -> Dict[str, MetricGetter]:
+        for cls, getters in self.metrics.items():
+            if isinstance(device, cls):
+                return getters
+        return {}
+
+    def record(self, device: Device, timestamp: Optional[float] = None) -> None:
+        """Sample all metrics of the device. Metrics the device does not report are skipped."""
+        getters = self._metrics_for(device)
+        if not getters:
+            return
+
+        timestamp = time.time() if timestamp is None else timestamp
+        series = self._series.setdefault(device.device_id, {})
+        for name, getter in getters.items():
+            try:
+                value = getter(device)
+            except (AssertionError, KeyError, TypeError, ValueError):
+                continue
+
+            buffer = series.get(name)
+            if buffer is None:
+                buffer = series[name] = RingBuffer(self.capacity)
+            buffer.append(timestamp, value)
+
+    def series(self, device_id: int, metric: str) -> Optional[RingBuffer]:
+        return self._series.get(device_id, {}).get(metric)
+
+    def metrics_for_device(self, device_id: int) -> List[str]:
+        return list(self._series.get(device_id, {}))
+
+    def forget(self, device_id: int) -> None:
+        self._series.pop(device_id, None)
@@ -0,0 +1,119 @@
+"""Local validation of property updates against the device's own schema."""
+import math
+from decimal import Decimal, InvalidOperation
+from typing import Dict, FrozenSet, List, Optional
+
+from .properties import (
+    BinaryPropertyStatus,
+    Property,
+    PropertyStatus,
+    RangeProperty,
+    RangePropertyStatus,
+    RangePropertyType,
+    SingleProperty,
+    SinglePropertyStatus,
+    enum_to_str,
+)
+
+
+def _decimal(value: object) -> Optional[Decimal]:
+    try:
+        d = Decimal(str(enum_to_str(value)))
+    except (InvalidOperation, ValueError):
+        return None
+    return d if d.is_finite() else None
+
+
+class PropertyValidator:
+    """
+    Validator compiled once from a Property definition.
+
+    Single-value properties keep their codes as a frozenset plus name/code
+    maps in both directions, range properties their numeric bounds and step.
+    validate() raises ValueError for values the cloud would reject anyway.
+    """
+
+    __slots__ = (
+        "status_code",
+        "status_name",
+        "settable",
+        "value_type",
+        "codes",
+        "code_to_name",
+        "name_to_code",
+        "range_min",
+        "range_max",
+        "range_step",
+        "range_is_int",
+    )
+
+    def __init__(self, prop: Property):
+        self.status_code = prop.statusCode
+        self.status_name = prop.statusName
+        self.settable = prop.set
+        self.value_type = enum_to_str(prop.valueType)
+
+        self.codes: Optional[FrozenSet[str]] = None
+        self.code_to_name: Dict[str, str] = {}
+        self.name_to_code: Dict[str, str] = {}
+        if isinstance(prop, SingleProperty):
+            self.code_to_name = {v["code"]: v["name"] for v in prop.valueSingle}
+            self.name_to_code = {v["name"]: v["code"] for v in prop.valueSingle}
+            # an empty value list means the schema does not restrict the codes
+            self.codes = frozenset(self.code_to_name) or None
+
+        self.range_min: Optional[Decimal] = None
+        self.range_max: Optional[Decimal] = None
+        self.range_step: Optional[Decimal] = None
+        self.range_is_int = False
+        if isinstance(prop, RangeProperty):
+            self.range_min = _decimal(prop.valueRange.get("min"))
+            self.range_max = _decimal(prop.valueRange.get("max"))
+            step = _decimal(prop.valueRange.get("step"))
+            self.range_step = step if step is not None and step > 0 else None
+            self.range_is_int = (
+                enum_to_str(prop.valueRange.get("type")) == RangePropertyType.INT.value
+            )
+
+    def validate(self, status: PropertyStatus) -> None:
+        if not self.settable:
+            raise ValueError(f"property {self.status_name} is not settable")
+
+        if enum_to_str(status.valueType) != self.value_type:
+            raise ValueError(
+                f"property {self.status_name} expects {self.value_type}, got {enum_to_str(status.valueType)}"
+            )
+
+        code = status.value_code
+        if isinstance(status, SinglePropertyStatus):
+            if self.codes is not None and code not in self.codes:
+                raise ValueError(
+                    f"invalid value {code} for property {self.status_name}, expected one of {sorted(self.codes)}"
+                )
+        elif isinstance(status, RangePropertyStatus):
+            self._validate_range(code)
+        elif isinstance(status, BinaryPropertyStatus):
+            if not isinstance(code, str):
+                raise ValueError(f"invalid value {code} for property {self.status_name}")
+
+    def _validate_range(self, code: Optional[str]) -> None:
+        value = _decimal(code)
+        if value is None:
+            raise ValueError(f"invalid value {code} for property {self.status_name}")
+        if self.range_is_int and value != value.to_integral_value():
+            raise ValueError(f"property {self.status_name} expects an integer, got {code}")
+        if self.range_min is not None and value < self.range_min:
+            raise ValueError(f"value {code} for property {self.status_name} is below {self.range_min}")
+        if self.range_max is not None and value > self.range_max:
+            raise ValueError(f"value {code} for property {self.status_name} is above {self.range_max}")
+        if self.range_step is not None:
+            base = self.range_min if self.range_min is not None else Decimal(0)
+            steps = (value - base) / self.range_step
+            if not math.isclose(float(steps), round(steps), abs_tol=1e-9):
+                raise ValueError(
+                    f"value {code} for property {self.status_name} is not a multiple of {self.range_step}"
+                )
+
+
+def compile_validators(properties: List[Property]) -> Dict[str, PropertyValidator]:
+    return {prop.statusCode: PropertyValidator(prop) for prop in properties}
@@ -0,0 +1,117 @@
+"""Fakes shared by the tests, nothing here talks to the network."""
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from sharp_cocoro.http_adapter import HTTPAdapter
+
+PROPERTIES: List[Dict[str, Any]] = [
+    {
+        "statusName": "power",
+        "statusCode": "80",
+        "get": True,
+        "set": True,
+        "inf": False,
+        "valueType": "valueSingle",
+        "valueSingle": [{"name": "on", "code": "30"}, {"name": "off", "code": "31"}],
+    },
+    {
+        "statusName": "temperature",
+        "statusCode": "BB",
+        "get": True,
+        "set": False,
+        "inf": False,
+        "valueType": "valueRange",
+        "valueRange": {"type": "int", "min": "0", "max": "50", "step": "1", "unit": "C"},
+    },
+]
+
+
+def box_data(i: int, device_type: str = "AIR_CON") -> Dict[str, Any]:
+    """A boxInfo entry with one device, whose deviceId is `i`."""
+    return {
+        "boxId": f"box{i}",
+        "maxFlag": False,
+        "pairingFlag": False,
+        "pairedTerminalNum": 0,
+        "timezone": "",
+        "terminalAppInfo": [{"terminalAppId": "app", "appName": "app", "userNumber": 1}],
+        "echonetData": [
+            {
+                "maker": "SHARP",
+                "series": None,
+                "model": "MODEL",
+                "serialNumber": None,
+                "echonetNode": "node",
+                "echonetObject": "object",
+                "echonetAttr": "",
+                "echonetProperty": "",
+                "deviceId": i,
+                "simulPerfModeFlag": False,
+                "propertyUpdatedAt": "2024",
+                "labelData": {
+                    "id": i,
+                    "place": "living",
+                    "name": f"device {i}",
+                    "deviceType": device_type,
+                    "zipCd": "",
+                    "yomi": "",
+                    "lSubInfo": "{}",
+                },
+            }
+        ],
+    }
+
+
+def device_property(i: int = 0, power: str = "30", temperature: str = "22") -> Dict[str, Any]:
+    return {
+        "deviceId": i,
+        "echonetNode": "node",
+        "echonetObject": "object",
+        "registerLevel": 1,
+        "label": "",
+        "className": "",
+        "maker": "SHARP",
+        "series": "",
+        "model": "MODEL",
+        "place": "living",
+        "propertyUpdatedAt": "2024",
+        "property": json.loads(json.dumps(PROPERTIES)),
+        "status": [
+            {"statusCode": "80", "valueType": "valueSingle", "valueSingle": {"code": power}},
+            {"statusCode": "BB", "valueType": "valueRange", "valueRange": {"code": temperature}},
+        ],
+    }
+
+
+class FakeAdapter(HTTPAdapter):
+    """
+    Serves `boxes` boxes with one aircon each. Power per box can be changed
+    through `power`, sent control bodies are kept in `controls`.
+    """
+
+    def __init__(self, boxes: int = 3, delay: float = 0):
+        self.boxes = boxes
+        self.delay = delay
+        self.power: Dict[str, str] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.controls: List[Dict[str, Any]] = []
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        self.requests.append(("GET", url))
+        await asyncio.sleep(self.delay)
+        if "boxInfo" in url:
+            return {"box": [box_data(i) for i in range(self.boxes)]}
+        box_id = parse_qs(urlparse(url).query)["boxId"][0]
+        return {"deviceProperty": device_property(int(box_id[3:]), self.power.get(box_id, "30"))}
+
+    async def post(self, url: str, json_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        self.requests.append(("POST", url))
+        await asyncio.sleep(self.delay)
+        if "deviceControl" in url:
+            self.controls.append(json_data)
+        return {"controlList": []}
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from conftest import PROPERTIES, box_data, device_property
+
+from sharp_cocoro import commands
+from sharp_cocoro.commands import CommandBuilder
+from sharp_cocoro.devices.registry import build_device
+from sharp_cocoro.response_types import Box, parse_properties, parse_statuses
+
+
+def make_aircon(i: int, codes):
+    schema = json.loads(json.dumps(PROPERTIES))
+    schema[0]["valueSingle"] = [{"name": code, "code": code} for code in codes]
+    return build_device(Box(**box_data(i)), parse_properties(schema), parse_statuses(device_property(i)["status"]))
+
+
+def test_same_model_with_other_codes_gets_its_own_builder():
+    first = make_aircon(1, ["30", "31"])
+    second = make_aircon(2, ["30"])
+
+    assert first.command_builder is not second.command_builder
+    assert first.command_builder.single("80", "31").value_code == "31"
+    with pytest.raises(ValueError):
+        second.command_builder.single("80", "31")
+
+    # the same schema shares a builder
+    assert make_aircon(3, ["31", "30"]).command_builder is first.command_builder
+
+
+def test_new_properties_drop_the_builder():
+    device = make_aircon(1, ["30"])
+    builder = device.command_builder
+    device.properties = make_aircon(2, ["30", "31"]).properties
+    assert device.command_builder is not builder
+    assert device.command_builder.supports("80", "31")
+
+
+def test_caches_are_bounded(monkeypatch):
+    monkeypatch.setattr(commands, "MAX_CACHED_COMMANDS", 4)
+    monkeypatch.setattr(commands, "MAX_CACHED_BUILDERS", 2)
+    monkeypatch.setattr(CommandBuilder, "_schemas", CommandBuilder._schemas.copy())
+
+    builder = CommandBuilder({})
+    for value in range(10):
+        builder.encoded(builder.binary("FA", str(value)))
+        builder.single("80", str(value))
+    assert len(builder._binary) == len(builder._single) == len(builder._encoded) == 4
+
+    for i in range(5):
+        make_aircon(i, [str(i)]).command_builder
+    assert len(CommandBuilder._schemas) <= 2
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from conftest import FakeAdapter, device_property
+
+from sharp_cocoro.cocoro import Cocoro
+
+
+@pytest.mark.asyncio
+async def test_updates_queued_during_a_request_stay_queued():
+    adapter = FakeAdapter(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+    adapter.delay = 0.02
+
+    device.queue_power_off()
+    sending = asyncio.ensure_future(cocoro.execute_queued_updates(device))
+    await asyncio.sleep(0.01)
+    device.queue_power_on()
+    await sending
+
+    assert [s.value_code for s in device.property_updates.values()] == ["30"]
+    await cocoro.execute_queued_updates(device)
+    assert device.property_updates == {}
+    assert len(adapter.controls) == 2
+
+    assert await cocoro.execute_queued_updates(device) == {"controlList": []}
+    assert len(adapter.controls) == 2
+
+
+@pytest.mark.asyncio
+async def test_a_late_refresh_response_does_not_win():
+    class OutOfOrder(FakeAdapter):
+        # (delay, power) of the deviceProperty responses, in request order
+        responses = [(0, "30"), (0.05, "30"), (0, "31")]
+
+        async def get(self, url, headers=None):
+            if "boxInfo" in url:
+                return await super().get(url, headers)
+            delay, power = self.responses.pop(0)
+            await asyncio.sleep(delay)
+            return {"deviceProperty": device_property(0, power)}
+
+    cocoro = Cocoro("secret", "key", adapter=OutOfOrder(boxes=1))
+    (device,) = await cocoro.query_devices()
+    seen = []
+    cocoro.add_status_listener(lambda device, previous: seen.append(device.get_property_status("80").value_code))
+
+    await asyncio.gather(cocoro.refresh_device(device), cocoro.refresh_device(device))
+    assert device.get_property_status("80").value_code == "31"
+    assert seen == ["31"]
@@ -0,0 +1,73 @@
+import pytest
+from conftest import FakeAdapter, box_data, device_property
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.http_adapter import HTTPXAdapter
+
+httpx = pytest.importorskip("httpx")
+
+
+class Server:
+    """Answers with an ETag per body and 304 when If-None-Match still matches."""
+
+    def __init__(self):
+        self.power = "30"
+        self.not_modified = 0
+
+    def handler(self, request):
+        if "boxInfo" in request.url.path:
+            body, etag = {"box": [box_data(0)]}, '"boxes"'
+        else:
+            body, etag = {"deviceProperty": device_property(0, self.power)}, f'"{self.power}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+
+
+def make_cocoro(server):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    return Cocoro("secret", "key", adapter=HTTPXAdapter(session=client))
+
+
+@pytest.mark.asyncio
+async def test_not_modified_reuses_the_parsed_response():
+    server = Server()
+    cocoro = make_cocoro(server)
+    (box,) = await cocoro.query_boxes()
+    first = await cocoro.query_box_properties(box)
+
+    assert await cocoro.query_boxes() == [box]
+    second = await cocoro.query_box_properties(box)
+    assert server.not_modified == 2
+    assert cocoro.transfer_stats.not_modified == 2
+    assert second == first
+    # copies of the cached response
+    assert second["status"] is not first["status"]
+
+    server.power = "31"
+    (device,) = await cocoro.query_devices()
+    assert server.not_modified == 3
+    assert device.get_property_status("80").valueSingle["code"] == "31"
+
+
+@pytest.mark.asyncio
+async def test_reused_body_object_is_parsed_again():
+    class Reusing(FakeAdapter):
+        # an adapter that updates one dict in place instead of returning a new one
+        body = {"deviceProperty": device_property(0)}
+
+        async def get(self, url, headers=None):
+            if "boxInfo" in url:
+                return await super().get(url, headers)
+            self.body["deviceProperty"] = device_property(0, self.power.get("box0", "30"))
+            return self.body
+
+    adapter = Reusing(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+    assert device.get_property_status("80").valueSingle["code"] == "30"
+
+    adapter.power["box0"] = "31"
+    (device,) = await cocoro.query_devices()
+    assert device.get_property_status("80").valueSingle["code"] == "31"
@@ -0,0 +1,79 @@
+import gc
+
+import pytest
+from conftest import PROPERTIES, FakeAdapter, box_data, device_property
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.device_registry import DeviceRegistry
+from sharp_cocoro.devices.registry import build_device
+from sharp_cocoro.response_types import Box, parse_properties, parse_statuses
+
+
+def upsert(registry, i, power="30", token=None):
+    box = Box(**box_data(i))
+    return registry.upsert(
+        box, parse_properties(PROPERTIES), parse_statuses(device_property(i, power)["status"]), build_device, token
+    )
+
+
+def test_devices_are_updated_in_place():
+    registry = DeviceRegistry()
+    device, previous = upsert(registry, 1)
+    assert previous is None
+
+    same, previous = upsert(registry, 1, power="31")
+    assert same is device
+    assert previous[0].valueSingle["code"] == "30"
+    assert device.get_property_status("80").valueSingle["code"] == "31"
+
+
+def test_least_recently_updated_devices_are_only_held_weakly():
+    registry = DeviceRegistry(max_devices=2)
+    kept, _ = upsert(registry, 0)
+    for i in range(1, 4):
+        upsert(registry, i)
+    gc.collect()
+
+    # 1 was evicted and freed, 0 is still referenced here and reused
+    assert sorted(d.device_id for d in registry) == [0, 2, 3]
+    assert upsert(registry, 0)[0] is kept
+    assert 1 not in registry
+
+
+def test_retain_reports_freed_devices_too():
+    registry = DeviceRegistry(max_devices=1)
+    upsert(registry, 0)
+    upsert(registry, 1)
+    gc.collect()
+    assert 0 not in registry
+
+    assert sorted(registry.retain([])) == [0, 1]
+    assert len(registry) == 0
+
+
+def test_stale_refresh_does_not_overwrite_a_newer_one():
+    registry = DeviceRegistry()
+    device, _ = upsert(registry, 1)
+    box = Box(**box_data(1))
+    old = registry.begin_token(box)
+    new = registry.begin_token(box)
+
+    upsert(registry, 1, power="31", token=new)
+    upsert(registry, 1, power="30", token=old)
+    assert device.get_property_status("80").valueSingle["code"] == "31"
+
+
+@pytest.mark.asyncio
+async def test_vanished_devices_are_dropped():
+    adapter = FakeAdapter(boxes=3)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    removed = []
+    cocoro.add_removal_listener(removed.append)
+    devices = await cocoro.query_devices()
+
+    adapter.boxes = 2
+    again = await cocoro.query_devices()
+    assert len(again) == 2
+    assert all(a is b for a, b in zip(again, devices))
+    assert removed == [2]
+    assert 2 not in cocoro.device_registry
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+
+
+class SlowAdapter(FakeAdapter):
+    """box2 answers late, box1 fails, boxInfo is slow when `slow_boxes` is set."""
+
+    slow_boxes = False
+
+    async def get(self, url, headers=None):
+        if "boxInfo" in url and self.slow_boxes:
+            await asyncio.sleep(1)
+        if "boxId=box2" in url:
+            await asyncio.sleep(0.1)
+        if "boxId=box1" in url:
+            raise ConnectionError("reset")
+        return await super().get(url, headers)
+
+
+@pytest.mark.asyncio
+async def test_partial_results_at_the_deadline():
+    cocoro = Cocoro("secret", "key", adapter=SlowAdapter(boxes=3))
+    result = await cocoro.discover(deadline=0.05)
+
+    assert [d.device_id for d in result.devices] == [0]
+    assert [b.boxId for b in result.pending] == ["box2"]
+    assert list(result.failed) == ["box1"]
+    assert result.stale == []
+    assert not result.complete
+    assert result.stragglers is None
+
+
+@pytest.mark.asyncio
+async def test_stragglers_finish_in_the_background():
+    cocoro = Cocoro("secret", "key", adapter=SlowAdapter(boxes=3))
+    seen = []
+    cocoro.add_status_listener(lambda device, previous: seen.append(device.device_id))
+
+    result = await cocoro.discover(deadline=0.05, keep_stragglers=True)
+    late = await result.stragglers
+    assert [d.device_id for d in late.devices] == [2]
+    assert seen == [0, 2]
+
+    # the late device is served as stale while box2 is pending again
+    again = await cocoro.discover(deadline=0.05)
+    assert [d.device_id for d in again.stale] == [2]
+    assert again.stale[0] is late.devices[0]
+
+
+@pytest.mark.asyncio
+async def test_slow_box_info_falls_back_to_known_boxes():
+    adapter = SlowAdapter(boxes=3)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    adapter.slow_boxes = True
+    with pytest.raises(asyncio.TimeoutError):
+        await cocoro.discover(deadline=0.05)
+
+    adapter.slow_boxes = False
+    await cocoro.discover(deadline=0.05)
+    adapter.slow_boxes = True
+    result = await cocoro.discover(deadline=0.05)
+    assert [b.boxId for b in result.pending] == ["box0", "box1", "box2"]
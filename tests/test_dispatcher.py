@@ -0,0 +1,94 @@
+import asyncio
+import gc
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.dispatcher import CommandDispatcher
+
+
+def sent_power(control):
+    return [s["valueSingle"]["code"] for s in control["controlList"][0]["status"] if s["statusCode"] == "80"]
+
+
+@pytest.mark.asyncio
+async def test_rapid_submissions_are_coalesced():
+    adapter = FakeAdapter(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+    dispatcher = CommandDispatcher(cocoro, window=0.01)
+
+    futures = []
+    for queue in (device.queue_power_off, device.queue_power_on, device.queue_power_off):
+        queue()
+        futures.append(dispatcher.submit(device))
+    assert len(set(futures)) == 1
+    assert dispatcher.pending_devices == 1
+
+    await futures[0]
+    assert len(adapter.controls) == 1
+    assert sent_power(adapter.controls[0]) == ["31"]
+    assert device.property_updates == {}
+
+
+@pytest.mark.asyncio
+async def test_max_delay_bounds_the_debounce():
+    adapter = FakeAdapter(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+    dispatcher = CommandDispatcher(cocoro, window=0.05, max_delay=0.05)
+
+    device.queue_power_off()
+    first = dispatcher.submit(device)
+    await asyncio.sleep(0.03)
+    device.queue_power_on()
+    assert dispatcher.submit(device) is first
+    await asyncio.sleep(0.04)
+
+    # sent after max_delay, although the last submission is only 40 ms old
+    assert first.done()
+    assert sent_power(adapter.controls[0]) == ["30"]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_serialized_with_other_commands():
+    adapter = FakeAdapter(boxes=1, delay=0.01)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+    dispatcher = CommandDispatcher(cocoro, window=0)
+
+    async with device.lock:
+        device.queue_power_off()
+        future = dispatcher.submit(device)
+        await asyncio.sleep(0.02)
+        # the batch waits for the lock held by another submission
+        assert not future.done()
+        assert adapter.controls == []
+    await future
+    assert len(adapter.controls) == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_without_waiters_are_not_logged():
+    class Failing(FakeAdapter):
+        async def post(self, url, json_data, headers=None):
+            raise RuntimeError("boom")
+
+    cocoro = Cocoro("secret", "key", adapter=Failing(boxes=1))
+    (device,) = await cocoro.query_devices()
+    dispatcher = CommandDispatcher(cocoro, window=0)
+
+    unhandled = []
+    asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+    device.queue_power_off()
+    future = dispatcher.submit(device)
+    await dispatcher.flush()
+    with pytest.raises(RuntimeError):
+        future.result()
+
+    device.queue_power_on()
+    dispatcher.submit(device)
+    await dispatcher.flush()
+    gc.collect()
+    assert unhandled == []
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.encoding import encode_control_body, encode_result_body, encode_status
+from sharp_cocoro.properties import BinaryPropertyStatus, SinglePropertyStatus
+
+
+def test_control_body_matches_the_dict_encoding():
+    statuses = [SinglePropertyStatus("80", {"code": "31"}), BinaryPropertyStatus("FA", {"code": "0a\"ü"})]
+    body = encode_control_body(7, "nodeあ", "obj", [encode_status(s) for s in statuses])
+    assert json.loads(body) == {
+        "controlList": [
+            {
+                "deviceId": 7,
+                "echonetNode": "nodeあ",
+                "echonetObject": "obj",
+                "status": [s.to_map() for s in statuses],
+            }
+        ]
+    }
+
+
+def test_result_body():
+    assert json.loads(encode_result_body(["a", "b"])) == {"resultList": [{"id": "a"}, {"id": "b"}]}
+    assert json.loads(encode_result_body([])) == {"resultList": []}
+
+
+@pytest.mark.asyncio
+async def test_queued_updates_are_sent_as_one_body():
+    adapter = FakeAdapter(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+
+    device.queue_power_off()
+    await cocoro.execute_queued_updates(device)
+    device.queue_power_off()
+    await cocoro.execute_queued_updates(device)
+
+    # the second body comes from the builder's cached fragments
+    assert adapter.controls[0] == adapter.controls[1]
+    (control,) = adapter.controls[0]["controlList"]
+    assert control["deviceId"] == 0
+    assert control["status"] == [{"statusCode": "80", "valueType": "valueSingle", "valueSingle": {"code": "31"}}]
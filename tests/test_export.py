@@ -0,0 +1,104 @@
+from typing import Any, Dict, List
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from sharp_cocoro.device import Device  # noqa: E402
+from sharp_cocoro.devices.registry import build_device  # noqa: E402
+from sharp_cocoro.export import FleetExporter  # noqa: E402
+from sharp_cocoro.response_types import Box, parse_properties, parse_statuses  # noqa: E402
+
+PROPERTIES = [
+    {
+        "statusName": "power",
+        "statusCode": "80",
+        "get": True,
+        "set": True,
+        "inf": False,
+        "valueType": "valueSingle",
+        "valueSingle": [{"name": "on", "code": "30"}, {"name": "off", "code": "31"}],
+    },
+    {
+        "statusName": "temperature",
+        "statusCode": "BB",
+        "get": True,
+        "set": False,
+        "inf": False,
+        "valueType": "valueRange",
+        "valueRange": {"type": "int", "min": "0", "max": "50", "step": "1", "unit": "C"},
+    },
+]
+
+
+def make_device(i: int) -> Device:
+    box: Dict[str, Any] = dict(
+        boxId=f"box{i}",
+        maxFlag=False,
+        pairingFlag=False,
+        pairedTerminalNum=0,
+        timezone="",
+        terminalAppInfo=[{"terminalAppId": "app", "appName": "app", "userNumber": 1}],
+        echonetData=[
+            {
+                "maker": "SHARP",
+                "series": None,
+                "model": f"MODEL{i % 2}",
+                "serialNumber": None,
+                "echonetNode": "node",
+                "echonetObject": "object",
+                "echonetAttr": "",
+                "echonetProperty": "",
+                "deviceId": i,
+                "simulPerfModeFlag": False,
+                "propertyUpdatedAt": "2024",
+                "labelData": {
+                    "id": i,
+                    "place": f"room {i}",
+                    "name": f"device {i}",
+                    "deviceType": "AIR_CON",
+                    "zipCd": "",
+                    "yomi": "",
+                    "lSubInfo": "{}",
+                },
+            }
+        ],
+    )
+    status = [
+        {"statusCode": "80", "valueType": "valueSingle", "valueSingle": {"code": "30" if i % 2 else "31"}},
+        {"statusCode": "BB", "valueType": "valueRange", "valueRange": {"code": str(20 + i)}},
+    ]
+    return build_device(Box(**box), parse_properties(PROPERTIES), parse_statuses(status))
+
+
+def snapshots(devices: List[Device], count: int):
+    return [(1700000000.0 + n, devices) for n in range(count)]
+
+
+def test_ipc_with_several_batches(tmp_path):
+    # every batch sees different strings, which must not need a dictionary replacement
+    devices = [make_device(i) for i in range(5)]
+    path = str(tmp_path / "fleet.arrow")
+
+    rows = FleetExporter(batch_size=2).write_ipc(path, snapshots(devices, 3))
+
+    assert rows == 15
+    reader = pa.ipc.open_file(path)
+    assert reader.num_record_batches == 8
+    table = reader.read_all()
+    assert table.column("place").to_pylist() == [f"room {i}" for i in range(5)] * 3
+    assert table.column("status_80").to_pylist() == ["31", "30", "31", "30", "31"] * 3
+    assert table.column("status_BB").to_pylist() == [20, 21, 22, 23, 24] * 3
+
+
+def test_parquet_with_several_batches(tmp_path):
+    devices = [make_device(i) for i in range(5)]
+    path = str(tmp_path / "fleet.parquet")
+
+    rows = FleetExporter(batch_size=2).write_parquet(path, snapshots(devices, 3))
+
+    assert rows == 15
+    table = pq.read_table(path)
+    assert table.column("place").to_pylist() == [f"room {i}" for i in range(5)] * 3
+    assert table.column("model").to_pylist() == [f"MODEL{i % 2}" for i in range(5)] * 3
@@ -0,0 +1,47 @@
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.fleet import FleetIndex
+from sharp_cocoro.properties import DeviceType
+
+
+@pytest.mark.asyncio
+async def test_index_follows_status_changes():
+    adapter = FakeAdapter(boxes=3)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    index = FleetIndex()
+    index.attach(cocoro)
+
+    await cocoro.query_devices()
+    assert index.count(kind=DeviceType.AirCondition, power="30") == 3
+
+    adapter.power["box1"] = "31"
+    await cocoro.query_devices()
+    assert index.group_count("power") == {"30": 2, "31": 1}
+    assert index.mean("BB") == {None: 22.0}
+
+
+@pytest.mark.asyncio
+async def test_devices_of_vanished_boxes_are_removed():
+    adapter = FakeAdapter(boxes=3)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    index = FleetIndex()
+    index.attach(cocoro)
+    removed = []
+    cocoro.add_removal_listener(removed.append)
+
+    await cocoro.query_devices()
+    adapter.boxes = 2
+    await cocoro.query_devices()
+
+    assert removed == [2]
+    assert len(index) == 2
+    assert index.count(power="30") == 2
+    assert 2 not in index.devices
+
+    index.detach(cocoro)
+    adapter.boxes = 1
+    await cocoro.query_devices()
+    assert removed == [2, 1]
+    assert len(index) == 2
@@ -0,0 +1,74 @@
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.health import BoxQuarantinedError, HealthTracker
+
+
+def test_quarantine_after_consecutive_failures():
+    health = HealthTracker(failure_threshold=2, base_backoff=10, max_backoff=25)
+    health.record_failure("box", RuntimeError("timeout"), now=0)
+    assert not health.is_quarantined("box", now=0)
+    health.record_failure("box", RuntimeError("timeout"), now=0)
+    assert health.is_quarantined("box", now=5)
+    with pytest.raises(BoxQuarantinedError) as info:
+        health.begin("box", now=5)
+    assert info.value.retry_in == 5
+    assert health.get("box").score == 0.0
+
+
+def test_failed_probe_doubles_the_backoff_up_to_the_maximum():
+    health = HealthTracker(failure_threshold=1, base_backoff=10, max_backoff=25)
+    health.record_failure("box", RuntimeError("timeout"), now=0)
+
+    # one probe after the quarantine, others fail fast meanwhile
+    health.begin("box", now=10)
+    with pytest.raises(BoxQuarantinedError):
+        health.begin("box", now=10)
+    health.record_failure("box", RuntimeError("timeout"), now=11)
+    assert health.get("box").quarantined_until == 31
+
+    health.begin("box", now=31)
+    health.record_failure("box", RuntimeError("timeout"), now=31)
+    assert health.get("box").quarantined_until == 56
+
+
+def test_successful_probe_ends_the_quarantine():
+    health = HealthTracker(failure_threshold=1, base_backoff=10)
+    health.record_failure("box", RuntimeError("timeout"), now=0)
+    health.begin("box", now=10)
+    health.record_success("box", latency=0.2, now=10)
+    assert not health.is_quarantined("box", now=10)
+    assert health.get("box").quarantines == 0
+    health.begin("box", now=10)
+
+
+def test_cancelled_probe_lets_the_next_one_through():
+    health = HealthTracker(failure_threshold=1, base_backoff=10)
+    health.record_failure("box", RuntimeError("timeout"), now=0)
+    health.begin("box", now=10)
+    health.abort("box")
+    health.begin("box", now=10)
+
+
+@pytest.mark.asyncio
+async def test_unresponsive_box_is_skipped():
+    class Failing(FakeAdapter):
+        async def get(self, url, headers=None):
+            if "boxId=box1" in url:
+                raise RuntimeError("timeout")
+            return await super().get(url, headers)
+
+    adapter = Failing(boxes=2)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    cocoro.health = HealthTracker(failure_threshold=1)
+    boxes = await cocoro.query_boxes()
+
+    with pytest.raises(RuntimeError):
+        await cocoro.query_box_properties(boxes[1])
+    sent = len(adapter.requests)
+    with pytest.raises(BoxQuarantinedError):
+        await cocoro.query_box_properties(boxes[1])
+    assert len(adapter.requests) == sent
+    assert [h.box_id for h in cocoro.health.quarantined()] == ["box1"]
+    await cocoro.query_box_properties(boxes[0])
@@ -0,0 +1,84 @@
+import json
+
+from conftest import PROPERTIES, box_data, device_property
+
+from sharp_cocoro.devices.registry import build_device
+from sharp_cocoro.properties import BinaryPropertyStatus, SinglePropertyStatus
+from sharp_cocoro.response_types import Box, parse_properties, parse_statuses
+from sharp_cocoro.state import State8
+
+STATE8_PROPERTY = {
+    "statusName": "state",
+    "statusCode": "FA",
+    "get": True,
+    "set": True,
+    "inf": False,
+    "valueType": "valueBinary",
+}
+
+
+def state8(temperature: float, fan_direction: int, other: str = "7") -> str:
+    # a full state as reported by the cloud, with fields a command never sets
+    s = State8(other * 160)
+    s.temperature = temperature
+    s.fan_direction = fan_direction
+    return s.state
+
+
+def make_aircon(blob: str):
+    raw = device_property()
+    status = raw["status"] + [{"statusCode": "FA", "valueType": "valueBinary", "valueBinary": {"code": blob}}]
+    return build_device(
+        Box(**box_data(1)),
+        parse_properties(json.loads(json.dumps(PROPERTIES)) + [STATE8_PROPERTY]),
+        parse_statuses(status),
+    )
+
+
+def server_status(device, blob: str):
+    return [s for s in device.status if s.statusCode != "FA"] + [BinaryPropertyStatus("FA", {"code": blob})]
+
+
+def test_equal_value_clears_the_overlay():
+    device = make_aircon(state8(22, 3))
+    off = SinglePropertyStatus("80", {"code": "31"})
+    device.status = device.optimistic.apply(list(device.status), [off], [None])
+
+    on = [s for s in device.status if s.statusCode != "80"] + [SinglePropertyStatus("80", {"code": "30"})]
+    assert device.optimistic.reconcile(on)[-1] == off
+    assert device.optimistic.is_pending("80")
+
+    device.status = device.optimistic.reconcile(device.status)
+    assert not device.optimistic.is_pending("80")
+
+
+def test_state8_temperature_command_is_reflected_by_the_full_state():
+    device = make_aircon(state8(22, 3))
+    command = device.temperature_status(25)
+    device.status = device.optimistic.apply(list(device.status), [command], [None])
+    assert device.get_temperature() == 25
+
+    # the cloud still reports the old temperature, the overlay stays
+    device.status = device.optimistic.reconcile(server_status(device, state8(22, 3)))
+    assert device.optimistic.is_pending("FA")
+    assert device.get_temperature() == 25
+
+    # the full state never equals the command blob, but its temperature matches
+    applied = state8(25, 3)
+    device.status = device.optimistic.reconcile(server_status(device, applied))
+    assert not device.optimistic.is_pending("FA")
+    assert device.get_state8().state == applied
+    assert device.get_fan_direction().value == 3
+
+
+def test_state8_fan_direction_command_is_reflected_by_the_full_state():
+    device = make_aircon(state8(22, 1))
+    command = device.fan_direction_status("4")
+    device.status = device.optimistic.apply(list(device.status), [command], [None])
+
+    device.status = device.optimistic.reconcile(server_status(device, state8(22, 1)))
+    assert device.optimistic.is_pending("FA")
+
+    device.status = device.optimistic.reconcile(server_status(device, state8(22, 4)))
+    assert not device.optimistic.is_pending("FA")
+    assert device.get_temperature() == 22
@@ -0,0 +1,47 @@
+import asyncio
+
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.polling import AdaptivePoller, IntervalController, RequestBudget
+
+
+async def run_for(poller: AdaptivePoller, seconds: float) -> None:
+    poller.start()
+    await asyncio.sleep(seconds)
+    await poller.stop()
+
+
+def test_poller_created_outside_a_loop():
+    adapter = FakeAdapter(boxes=3)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    devices = asyncio.run(cocoro.query_devices())
+    controller = IntervalController(min_interval=0.01, initial_interval=0.01, max_interval=0.05)
+    poller = AdaptivePoller(cocoro, devices, controller=controller, budget=RequestBudget(rate=1000), concurrency=2)
+
+    asyncio.run(run_for(poller, 0.05))
+    assert all(state.polls > 0 for state in poller.states.values())
+    assert poller.errors == 0
+
+    # and it can be started again on another loop
+    polls = sum(state.polls for state in poller.states.values())
+    asyncio.run(run_for(poller, 0.05))
+    assert sum(state.polls for state in poller.states.values()) > polls
+
+
+def test_idle_devices_back_off_and_changes_tighten_the_interval():
+    controller = IntervalController(min_interval=10, initial_interval=60, max_interval=900)
+    state = controller.new_state(1, now=0)
+
+    now = 0.0
+    for _ in range(20):
+        now += state.interval
+        controller.record_poll(state, changed=False, now=now)
+    assert state.interval == 900
+
+    idle = state.interval
+    controller.record_poll(state, changed=True, now=now + idle)
+    assert state.interval <= idle / 2
+
+    controller.record_activity(state, now + idle)
+    assert state.interval == 10
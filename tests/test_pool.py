@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from conftest import FakeAdapter
+
+pytest.importorskip("httpx")
+
+from sharp_cocoro.pool import CocoroPool, FairLimiter, _PooledAdapter  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_released_round_robin_by_key():
+    limiter = FairLimiter(1)
+    await limiter.acquire("busy")
+    order = []
+
+    async def request(key, n):
+        await limiter.acquire(key)
+        order.append(f"{key}{n}")
+        limiter.release()
+
+    tasks = [asyncio.ensure_future(request("busy", n)) for n in range(3)]
+    tasks.append(asyncio.ensure_future(request("quiet", 0)))
+    await asyncio.sleep(0)
+    assert limiter.waiting == 4
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+    assert order == ["busy0", "quiet0", "busy1", "busy2"]
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = FairLimiter(1)
+    await limiter.acquire("a")
+    waiter = asyncio.ensure_future(limiter.acquire("b"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    limiter.release()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_pooled_adapter_holds_the_limiter_per_request():
+    limiter = FairLimiter(1)
+    adapter = _PooledAdapter(FakeAdapter(boxes=1, delay=0.01), limiter, "account")
+
+    results = await asyncio.gather(*(adapter.conditional_get("https://x/boxInfo") for _ in range(3)))
+    assert [not_modified for _, not_modified in results] == [False] * 3
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_accounts_are_unique():
+    async with CocoroPool(max_concurrency=2) as pool:
+        pool.add_account("secret", "key")
+        with pytest.raises(ValueError):
+            pool.add_account("secret", "key")
+        assert list(pool.accounts) == ["key"]
@@ -0,0 +1,46 @@
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.profiling import Profiler
+
+
+def test_disabled_stages_are_shared_no_ops():
+    profiler = Profiler()
+    assert profiler.stage("a") is profiler.stage("b")
+    with profiler.call("query"), profiler.stage("a"):
+        pass
+    assert len(profiler.reports) == 0
+    assert profiler.totals.stages == {}
+
+
+def test_nested_calls_report_to_the_outer_one():
+    profiler = Profiler(keep_reports=2)
+    profiler.enable(track_allocations=True)
+    try:
+        for _ in range(3):
+            with profiler.call("outer"):
+                with profiler.call("inner"), profiler.stage("build"):
+                    data = [object() for _ in range(1000)]
+    finally:
+        profiler.disable()
+
+    assert [r.name for r in profiler.reports] == ["outer", "outer"]
+    assert profiler.last_report.stages["build"].calls == 1
+    assert profiler.totals.stages["build"].calls == 3
+    assert profiler.totals.stages["build"].allocated_bytes > 0
+    assert "build" in profiler.last_report.format()
+    del data
+
+
+@pytest.mark.asyncio
+async def test_query_devices_report():
+    cocoro = Cocoro("secret", "key", adapter=FakeAdapter(boxes=3))
+    cocoro.profiler.enable()
+    await cocoro.query_devices()
+    report = cocoro.profiler.last_report
+
+    assert report.name == "query_devices"
+    assert report.stages["http"].calls == 4
+    assert report.stages["parse_properties"].calls == 3
+    assert report.stages["build_device"].calls == 3
@@ -0,0 +1,55 @@
+import gzip
+import json
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.recording import RecordedError, RecordingAdapter, ReplayAdapter
+
+
+async def session(adapter):
+    cocoro = Cocoro("my-secret", "my-key", adapter=adapter)
+    await cocoro.login()
+    devices = await cocoro.query_devices()
+    await adapter.close()
+    return devices
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_the_recorded_session(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    live = await session(RecordingAdapter(FakeAdapter(boxes=2), path))
+
+    with gzip.open(path, "rt") as f:
+        text = f.read()
+    assert "my-secret" not in text and "my-key" not in text
+
+    replay = ReplayAdapter(path, speed=0)
+    replayed = await session(replay)
+    assert [(d.device_id, d.status) for d in replayed] == [(d.device_id, d.status) for d in live]
+    assert replay.served == 4
+
+    # once used up, the last response to a request is served again
+    assert [d.device_id for d in await session(replay)] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_replayed(tmp_path):
+    class Failing(FakeAdapter):
+        async def get(self, url, headers=None):
+            raise ConnectionError("reset")
+
+    path = str(tmp_path / "session.jsonl")
+    recorder = RecordingAdapter(Failing(), path)
+    with pytest.raises(ConnectionError):
+        await session(recorder)
+    await recorder.close()
+    with open(path) as f:
+        assert [json.loads(line)["method"] for line in f] == ["POST", "GET"]
+
+    replay = ReplayAdapter(path, speed=0)
+    with pytest.raises(RecordedError, match="ConnectionError: reset"):
+        await session(replay)
+    with pytest.raises(RecordedError, match="no recorded response"):
+        await replay.get("https://example.com/other")
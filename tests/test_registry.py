@@ -0,0 +1,66 @@
+import importlib.metadata
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from conftest import PROPERTIES, box_data, device_property
+
+from sharp_cocoro.devices import registry
+from sharp_cocoro.devices.purifier.purifier import Purifier
+from sharp_cocoro.devices.unknown import UnknownDevice
+from sharp_cocoro.properties import DeviceType
+from sharp_cocoro.response_types import Box, parse_properties, parse_statuses
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+    monkeypatch.setattr(registry, "_entry_points_loaded", True)
+
+
+def build(device_type: str):
+    return registry.build_device(
+        Box(**box_data(1, device_type)), parse_properties(PROPERTIES), parse_statuses(device_property(1)["status"])
+    )
+
+
+def test_import_does_not_load_clients_or_devices():
+    code = "import sys, sharp_cocoro; print(sorted(m for m in sys.modules if m.startswith(('httpx', 'sharp_cocoro.'))))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_register_a_lazy_class_path(clean_registry):
+    assert isinstance(build("HEALSIO"), UnknownDevice)
+
+    registry.register_device_class("HEALSIO", "sharp_cocoro.devices.purifier.purifier:Purifier")
+    assert type(build("HEALSIO")) is Purifier
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register_device_class(DeviceType.Healsio, UnknownDevice)
+    with pytest.raises(ValueError, match="module:ClassName"):
+        registry.register_device_class(DeviceType.HotCook, "no.colon", replace=True)
+
+    registry.unregister_device_class("HEALSIO")
+    assert isinstance(build("HEALSIO"), UnknownDevice)
+
+
+def test_entry_points_do_not_override_explicit_registrations(clean_registry, monkeypatch):
+    plugins = [
+        SimpleNamespace(name="HOTCOOK", value="sharp_cocoro.devices.purifier.purifier:Purifier"),
+        SimpleNamespace(name="AIR_CON", value="sharp_cocoro.devices.unknown:UnknownDevice"),
+        SimpleNamespace(name="NOT_A_TYPE", value="x:Y"),
+    ]
+
+    def entry_points(group=None):
+        if sys.version_info >= (3, 10):
+            assert group == registry.ENTRY_POINT_GROUP
+            return plugins
+        return {registry.ENTRY_POINT_GROUP: plugins}
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", entry_points)
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+
+    assert type(build("HOTCOOK")) is Purifier
+    assert type(build("AIR_CON")).__name__ == "Aircon"
+    assert DeviceType.HotCook in registry.registered_device_types()
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.properties import DeviceType, SinglePropertyStatus
+from sharp_cocoro.scene import Scene, SceneTarget
+
+POWER_OFF = SinglePropertyStatus("80", {"code": "31"})
+
+
+@pytest.mark.asyncio
+async def test_only_devices_that_differ_are_controlled():
+    adapter = FakeAdapter(boxes=3)
+    adapter.power["box1"] = "31"
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    devices = await cocoro.query_devices()
+
+    scene = Scene([SceneTarget(kind=DeviceType.AirCondition, statuses=[POWER_OFF])])
+    assert set(scene.plan(devices)) == {"box0", "box2"}
+
+    reports = []
+    report = await scene.apply(cocoro, devices, progress=lambda r: reports.append(r.done))
+    assert (report.total, report.changed, report.skipped, report.failed) == (3, 2, 1, {})
+    assert len(adapter.controls) == 2
+    assert reports == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_steps_wait_for_other_commands_to_the_device():
+    adapter = FakeAdapter(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    (device,) = await cocoro.query_devices()
+    scene = Scene([SceneTarget(statuses=[POWER_OFF])])
+
+    async with device.lock:
+        applying = asyncio.ensure_future(scene.apply(cocoro, [device]))
+        await asyncio.sleep(0.01)
+        assert not applying.done()
+        assert adapter.controls == []
+
+    report = await applying
+    assert report.changed == 1
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.scheduler import Priority, RequestScheduler
+
+
+async def hold(scheduler, priority, order, release):
+    async with scheduler.slot(priority):
+        order.append(priority)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_released_by_priority():
+    scheduler = RequestScheduler(max_concurrency=1, aging=1000)
+    release = asyncio.Event()
+    order = []
+    first = asyncio.ensure_future(hold(scheduler, Priority.POLL, order, release))
+    await asyncio.sleep(0)
+
+    waiters = [
+        asyncio.ensure_future(hold(scheduler, p, order, release))
+        for p in (Priority.POLL, Priority.REFRESH, Priority.CONTROL)
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.waiting() == 3
+
+    release.set()
+    await asyncio.gather(first, *waiters)
+    assert order == [Priority.POLL, Priority.CONTROL, Priority.REFRESH, Priority.POLL]
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_aging_lets_old_polls_overtake_new_commands():
+    scheduler = RequestScheduler(max_concurrency=1, aging=0.01)
+    await scheduler.acquire(Priority.CONTROL)
+    order = []
+    release = asyncio.Event()
+    release.set()
+
+    poll = asyncio.ensure_future(hold(scheduler, Priority.POLL, order, release))
+    await asyncio.sleep(0.05)
+    control = asyncio.ensure_future(hold(scheduler, Priority.CONTROL, order, release))
+    await asyncio.sleep(0)
+
+    scheduler.release(Priority.CONTROL)
+    await asyncio.gather(poll, control)
+    assert order == [Priority.POLL, Priority.CONTROL]
+
+
+@pytest.mark.asyncio
+async def test_polling_keeps_slots_free_for_commands():
+    scheduler = RequestScheduler(max_concurrency=4)
+    assert scheduler.class_limits == {Priority.POLL: 2}
+    for _ in range(2):
+        await scheduler.acquire(Priority.POLL)
+
+    poll = asyncio.ensure_future(scheduler.acquire(Priority.POLL))
+    await asyncio.sleep(0)
+    assert not poll.done()
+
+    await asyncio.wait_for(scheduler.acquire(Priority.CONTROL), 1)
+    assert scheduler.active == 3
+
+    scheduler.release(Priority.POLL)
+    await asyncio.wait_for(poll, 1)
+    assert scheduler.active == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_give_back_their_slot():
+    scheduler = RequestScheduler(max_concurrency=1)
+    await scheduler.acquire(Priority.REFRESH)
+    waiter = asyncio.ensure_future(scheduler.acquire(Priority.REFRESH))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release(Priority.REFRESH)
+    assert scheduler.active == 0
+    await asyncio.wait_for(scheduler.acquire(Priority.POLL), 1)
+
+
+@pytest.mark.asyncio
+async def test_cocoro_does_not_limit_requests_by_default():
+    cocoro = Cocoro("secret", "key")
+    assert cocoro.scheduler.max_concurrency is None
+    slots = [cocoro.scheduler.acquire(Priority.POLL) for _ in range(50)]
+    await asyncio.wait_for(asyncio.gather(*slots), 1)
+    assert cocoro.scheduler.active == 50
+    await cocoro.close()
@@ -0,0 +1,83 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from sharp_cocoro.sharding import HashRing, ShardedPoller, _diff
+
+
+def test_hash_ring_is_stable_and_balanced():
+    ring = HashRing(4)
+    keys = [f"box{i}" for i in range(4000)]
+    placement = [ring.shard_for(k) for k in keys]
+
+    same = HashRing(4)
+    assert placement == [same.shard_for(k) for k in keys]
+    counts = [placement.count(shard) for shard in range(4)]
+    assert min(counts) > 700
+
+    # adding a shard only moves keys onto the new shard
+    grown = HashRing(5)
+    moved = [new for new, old in zip(map(grown.shard_for, keys), placement) if new != old]
+    assert moved and set(moved) == {4}
+
+
+def test_diff_reports_changed_and_removed_codes():
+    old = {"80": "30", "BB": "22", "A0": "41"}
+    new = {"80": "31", "BB": "22", "F1": "1"}
+    assert _diff(old, new) == {"80": "31", "F1": "1", "A0": None}
+    assert _diff(new, new) == {}
+
+
+def pipe_poller(max_errors: int = 1000):
+    poller = ShardedPoller("secret", "key", workers=1, max_errors=max_errors)
+    parent, child = multiprocessing.Pipe()
+    poller._conns = [parent]
+    return poller, child
+
+
+def test_receive_collects_deltas_and_bounds_errors():
+    poller, child = pipe_poller(max_errors=2)
+    child.send([("delta", "box1", 1, 10.0, {"80": "31"})] + [("error", 0, f"box{i}", "boom") for i in range(3)])
+
+    (delta,) = poller._receive(1.0)
+    assert (delta.box_id, delta.device_id, delta.changes) == ("box1", 1, {"80": "31"})
+    assert [e.box_id for e in poller.errors] == ["box1", "box2"]
+
+    child.close()
+    assert poller._receive(1.0) == []
+    assert poller._conns == []
+
+
+def test_stop_waits_for_a_receive_in_progress():
+    poller, child = pipe_poller()
+    errors = []
+
+    def receive():
+        try:
+            poller._receive(0.2)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=receive)
+    thread.start()
+    time.sleep(0.05)
+    poller.stop()
+    thread.join()
+
+    assert errors == []
+    assert poller._conns == []
+    assert child.recv() == "stop"
+
+
+@pytest.mark.asyncio
+async def test_deltas_ends_when_workers_are_gone():
+    poller, child = pipe_poller()
+    child.send([("delta", "box1", 1, 10.0, {"80": "30"})])
+    child.close()
+
+    deltas = [d async for d in poller.deltas(poll_timeout=0.1)]
+    assert [d.changes for d in deltas] == [{"80": "30"}]
+    await asyncio.sleep(0)
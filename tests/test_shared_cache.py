@@ -0,0 +1,61 @@
+import logging
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.shared_cache import SharedStatusCache
+
+
+@pytest.mark.asyncio
+async def test_attached_status_changes_reach_readers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer = SharedStatusCache(path)
+    adapter = FakeAdapter(boxes=2)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    writer.attach(cocoro)
+    devices = await cocoro.query_devices()
+    writer.flush()
+
+    reader = SharedStatusCache(path)
+    assert [d.device_id for d in reader.devices()] == [0, 1]
+    assert reader.status(1) == devices[1].status
+
+    adapter.power["box1"] = "31"
+    await cocoro.refresh_device(devices[1])
+    writer.flush()
+    assert reader.status(1) == devices[1].status
+    assert reader.status(1, max_age=0) is None
+    reader.close()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_write_errors_are_logged_and_raised_by_flush(tmp_path, monkeypatch, caplog):
+    cache = SharedStatusCache(str(tmp_path / "cache.db"))
+    cocoro = Cocoro("secret", "key", adapter=FakeAdapter(boxes=1))
+    (device,) = await cocoro.query_devices()
+
+    def fail(devices):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(cache, "_write_devices", fail)
+    with caplog.at_level(logging.ERROR, logger="sharp_cocoro.shared_cache"):
+        cache.on_status(device, None)
+        with pytest.raises(RuntimeError):
+            cache.flush()
+    assert "disk full" in caplog.text
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_status_changes_after_close_are_ignored(tmp_path):
+    cache = SharedStatusCache(str(tmp_path / "cache.db"))
+    cocoro = Cocoro("secret", "key", adapter=FakeAdapter(boxes=1))
+    (device,) = await cocoro.query_devices()
+    cache.on_status(device, None)
+    cache.close()
+
+    cache.on_status(device, None)
+    assert cache._writer is None
+    cache.close()
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict
+
+import pytest
+
+from sharp_cocoro.streaming import JSONArrayStream
+
+DOCUMENT: Dict[str, Any] = {
+    "skipped": {"list": [1, -2.5e-3, "x]"], "flag": False},
+    "box": [
+        1,
+        2.5,
+        1e5,
+        -0.25E+2,
+        123456789,
+        True,
+        None,
+        "café ☃ \U0001f600 \"quoted\" \\ \n",
+        {"boxId": "box1", "echonetData": [{"deviceId": 10, "temp": 22.5}]},
+        [],
+        {},
+    ],
+    "after": [1, 2],
+}
+BODY = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+
+
+def parse(chunks):
+    parser = JSONArrayStream("box")
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return items
+
+
+def test_split_at_every_byte_offset():
+    for offset in range(len(BODY) + 1):
+        assert parse([BODY[:offset], BODY[offset:]]) == DOCUMENT["box"], offset
+
+
+def test_one_byte_chunks():
+    assert parse([BODY[i:i + 1] for i in range(len(BODY))]) == DOCUMENT["box"]
+
+
+@pytest.mark.parametrize("chunks", [[b'{"box":[1,2.', b'5]}'], [b'{"box":[1,1e', b'5]}'], [b'{"box":[-', b'1]}']])
+def test_numbers_cut_by_a_chunk(chunks):
+    assert parse(chunks) == json.loads(b"".join(chunks))["box"]
+
+
+def test_invalid_json_fails_without_waiting_for_the_end():
+    parser = JSONArrayStream("box")
+    with pytest.raises(ValueError):
+        parser.feed(b'{"box":[1,}')
+
+
+def test_incomplete_body():
+    with pytest.raises(ValueError):
+        parse([b'{"box":[1,2'])
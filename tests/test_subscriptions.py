@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.subscriptions import OverflowPolicy
+
+
+@pytest.mark.asyncio
+async def test_changes_are_delivered_per_status_code():
+    adapter = FakeAdapter(boxes=2)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    await cocoro.query_devices()
+    sub = cocoro.subscribe(1, ["80"])
+
+    adapter.power["box1"] = "31"
+    adapter.power["box0"] = "31"
+    await cocoro.query_devices()
+
+    event = await asyncio.wait_for(sub.get(), 1)
+    assert (event.device_id, event.status_code, event.old.value_code, event.new.value_code) == (1, "80", "30", "31")
+    assert len(sub) == 0
+    sub.close()
+    with pytest.raises(StopAsyncIteration):
+        await sub.get()
+
+
+@pytest.mark.asyncio
+async def test_merge_keeps_first_old_and_latest_new_value():
+    adapter = FakeAdapter(boxes=1)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    await cocoro.query_devices()
+    sub = cocoro.subscribe(policy=OverflowPolicy.MERGE)
+
+    for power in ("31", "30", "31"):
+        adapter.power["box0"] = power
+        await cocoro.query_devices()
+
+    assert len(sub) == 1
+    event = await sub.get()
+    assert (event.old.value_code, event.new.value_code) == ("30", "31")
+
+
+@pytest.mark.asyncio
+async def test_last_status_of_vanished_devices_is_evicted():
+    adapter = FakeAdapter(boxes=3)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    cocoro.subscribe()
+    await cocoro.query_devices()
+    hub = cocoro._subscriptions
+    assert set(hub._last) == {0, 1, 2}
+
+    adapter.boxes = 1
+    await cocoro.query_devices()
+    assert set(hub._last) == {0}
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.sync import CocoroSync
+
+
+def test_calls_from_many_threads_share_one_client():
+    adapter = FakeAdapter(boxes=2)
+    with CocoroSync("secret", "key", adapter=adapter) as cocoro:
+        cocoro.login()
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: cocoro.query_devices(), range(8)))
+
+        assert all([d.device_id for d in devices] == [0, 1] for devices in results)
+        device = results[0][0]
+        device.queue_power_off()
+        cocoro.execute_queued_updates(device)
+        assert len(adapter.controls) == 1
+        assert cocoro.is_authenticated
+
+
+def test_calls_after_close_raise():
+    cocoro = CocoroSync("secret", "key", adapter=FakeAdapter())
+    cocoro.close()
+    cocoro.close()
+    with pytest.raises(RuntimeError):
+        cocoro.query_boxes()
@@ -0,0 +1,38 @@
+import pytest
+from conftest import FakeAdapter
+
+from sharp_cocoro.cocoro import Cocoro
+from sharp_cocoro.timeseries import RingBuffer, TimeSeriesStore
+
+
+def test_ring_buffer_keeps_the_latest_samples():
+    buffer = RingBuffer(3)
+    for t in range(5):
+        buffer.append(float(t), float(t * 10))
+
+    assert len(buffer) == 3
+    assert list(buffer.items()) == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert list(buffer.items(since=3, until=4)) == [(3.0, 30.0)]
+    assert buffer.latest() == (4.0, 40.0)
+    stats = buffer.stats(since=3)
+    assert (stats.count, stats.min, stats.max, stats.mean) == (2, 30.0, 40.0, 35.0)
+    assert buffer.stats(since=10) is None
+    assert [(start, s.count) for start, s in buffer.downsample(2)] == [(2.0, 2), (4.0, 1)]
+
+
+@pytest.mark.asyncio
+async def test_series_of_vanished_devices_are_dropped():
+    adapter = FakeAdapter(boxes=2)
+    cocoro = Cocoro("secret", "key", adapter=adapter)
+    store = TimeSeriesStore(capacity=10)
+    store.attach(cocoro)
+
+    await cocoro.query_devices()
+    await cocoro.query_devices()
+    assert len(store.series(1, "room_temperature")) == 2
+
+    adapter.boxes = 1
+    await cocoro.query_devices()
+    assert store.series(1, "room_temperature") is None
+    assert store.metrics_for_device(1) == []
+    assert len(store.series(0, "room_temperature")) == 3
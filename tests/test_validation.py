@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from conftest import PROPERTIES
+
+from sharp_cocoro.properties import RangePropertyStatus, SinglePropertyStatus
+from sharp_cocoro.response_types import parse_properties
+from sharp_cocoro.validation import compile_validators
+
+
+def validators(**changes):
+    schema = json.loads(json.dumps(PROPERTIES))
+    schema[1].update(set=True)
+    schema[1]["valueRange"].update(changes)
+    return compile_validators(parse_properties(schema))
+
+
+def test_single_values_must_be_in_the_schema():
+    power = validators()["80"]
+    power.validate(SinglePropertyStatus("80", {"code": "31"}))
+    with pytest.raises(ValueError, match="expected one of"):
+        power.validate(SinglePropertyStatus("80", {"code": "32"}))
+    assert power.name_to_code == {"on": "30", "off": "31"}
+
+
+@pytest.mark.parametrize("code", ["-1", "51", "20.5", "abc", "nan"])
+def test_range_values_outside_the_schema(code):
+    with pytest.raises(ValueError):
+        validators()["BB"].validate(RangePropertyStatus("BB", {"code": code}))
+
+
+def test_range_step_is_checked_from_the_minimum():
+    temperature = validators(type="float", min="16", max="30", step="0.5")["BB"]
+    temperature.validate(RangePropertyStatus("BB", {"code": "22.5"}))
+    with pytest.raises(ValueError, match="multiple"):
+        temperature.validate(RangePropertyStatus("BB", {"code": "22.25"}))
+
+
+def test_unsettable_and_mismatched_types_are_rejected():
+    schema = compile_validators(parse_properties(PROPERTIES))
+    with pytest.raises(ValueError, match="not settable"):
+        schema["BB"].validate(RangePropertyStatus("BB", {"code": "20"}))
+    with pytest.raises(ValueError, match="expects"):
+        schema["80"].validate(RangePropertyStatus("80", {"code": "30"}))